@@ -0,0 +1,52 @@
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+from .core.database import Database
+from .core.logger import logger
+from .services.archive_service import ArchiveService
+
+# Cargar variables de entorno
+root_dir = Path(__file__).parent.parent
+load_dotenv(root_dir / '.env')
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Define y procesa los argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.archive',
+        description='Mueve el historial de streams finalizados a archivos Parquet locales.'
+    )
+    parser.add_argument('--path', help='Directorio del archivo (por defecto ARCHIVE_PATH)')
+    parser.add_argument('--retention-days', type=int, help='Días que el historial permanece en MongoDB')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Documentos por lote')
+    return parser.parse_args(argv)
+
+async def run_archive(args: argparse.Namespace) -> dict:
+    """Conecta a la base de datos y archiva el historial frío."""
+    await Database.connect_to_database()
+    try:
+        service = ArchiveService(
+            Database.get_database(),
+            base_path=args.path,
+            hot_retention_days=args.retention_days
+        )
+        return await service.archive_ended_streams(batch_size=args.batch_size)
+    finally:
+        await Database.close_database_connection()
+
+def main(argv=None):
+    """
+    Punto de entrada del comando de archivo.
+    """
+    args = parse_args(argv)
+    try:
+        archived = asyncio.run(run_archive(args))
+        for collection, count in archived.items():
+            print(f"{collection}: {count} documentos archivados")
+    except Exception as e:
+        logger.error(f"Error al archivar historial: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -19,11 +19,24 @@ class Config:
     
     # Configuración de la base de datos
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///stream_views.db')
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mongodb').lower()  # mongodb, sqlite
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'data/stream_views.sqlite3')
+    SQLITE_BATCH_SIZE = int(os.getenv('SQLITE_BATCH_SIZE', '100'))
     
     # Configuración de seguridad
     MAX_REQUESTS_PER_HOUR = int(os.getenv('MAX_REQUESTS_PER_HOUR', '100'))
     API_RATE_LIMIT_WINDOW = int(os.getenv('API_RATE_LIMIT_WINDOW', '3600'))
     ENABLE_CSRF_PROTECTION = os.getenv('ENABLE_CSRF_PROTECTION', 'true').lower() == 'true'
+    # Usar X-Forwarded-For como IP del cliente (solo detrás de un proxy de confianza)
+    TRUST_PROXY_HEADERS = os.getenv('TRUST_PROXY_HEADERS', 'false').lower() == 'true'
+    # Límite de las rutas públicas de lectura (/streams, /thumbnails) por cliente: solicitudes por segundo y ráfaga
+    READ_REQUESTS_PER_SECOND = float(os.getenv('READ_REQUESTS_PER_SECOND', '20'))
+    READ_BURST = int(os.getenv('READ_BURST', '200'))
+    
+    # Límite de llamadas salientes a YouTube (llamadas por segundo, ráfaga y espera máxima en segundos)
+    YOUTUBE_REQUESTS_PER_SECOND = float(os.getenv('YOUTUBE_REQUESTS_PER_SECOND', '5'))
+    YOUTUBE_BURST = int(os.getenv('YOUTUBE_BURST', '10'))
+    YOUTUBE_MAX_WAIT = float(os.getenv('YOUTUBE_MAX_WAIT', '30'))
     
     # Configuración de logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -31,10 +44,64 @@ class Config:
     MAX_LOG_SIZE = int(os.getenv('MAX_LOG_SIZE', '10485760'))  # 10MB
     MAX_LOG_FILES = int(os.getenv('MAX_LOG_FILES', '5'))
     
+    # Pools de conexiones de MongoDB (uno principal y uno opcional para análisis)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '50'))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '10'))
+    MONGO_ANALYTICS_POOL = os.getenv('MONGO_ANALYTICS_POOL', 'false').lower() == 'true'
+    MONGO_ANALYTICS_MAX_POOL_SIZE = int(os.getenv('MONGO_ANALYTICS_MAX_POOL_SIZE', '10'))
+    MONGO_ANALYTICS_READ_PREFERENCE = os.getenv('MONGO_ANALYTICS_READ_PREFERENCE', 'secondaryPreferred')
+    
+    # Pool de hash de contraseñas (0 = un hilo por núcleo)
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '0'))
+    PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '64'))
+    
+    # Caché de usuarios autenticados (segundos de validez y tamaño máximo)
+    AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', '60'))
+    AUTH_CACHE_MAX_ENTRIES = int(os.getenv('AUTH_CACHE_MAX_ENTRIES', '10000'))
+    
+    # Feed de favoritos (segundos de caché y muestras recientes por stream)
+    FAVORITES_FEED_TTL = int(os.getenv('FAVORITES_FEED_TTL', '10'))
+    FAVORITES_FEED_SAMPLES = int(os.getenv('FAVORITES_FEED_SAMPLES', '20'))
+    
+    # Feed en vivo (eventos guardados para reanudar y segundos entre keep-alives)
+    LIVE_FEED_HISTORY = int(os.getenv('LIVE_FEED_HISTORY', '256'))
+    LIVE_FEED_HEARTBEAT = int(os.getenv('LIVE_FEED_HEARTBEAT', '15'))
+    
+    # Trazas de las etapas del refresco (off, log o file) y duración mínima exportada en ms
+    TRACE_EXPORT = os.getenv('TRACE_EXPORT', 'off').lower()
+    TRACE_FILE_PATH = os.getenv('TRACE_FILE_PATH', 'logs/trace.json')
+    TRACE_MIN_MS = float(os.getenv('TRACE_MIN_MS', '0'))
+    
+    # Profiler de muestreo bajo demanda (directorio de capturas, ms entre muestras, duración máxima)
+    PROFILE_OUTPUT_PATH = os.getenv('PROFILE_OUTPUT_PATH', 'profiles')
+    PROFILE_INTERVAL_MS = int(os.getenv('PROFILE_INTERVAL_MS', '10'))
+    PROFILE_MAX_SECONDS = int(os.getenv('PROFILE_MAX_SECONDS', '120'))
+    
     # Configuración de la aplicación
     UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', '30'))
     MAX_STREAMS = int(os.getenv('MAX_STREAMS', '50'))
     ENABLE_METRICS = os.getenv('ENABLE_METRICS', 'true').lower() == 'true'
+    STREAM_PAGE_SIZE = int(os.getenv('STREAM_PAGE_SIZE', '25'))
+    # Streams leídos del almacenamiento por consulta en cada ciclo de sondeo
+    POLL_PAGE_SIZE = int(os.getenv('POLL_PAGE_SIZE', '500'))
+    
+    # Última foto de las métricas, usada para mostrar datos al arrancar sin esperar a YouTube
+    SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'data/metrics_snapshot.json')
+    
+    # Series recientes en memoria (muestras por stream; 2880 = 24 h cada 30 s)
+    TIMESERIES_CAPACITY = int(os.getenv('TIMESERIES_CAPACITY', '2880'))
+    
+    # Configuración de consultas analíticas
+    CHART_MAX_POINTS = int(os.getenv('CHART_MAX_POINTS', '500'))
+    
+    # Configuración del archivo histórico (cold tier)
+    ARCHIVE_PATH = os.getenv('ARCHIVE_PATH', 'archive')
+    HOT_RETENTION_DAYS = int(os.getenv('HOT_RETENTION_DAYS', '30'))
+    
+    # Caché local de miniaturas (redimensionadas, con límite de tamaño en disco)
+    THUMBNAIL_CACHE_PATH = os.getenv('THUMBNAIL_CACHE_PATH', 'cache/thumbnails')
+    THUMBNAIL_CACHE_MAX_MB = int(os.getenv('THUMBNAIL_CACHE_MAX_MB', '100'))
+    THUMBNAIL_WIDTH = int(os.getenv('THUMBNAIL_WIDTH', '384'))
     
     @classmethod
     def validate(cls) -> bool:
@@ -61,6 +128,11 @@ class Config:
             log_dir = Path(cls.LOG_FILE_PATH).parent
             log_dir.mkdir(exist_ok=True)
             
+            # Validar backend de almacenamiento
+            if cls.STORAGE_BACKEND not in ('mongodb', 'sqlite'):
+                logger.error("STORAGE_BACKEND debe ser 'mongodb' o 'sqlite'")
+                return False
+            
             # Validar configuración de seguridad
             if cls.MAX_REQUESTS_PER_HOUR <= 0:
                 logger.error("MAX_REQUESTS_PER_HOUR debe ser mayor que 0")
@@ -70,6 +142,14 @@ class Config:
                 logger.error("API_RATE_LIMIT_WINDOW debe ser mayor que 0")
                 return False
             
+            if cls.READ_REQUESTS_PER_SECOND <= 0 or cls.READ_BURST <= 0:
+                logger.error("READ_REQUESTS_PER_SECOND y READ_BURST deben ser mayores que 0")
+                return False
+            
+            if cls.YOUTUBE_REQUESTS_PER_SECOND <= 0 or cls.YOUTUBE_BURST <= 0 or cls.YOUTUBE_MAX_WAIT < 0:
+                logger.error("YOUTUBE_REQUESTS_PER_SECOND y YOUTUBE_BURST deben ser mayores que 0 y YOUTUBE_MAX_WAIT no puede ser negativo")
+                return False
+            
             # Validar configuración de la aplicación
             if cls.UPDATE_INTERVAL <= 0:
                 logger.error("UPDATE_INTERVAL debe ser mayor que 0")
@@ -79,6 +159,63 @@ class Config:
                 logger.error("MAX_STREAMS debe ser mayor que 0")
                 return False
             
+            if cls.MONGO_MAX_POOL_SIZE <= 0 or not 0 <= cls.MONGO_MIN_POOL_SIZE <= cls.MONGO_MAX_POOL_SIZE:
+                logger.error("MONGO_MAX_POOL_SIZE debe ser mayor que 0 y MONGO_MIN_POOL_SIZE estar entre 0 y ese valor")
+                return False
+            
+            if cls.MONGO_ANALYTICS_MAX_POOL_SIZE <= 0:
+                logger.error("MONGO_ANALYTICS_MAX_POOL_SIZE debe ser mayor que 0")
+                return False
+            
+            if cls.MONGO_ANALYTICS_READ_PREFERENCE not in (
+                    'primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest'):
+                logger.error(f"MONGO_ANALYTICS_READ_PREFERENCE inválido: {cls.MONGO_ANALYTICS_READ_PREFERENCE}")
+                return False
+            
+            if cls.PASSWORD_HASH_WORKERS < 0 or cls.PASSWORD_HASH_MAX_QUEUE < 0:
+                logger.error("PASSWORD_HASH_WORKERS y PASSWORD_HASH_MAX_QUEUE no pueden ser negativos")
+                return False
+            
+            if cls.AUTH_CACHE_TTL < 0 or cls.AUTH_CACHE_MAX_ENTRIES <= 0:
+                logger.error("AUTH_CACHE_TTL no puede ser negativo y AUTH_CACHE_MAX_ENTRIES debe ser mayor que 0")
+                return False
+            
+            if cls.FAVORITES_FEED_TTL < 0 or cls.FAVORITES_FEED_SAMPLES < 0:
+                logger.error("FAVORITES_FEED_TTL y FAVORITES_FEED_SAMPLES no pueden ser negativos")
+                return False
+            
+            if cls.LIVE_FEED_HISTORY <= 0 or cls.LIVE_FEED_HEARTBEAT <= 0:
+                logger.error("LIVE_FEED_HISTORY y LIVE_FEED_HEARTBEAT deben ser mayores que 0")
+                return False
+            
+            if cls.TRACE_EXPORT not in ('off', 'log', 'file'):
+                logger.error("TRACE_EXPORT debe ser 'off', 'log' o 'file'")
+                return False
+            
+            if cls.PROFILE_INTERVAL_MS <= 0 or cls.PROFILE_MAX_SECONDS <= 0:
+                logger.error("PROFILE_INTERVAL_MS y PROFILE_MAX_SECONDS deben ser mayores que 0")
+                return False
+            
+            if cls.STREAM_PAGE_SIZE <= 0 or cls.POLL_PAGE_SIZE <= 0:
+                logger.error("STREAM_PAGE_SIZE y POLL_PAGE_SIZE deben ser mayores que 0")
+                return False
+            
+            if cls.TIMESERIES_CAPACITY <= 0:
+                logger.error("TIMESERIES_CAPACITY debe ser mayor que 0")
+                return False
+            
+            if cls.CHART_MAX_POINTS <= 0:
+                logger.error("CHART_MAX_POINTS debe ser mayor que 0")
+                return False
+            
+            if cls.HOT_RETENTION_DAYS <= 0:
+                logger.error("HOT_RETENTION_DAYS debe ser mayor que 0")
+                return False
+            
+            if cls.THUMBNAIL_CACHE_MAX_MB <= 0 or cls.THUMBNAIL_WIDTH <= 0:
+                logger.error("THUMBNAIL_CACHE_MAX_MB y THUMBNAIL_WIDTH deben ser mayores que 0")
+                return False
+            
             logger.info("Configuración validada correctamente")
             return True
             
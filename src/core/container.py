@@ -0,0 +1,54 @@
+from typing import TYPE_CHECKING, Optional
+from .logger import logger
+
+if TYPE_CHECKING:
+    from .youtube_client import YouTubeClient
+    from ..repositories.base_repository import BaseStreamRepository
+    from ..services.stream_service import StreamService
+
+
+class ServiceContainer:
+    """
+    Contenedor de los servicios compartidos del proceso.
+
+    Cada servicio se crea una sola vez y recién cuando se usa por primera vez;
+    los módulos pesados (cliente de la API de YouTube, drivers de base de
+    datos) se importan en ese momento y no al importar la aplicación.
+    """
+
+    def __init__(self):
+        self._youtube_client: Optional["YouTubeClient"] = None
+        self._stream_service: Optional["StreamService"] = None
+
+    @property
+    def youtube_client(self) -> "YouTubeClient":
+        """Cliente de la API de YouTube del proceso."""
+        if self._youtube_client is None:
+            from .youtube_client import YouTubeClient
+            self._youtube_client = YouTubeClient()
+            logger.info("Cliente de YouTube inicializado")
+        return self._youtube_client
+
+    @property
+    def repository(self) -> "BaseStreamRepository":
+        """Repositorio de streams configurado en STORAGE_BACKEND."""
+        from ..repositories import get_stream_repository
+        return get_stream_repository()
+
+    @property
+    def stream_service(self) -> "StreamService":
+        """Servicio de streams del proceso."""
+        if self._stream_service is None:
+            from ..services.stream_service import StreamService
+            self._stream_service = StreamService(youtube_client=self.youtube_client)
+        return self._stream_service
+
+    async def get_database(self):
+        """Base de datos MongoDB del proceso (se conecta al primer uso)."""
+        from .database import Database
+        await Database.connect_to_database()
+        return Database.get_database()
+
+
+# Instancia global del contenedor de servicios
+services = ServiceContainer()
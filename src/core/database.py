@@ -1,46 +1,188 @@
-from motor.motor_asyncio import AsyncIOMotorClient # type: ignore
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional
 import os
 from dotenv import load_dotenv
+from ..core.config import Config
 from ..core.logger import logger
+from ..core.metrics import MONGO_OPERATION_SECONDS
 import certifi
 import ssl
 
+if TYPE_CHECKING:
+    from motor.motor_asyncio import AsyncIOMotorClient # type: ignore
+
 # Cargar variables de entorno
 load_dotenv()
 
+# Nombre de la base de datos de la aplicación
+DATABASE_NAME = "stream_views"
+
+
+class PoolStats:
+    """Contadores de un pool de conexiones de MongoDB (sumados sobre todos los servidores)."""
+
+    def __init__(self, name: str, max_pool_size: int):
+        self.name = name
+        self.max_pool_size = max_pool_size
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.waiting = 0
+        self.cleared = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "max_pool_size": self.max_pool_size,
+            "open": self.created - self.closed,
+            "created": self.created,
+            "closed": self.closed,
+            "checked_out": self.checked_out,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "waiting": self.waiting,
+            "cleared": self.cleared,
+        }
+
+
+def _pool_listener(stats: PoolStats):
+    """Crea un listener de eventos del pool de pymongo que actualiza `stats`."""
+    from pymongo import monitoring
+
+    class PoolListener(monitoring.ConnectionPoolListener):
+        def pool_created(self, event): pass
+        def pool_ready(self, event): pass
+        def pool_closed(self, event): pass
+
+        def pool_cleared(self, event):
+            stats.cleared += 1
+
+        def connection_created(self, event):
+            stats.created += 1
+
+        def connection_ready(self, event): pass
+
+        def connection_closed(self, event):
+            stats.closed += 1
+
+        def connection_check_out_started(self, event):
+            stats.waiting += 1
+
+        def connection_check_out_failed(self, event):
+            stats.waiting -= 1
+            stats.checkout_failures += 1
+
+        def connection_checked_out(self, event):
+            stats.waiting -= 1
+            stats.checked_out += 1
+            stats.checkouts += 1
+
+        def connection_checked_in(self, event):
+            stats.checked_out -= 1
+
+    return PoolListener()
+
+
+def _command_listener():
+    """Crea un listener de comandos de pymongo que mide la latencia por colección."""
+    from pymongo import monitoring
+
+    class CommandListener(monitoring.CommandListener):
+        def __init__(self):
+            # Colección de cada comando en curso, hasta recibir su resultado
+            self._collections: Dict[tuple, str] = {}
+
+        def started(self, event):
+            if event.command_name == "getMore":
+                collection = event.command.get("collection")
+            else:
+                collection = event.command.get(event.command_name)
+            if isinstance(collection, str):
+                self._collections[(event.connection_id, event.request_id)] = collection
+
+        def succeeded(self, event):
+            self._observe(event, "ok")
+
+        def failed(self, event):
+            self._observe(event, "error")
+
+        def _observe(self, event, status: str):
+            # Los comandos sin colección (ping, hello, ...) no se registran
+            collection = self._collections.pop((event.connection_id, event.request_id), None)
+            if collection is not None:
+                MONGO_OPERATION_SECONDS.labels(collection, event.command_name, status).observe(
+                    event.duration_micros / 1_000_000
+                )
+
+    return CommandListener()
+
+
 class Database:
-    client: Optional[AsyncIOMotorClient] = None
+    """
+    Cliente MongoDB compartido por todo el proceso.
+
+    Todos los componentes (repositorios, DataProcessor, AuthService, CLIs)
+    obtienen la base de datos de aquí, de modo que el proceso usa un único pool
+    acotado por MONGO_MAX_POOL_SIZE. Las consultas analíticas pueden ir por un
+    segundo pool, más chico y con preferencia de lectura en secundarios.
+    """
+    client: Optional["AsyncIOMotorClient"] = None
     db = None
+    analytics_client: Optional["AsyncIOMotorClient"] = None
+    analytics_db = None
+    pool_stats: Dict[str, PoolStats] = {}
+
+    @classmethod
+    def _create_client(cls, name: str, max_pool_size: int, min_pool_size: int, **options) -> "AsyncIOMotorClient":
+        """Crea un cliente Motor con la configuración común y métricas de pool."""
+        # Importación diferida: motor/pymongo solo se cargan si se usa MongoDB
+        from motor.motor_asyncio import AsyncIOMotorClient # type: ignore
+        
+        # Usar la URL de MongoDB Atlas desde las variables de entorno
+        mongo_url = os.getenv("MONGODB_URI")
+        if not mongo_url:
+            raise ValueError("MONGODB_URI no está configurada en las variables de entorno")
+        
+        stats = cls.pool_stats[name] = PoolStats(name, max_pool_size)
+        listeners = [_pool_listener(stats)]
+        if Config.ENABLE_METRICS:
+            listeners.append(_command_listener())
+        
+        # Configurar el cliente con SSL y certificados
+        return AsyncIOMotorClient(
+            mongo_url,
+            tls=True,
+            tlsCAFile=certifi.where(),
+            tlsAllowInvalidCertificates=True,
+            serverSelectionTimeoutMS=5000,
+            connectTimeoutMS=5000,
+            socketTimeoutMS=5000,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            maxIdleTimeMS=30000,
+            waitQueueTimeoutMS=5000,
+            event_listeners=listeners,
+            appname=f"stream_views-{name}",
+            **options
+        )
+
+    @classmethod
+    def get_client(cls) -> "AsyncIOMotorClient":
+        """Obtiene el cliente compartido, creándolo si hace falta (sin verificar la conexión)."""
+        if cls.client is None:
+            cls.client = cls._create_client("primary", Config.MONGO_MAX_POOL_SIZE, Config.MONGO_MIN_POOL_SIZE)
+            cls.db = cls.client[DATABASE_NAME]
+        return cls.client
 
     @classmethod
     async def connect_to_database(cls):
         """Conecta a la base de datos MongoDB."""
         try:
-            if cls.client is None:
-                # Usar la URL de MongoDB Atlas desde las variables de entorno
-                mongo_url = os.getenv("MONGODB_URI")
-                if not mongo_url:
-                    raise ValueError("MONGODB_URI no está configurada en las variables de entorno")
-                
-                # Configurar el cliente con SSL y certificados
-                cls.client = AsyncIOMotorClient(
-                    mongo_url,
-                    tls=True,
-                    tlsCAFile=certifi.where(),
-                    tlsAllowInvalidCertificates=True,
-                    serverSelectionTimeoutMS=5000,
-                    connectTimeoutMS=5000,
-                    socketTimeoutMS=5000,
-                    maxPoolSize=50,
-                    minPoolSize=10,
-                    maxIdleTimeMS=30000,
-                    waitQueueTimeoutMS=5000
-                )
+            if cls.db is None:
+                cls.get_client()
                 
                 # Verificar la conexión
                 await cls.client.admin.command('ping')
-                cls.db = cls.client.stream_views
                 logger.info("Conectado a MongoDB Atlas!")
         except Exception as e:
             logger.error(f"Error al conectar con MongoDB: {str(e)}")
@@ -48,19 +190,56 @@ class Database:
 
     @classmethod
     async def close_database_connection(cls):
-        """Cierra la conexión a la base de datos."""
+        """Cierra las conexiones a la base de datos."""
+        if cls.analytics_client is not None:
+            cls.analytics_client.close()
+            cls.analytics_client = None
+            cls.analytics_db = None
         if cls.client is not None:
             cls.client.close()
             cls.client = None
+            cls.db = None
             logger.info("Conexión a MongoDB cerrada!")
 
     @classmethod
     def get_database(cls):
-        """Retorna la instancia de la base de datos."""
+        """
+        Retorna la base de datos del cliente compartido.
+        
+        El cliente se crea al primer uso; las conexiones se abren cuando se
+        ejecuta la primera operación.
+        """
         if cls.db is None:
-            raise RuntimeError("La base de datos no está inicializada. Llame a connect_to_database primero.")
+            cls.get_client()
         return cls.db
 
+    @classmethod
+    def get_analytics_database(cls):
+        """
+        Retorna la base de datos para consultas analíticas de solo lectura.
+        
+        Si MONGO_ANALYTICS_POOL está activo usa un cliente aparte con su propio
+        pool (MONGO_ANALYTICS_MAX_POOL_SIZE) y preferencia de lectura
+        MONGO_ANALYTICS_READ_PREFERENCE, para que los análisis pesados no
+        compitan con las escrituras; si no, la base de datos principal.
+        """
+        if not Config.MONGO_ANALYTICS_POOL:
+            return cls.get_database()
+        if cls.analytics_db is None:
+            cls.analytics_client = cls._create_client(
+                "analytics",
+                Config.MONGO_ANALYTICS_MAX_POOL_SIZE,
+                0,
+                readPreference=Config.MONGO_ANALYTICS_READ_PREFERENCE
+            )
+            cls.analytics_db = cls.analytics_client[DATABASE_NAME]
+        return cls.analytics_db
+
+    @classmethod
+    def get_pool_stats(cls) -> Dict[str, Dict[str, int]]:
+        """Métricas de los pools de conexiones, por nombre de pool."""
+        return {name: stats.as_dict() for name, stats in cls.pool_stats.items()}
+
 # Obtener la URL de MongoDB desde las variables de entorno
 MONGODB_URL = os.getenv('MONGODB_URL', 'mongodb://localhost:27017')
 
@@ -0,0 +1,64 @@
+from typing import Tuple
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Selecciona puntos de una serie con Largest-Triangle-Three-Buckets.
+
+    Conserva el primer y el último punto y, en cada cubeta intermedia, el punto
+    que forma el triángulo de mayor área con el punto elegido anterior y el
+    promedio de la cubeta siguiente. Preserva picos y valles mucho mejor que un
+    muestreo uniforme o un promedio.
+
+    Args:
+        x (np.ndarray): Coordenadas X ordenadas (por ejemplo timestamps en ms)
+        y (np.ndarray): Valores
+        threshold (int): Cantidad de puntos deseada
+
+    Returns:
+        np.ndarray: Índices de los puntos seleccionados, en orden
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(areas.argmax())
+        selected[i + 1] = a
+
+    return selected
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce una serie a `threshold` puntos con LTTB.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (x, y) reducidos, con los tipos originales
+    """
+    indices = lttb_indices(x, y, threshold)
+    return np.asarray(x)[indices], np.asarray(y)[indices]
@@ -0,0 +1,109 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from numbers import Number
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from .logger import logger
+
+NAMESPACE = "stream_views"
+
+# Registro propio: solo expone las métricas de la aplicación
+registry = CollectorRegistry(auto_describe=True)
+
+# Llamadas a la API de YouTube por endpoint ("videos.list", ...) y resultado ("ok", código HTTP o "error")
+YOUTUBE_REQUEST_SECONDS = Histogram(
+    "youtube_request_seconds", "Latencia de las llamadas a la API de YouTube",
+    ["endpoint", "status"], namespace=NAMESPACE, registry=registry,
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+YOUTUBE_QUOTA_UNITS = Counter(
+    "youtube_quota_units", "Unidades de cuota de la API de YouTube consumidas",
+    ["endpoint"], namespace=NAMESPACE, registry=registry
+)
+
+# Ciclo de sondeo de métricas
+POLL_CYCLE_SECONDS = Histogram(
+    "poll_cycle_seconds", "Duración de un ciclo completo de sondeo",
+    namespace=NAMESPACE, registry=registry,
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+POLL_LAG_SECONDS = Histogram(
+    "poll_lag_seconds", "Retraso del inicio de cada ciclo de sondeo respecto de su horario",
+    namespace=NAMESPACE, registry=registry,
+    buckets=(0.01, 0.1, 0.5, 1, 5, 10, 30, 60)
+)
+
+# Operaciones de MongoDB por colección, comando y resultado
+MONGO_OPERATION_SECONDS = Histogram(
+    "mongo_operation_seconds", "Latencia de los comandos de MongoDB",
+    ["collection", "command", "status"], namespace=NAMESPACE, registry=registry,
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+# Actualizaciones de la interfaz en el servidor, por componente
+UI_RENDER_SECONDS = Histogram(
+    "ui_render_seconds", "Tiempo de actualización de la interfaz en el servidor",
+    ["component"], namespace=NAMESPACE, registry=registry,
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+StatsSource = Callable[[], Dict]
+
+
+class StatsCollector:
+    """
+    Expone como métricas los `stats()` que ya publican los componentes.
+
+    Cada fuente se consulta en el momento del scrape, así que los componentes
+    no necesitan conocer Prometheus: basta con registrar su función de stats.
+    """
+
+    def __init__(self):
+        self._sources: List[Tuple[str, StatsSource, frozenset, Optional[str]]] = []
+
+    def register(self, name: str, source: StatsSource, counters: Iterable[str] = (),
+                 label: Optional[str] = None) -> None:
+        """
+        Registra una fuente de stats.
+
+        Args:
+            name (str): Prefijo de las métricas (p. ej. "password_hasher")
+            source (StatsSource): Función que devuelve un dict de valores numéricos,
+                o {valor_de_etiqueta: dict} si se indica `label`
+            counters (Iterable[str]): Claves que son contadores acumulados (el resto son gauges)
+            label (Optional[str]): Nombre de la etiqueta para fuentes con varias instancias
+        """
+        self._sources.append((name, source, frozenset(counters), label))
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        for name, source, counters, label in self._sources:
+            try:
+                stats = source()
+            except Exception as e:
+                logger.error(f"Error al obtener métricas de {name}: {str(e)}")
+                continue
+
+            rows = stats.items() if label else [(None, stats)]
+            families: Dict[str, object] = {}
+            for label_value, values in rows:
+                for key, value in values.items():
+                    if not isinstance(value, Number):
+                        continue
+                    family = families.get(key)
+                    if family is None:
+                        metric_name = f"{NAMESPACE}_{name}_{key}"
+                        kind = CounterMetricFamily if key in counters else GaugeMetricFamily
+                        family = families[key] = kind(metric_name, f"{name}: {key}", labels=[label] if label else [])
+                    family.add_metric([str(label_value)] if label else [], float(value))
+            yield from families.values()
+
+
+stats_collector = StatsCollector()
+registry.register(stats_collector)
+
+
+def render_metrics() -> bytes:
+    """Genera la exposición de todas las métricas en formato de texto de Prometheus."""
+    return generate_latest(registry)
@@ -0,0 +1,117 @@
+from typing import Callable, Dict, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import os
+import time
+from passlib.context import CryptContext
+from .config import Config
+from .logger import logger
+
+T = TypeVar("T")
+
+
+class HashingQueueFull(Exception):
+    """La cola de operaciones de contraseña alcanzó su límite."""
+
+
+class PasswordHasher:
+    """
+    Hash y verificación de contraseñas bcrypt fuera del bucle de eventos.
+
+    Cada operación bcrypt consume cientos de milisegundos de CPU. Se ejecutan
+    en un pool de hilos acotado (bcrypt libera el GIL mientras calcula, así que
+    el rendimiento escala con los núcleos) y las solicitudes que exceden la
+    cola máxima se rechazan en lugar de acumularse.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        """
+        Inicializa el pool.
+
+        Args:
+            max_workers (int): Operaciones bcrypt simultáneas
+            max_queue (int): Operaciones en espera admitidas antes de rechazar
+        """
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+        # Métricas
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Operaciones esperando un hilo libre."""
+        return max(0, self.in_flight - self.max_workers)
+
+    async def hash(self, password: str) -> str:
+        """Genera el hash de una contraseña."""
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verifica si la contraseña coincide con el hash."""
+        return await self._submit(self.context.verify, password, hashed_password)
+
+    async def _submit(self, func: Callable[..., T], *args) -> T:
+        # Con max_queue = 0 se admiten solo las operaciones que tienen un hilo libre
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Cola de contraseñas llena ({self.in_flight} operaciones en curso)")
+            raise HashingQueueFull("Demasiadas operaciones de contraseña en curso")
+
+        submitted = time.perf_counter()
+        started: Dict[str, float] = {}
+
+        def run() -> T:
+            started["at"] = time.perf_counter()
+            return func(*args)
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, run)
+        finally:
+            self.in_flight -= 1
+            finished = time.perf_counter()
+            if "at" in started:
+                self.completed += 1
+                self._wait_seconds += started["at"] - submitted
+                self._run_seconds += finished - started["at"]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Obtiene las métricas del pool.
+
+        Returns:
+            Dict[str, float]: Operaciones en curso, en cola, completadas, rechazadas
+            y tiempos promedio de espera y de cálculo en milisegundos
+        """
+        completed = self.completed or 1
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self._wait_seconds / completed * 1000,
+            "avg_run_ms": self._run_seconds / completed * 1000,
+        }
+
+    def shutdown(self) -> None:
+        """Libera los hilos del pool."""
+        self._executor.shutdown(wait=False)
+
+
+# Instancia global del pool de contraseñas
+password_hasher = PasswordHasher(
+    Config.PASSWORD_HASH_WORKERS or (os.cpu_count() or 1),
+    Config.PASSWORD_HASH_MAX_QUEUE
+)
@@ -0,0 +1,122 @@
+from typing import Counter as CounterType, Dict, Tuple
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import os
+import sys
+import threading
+import time
+from .config import Config
+from .logger import logger
+
+
+class ProfilerBusy(Exception):
+    """Ya hay una captura del profiler en curso."""
+
+
+def _frame_label(code) -> str:
+    """Etiqueta de un frame: función y archivo (últimos dos componentes) con su primera línea."""
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    filename = "/".join(parts[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """
+    Profiler de muestreo por tiempo de reloj, activable bajo demanda.
+
+    Un hilo aparte toma cada PROFILE_INTERVAL_MS la pila de todos los hilos
+    del proceso (incluido el del bucle de eventos) y cuenta las pilas
+    repetidas. El resultado se guarda en formato "collapsed stacks"
+    (`hilo;función_raíz;...;función_hoja cantidad`), que leen directamente
+    flamegraph.pl, speedscope e inferno. No requiere reiniciar el proceso ni
+    instrumentar el código, y fuera de una captura no tiene costo.
+    """
+
+    def __init__(self, output_path: str, interval: float):
+        """
+        Inicializa el profiler.
+
+        Args:
+            output_path (str): Directorio donde se guardan las capturas
+            interval (float): Segundos entre muestras
+        """
+        self.output_path = Path(output_path)
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def capture(self, seconds: float) -> Dict:
+        """
+        Captura un perfil durante `seconds` segundos sin bloquear el bucle de eventos.
+
+        Args:
+            seconds (float): Duración de la captura
+
+        Returns:
+            Dict: Archivo generado, cantidad de muestras y pilas distintas
+
+        Raises:
+            ProfilerBusy: Si ya hay una captura en curso
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("Ya hay una captura del profiler en curso")
+        try:
+            logger.info(f"Captura del profiler iniciada ({seconds:g} s)")
+            stacks, samples = await asyncio.to_thread(self._sample, seconds, threading.get_ident())
+            path = await asyncio.to_thread(self._write, stacks, seconds)
+            logger.info(f"Captura del profiler guardada en {path} ({samples} muestras)")
+            return {"file": path.name, "samples": samples, "stacks": len(stacks), "seconds": seconds}
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, loop_thread: int) -> Tuple[CounterType[str], int]:
+        own = threading.get_ident()
+        stacks: CounterType[str] = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                thread_name = "event-loop" if thread_id == loop_thread else names.get(thread_id, str(thread_id))
+                labels.append(thread_name.replace(";", ":").replace(" ", "_"))
+                stacks[";".join(reversed(labels))] += 1
+            samples += 1
+            time.sleep(self.interval)
+        return stacks, samples
+
+    def _write(self, stacks: CounterType[str], seconds: float) -> Path:
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        path = self.output_path / f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{seconds:g}s.folded"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp_path, path)
+        return path
+
+    def path_for(self, name: str) -> Path:
+        """
+        Ruta de una captura existente.
+
+        Raises:
+            FileNotFoundError: Si el nombre no corresponde a una captura del directorio
+        """
+        path = self.output_path / name
+        if path.parent != self.output_path or path.suffix != ".folded" or not path.is_file():
+            raise FileNotFoundError(name)
+        return path
+
+
+# Instancia global del profiler
+sampling_profiler = SamplingProfiler(Config.PROFILE_OUTPUT_PATH, Config.PROFILE_INTERVAL_MS / 1000)
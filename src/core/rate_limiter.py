@@ -0,0 +1,165 @@
+from typing import Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import time
+from .config import Config
+from .logger import logger
+
+
+class RateLimitExceeded(Exception):
+    """Se superó el límite de solicitudes para una clave."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    Limitador de tasa por clave con GCRA (equivalente a un token bucket).
+
+    Por cada clave solo se guarda el "tiempo teórico de llegada" (TAT) del
+    próximo permiso, así que verificar una solicitud es O(1) y no requiere
+    recorrer ni reconstruir el estado. Las claves cuyo balde ya se llenó por
+    completo no aportan información y se descartan; el total de claves está
+    acotado por `max_keys` (LRU).
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_keys: int = 100000):
+        """
+        Inicializa el limitador.
+
+        Args:
+            name (str): Nombre para logs y métricas
+            rate (float): Permisos que se reponen por segundo
+            burst (int): Permisos que se pueden consumir de una vez (capacidad del balde)
+            max_keys (int): Cantidad máxima de claves con estado
+        """
+        if rate <= 0 or burst <= 0:
+            raise ValueError("rate y burst deben ser mayores que 0")
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._interval = 1.0 / rate
+        self._tolerance = burst * self._interval
+        self._tat: "OrderedDict[Hashable, float]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    def _expire_oldest(self, now: float) -> None:
+        """Descarta la clave menos usada si su balde ya está lleno (amortizado O(1))."""
+        if self._tat:
+            key, tat = next(iter(self._tat.items()))
+            if tat <= now:
+                del self._tat[key]
+
+    def _store(self, key: Hashable, tat: float) -> None:
+        self._tat[key] = tat
+        self._tat.move_to_end(key)
+        while len(self._tat) > self.max_keys:
+            self._tat.popitem(last=False)
+
+    def acquire(self, key: Hashable = "global", cost: int = 1) -> Tuple[bool, float]:
+        """
+        Intenta consumir permisos sin esperar.
+
+        Args:
+            key (Hashable): Clave del cliente o recurso
+            cost (int): Permisos a consumir
+
+        Returns:
+            Tuple[bool, float]: Si se concedió y, si no, segundos hasta que se pueda reintentar
+        """
+        now = time.monotonic()
+        self._expire_oldest(now)
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + cost * self._interval
+        allow_at = new_tat - self._tolerance
+        if allow_at > now:
+            self.rejected += 1
+            return False, allow_at - now
+        self._store(key, new_tat)
+        self.allowed += 1
+        return True, 0.0
+
+    def reserve(self, key: Hashable = "global", cost: int = 1) -> float:
+        """
+        Reserva permisos aunque estén en el futuro.
+
+        Las reservas se encadenan en orden de llegada, de modo que varios
+        llamadores concurrentes quedan espaciados según la tasa.
+
+        Returns:
+            float: Segundos que hay que esperar antes de usar los permisos
+        """
+        now = time.monotonic()
+        self._expire_oldest(now)
+        tat = max(self._tat.get(key, now), now)
+        new_tat = tat + cost * self._interval
+        self._store(key, new_tat)
+        self.allowed += 1
+        return max(0.0, new_tat - self._tolerance - now)
+
+    async def wait(self, key: Hashable = "global", cost: int = 1, max_wait: Optional[float] = None) -> None:
+        """
+        Espera hasta que haya permisos disponibles (para llamadas salientes).
+
+        Args:
+            key (Hashable): Clave del recurso
+            cost (int): Permisos a consumir
+            max_wait (Optional[float]): Espera máxima; si se supera se lanza RateLimitExceeded
+
+        Raises:
+            RateLimitExceeded: Si la espera necesaria supera `max_wait`
+        """
+        if max_wait is not None:
+            allowed, retry_after = self.acquire(key, cost)
+            if allowed:
+                return
+            if retry_after > max_wait:
+                logger.warning(f"Límite de {self.name} alcanzado para {key}: espera de {retry_after:.2f} s")
+                raise RateLimitExceeded(f"Límite de {self.name} alcanzado", retry_after)
+            # acquire() ya contó el rechazo; la reserva lo convierte en una espera
+            self.rejected -= 1
+        delay = self.reserve(key, cost)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Obtiene las métricas del limitador.
+
+        Returns:
+            Dict[str, float]: Tasa, ráfaga, claves con estado, permisos concedidos y rechazados
+        """
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "keys": len(self._tat),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+# Límite de solicitudes entrantes por cliente (MAX_REQUESTS_PER_HOUR por ventana)
+api_limiter = RateLimiter(
+    "api",
+    Config.MAX_REQUESTS_PER_HOUR / Config.API_RATE_LIMIT_WINDOW,
+    Config.MAX_REQUESTS_PER_HOUR
+)
+
+# Límite de las rutas públicas de lectura por cliente (más holgado: la interfaz pide
+# una miniatura por tarjeta y los clientes de la API sondean)
+read_limiter = RateLimiter(
+    "read",
+    Config.READ_REQUESTS_PER_SECOND,
+    Config.READ_BURST
+)
+
+# Límite de llamadas salientes a la API de YouTube, compartido por todo el proceso
+youtube_limiter = RateLimiter(
+    "youtube",
+    Config.YOUTUBE_REQUESTS_PER_SECOND,
+    Config.YOUTUBE_BURST
+)
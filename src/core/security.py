@@ -1,11 +1,14 @@
 import os
 import re
 import hashlib
+import inspect
 import secrets
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 from functools import wraps
+from fastapi import HTTPException, Request, status
+from .config import Config
 from .logger import logger
+from .rate_limiter import RateLimiter, RateLimitExceeded, api_limiter
 
 class SecurityManager:
     """
@@ -17,9 +20,9 @@ class SecurityManager:
     
     def __init__(self):
         """Inicializa el gestor de seguridad."""
-        self.rate_limits = {}
-        self.max_requests = 100  # Máximo de requests por ventana de tiempo
-        self.time_window = 3600  # Ventana de tiempo en segundos (1 hora)
+        self.rate_limiter = api_limiter
+        self.max_requests = Config.MAX_REQUESTS_PER_HOUR  # Máximo de requests por ventana de tiempo
+        self.time_window = Config.API_RATE_LIMIT_WINDOW  # Ventana de tiempo en segundos
         self.api_key = os.getenv('YOUTUBE_API_KEY')
         if not self.api_key:
             logger.warning("No se encontró la clave API de YouTube en las variables de entorno")
@@ -72,26 +75,8 @@ class SecurityManager:
         Returns:
             bool: True si la IP está dentro del límite, False si lo ha excedido
         """
-        now = datetime.now()
-        
-        # Limpiar entradas antiguas
-        self.rate_limits = {
-            k: v for k, v in self.rate_limits.items()
-            if now - v['timestamp'] < timedelta(seconds=self.time_window)
-        }
-        
-        if ip not in self.rate_limits:
-            self.rate_limits[ip] = {
-                'count': 1,
-                'timestamp': now
-            }
-            return True
-        
-        if self.rate_limits[ip]['count'] >= self.max_requests:
-            return False
-        
-        self.rate_limits[ip]['count'] += 1
-        return True
+        allowed, _ = self.rate_limiter.acquire(ip)
+        return allowed
     
     def generate_csrf_token(self) -> str:
         """
@@ -141,45 +126,120 @@ class SecurityManager:
         pattern = r'^AIza[0-9A-Za-z-_]{35}$'
         return bool(re.match(pattern, self.api_key))
 
+def client_key(request: Request) -> str:
+    """
+    Obtiene la clave de rate limiting de un request: la IP del cliente.
+    
+    X-Forwarded-For solo se usa con TRUST_PROXY_HEADERS activo, ya que el
+    cliente puede falsificarlo si no hay un proxy de confianza delante.
+    
+    Args:
+        request (Request): Request entrante
+        
+    Returns:
+        str: IP del cliente
+    """
+    if Config.TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "desconocido"
+
+def _find_request(args: Tuple, kwargs: Dict[str, Any]) -> Optional[Request]:
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, Request):
+            return value
+    return None
+
 def require_api_key(func):
     """
     Decorador para proteger endpoints que requieren clave API.
     
+    Admite funciones síncronas y asíncronas.
+    
     Args:
         func: Función a decorar
         
     Returns:
         function: Función decorada
     """
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        security = SecurityManager()
-        if not security.validate_api_key():
+    def check():
+        if not security_manager.validate_api_key():
             logger.error("Intento de acceso sin clave API válida")
             raise ValueError("API key no válida o no configurada")
+    
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            check()
+            return await func(*args, **kwargs)
+        return async_wrapper
+    
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        check()
         return func(*args, **kwargs)
     return wrapper
 
-def rate_limit(func):
+def rate_limit(func: Optional[Callable] = None, *, limiter: Optional[RateLimiter] = None,
+               key: Optional[Callable[..., Hashable]] = None, cost: int = 1):
     """
     Decorador para implementar rate limiting.
     
+    Se usa como `@rate_limit` o `@rate_limit(limiter=..., key=...)`. El estado
+    vive en el limitador compartido (por defecto `api_limiter`), no en el
+    decorador. Si la función recibe un `Request` (rutas de FastAPI, que deben
+    declarar el parámetro), la clave es la IP del cliente y un exceso responde
+    429 con Retry-After; en otro caso la clave es `key(*args, **kwargs)` o
+    "global" y un exceso lanza RateLimitExceeded.
+    
     Args:
         func: Función a decorar
+        limiter (Optional[RateLimiter]): Limitador a usar
+        key (Optional[Callable]): Obtiene la clave a partir de los argumentos
+        cost (int): Permisos que consume cada llamada
         
     Returns:
         function: Función decorada
     """
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        security = SecurityManager()
-        # En una aplicación real, obtendríamos la IP del request
-        ip = "127.0.0.1"  # IP de ejemplo
-        if not security.check_rate_limit(ip):
-            logger.warning(f"Rate limit excedido para IP: {ip}")
-            raise Exception("Demasiadas solicitudes. Por favor, intente más tarde.")
-        return func(*args, **kwargs)
-    return wrapper
+    def decorator(func):
+        def check(args, kwargs):
+            request = _find_request(args, kwargs)
+            if key is not None:
+                limit_key = key(*args, **kwargs)
+            elif request is not None:
+                limit_key = client_key(request)
+            else:
+                limit_key = "global"
+            
+            allowed, retry_after = (limiter or api_limiter).acquire(limit_key, cost)
+            if allowed:
+                return
+            logger.warning(f"Rate limit excedido para: {limit_key}")
+            if request is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Demasiadas solicitudes. Por favor, intente más tarde.",
+                    headers={"Retry-After": str(max(1, round(retry_after)))}
+                )
+            raise RateLimitExceeded("Demasiadas solicitudes. Por favor, intente más tarde.", retry_after)
+        
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                check(args, kwargs)
+                return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            check(args, kwargs)
+            return func(*args, **kwargs)
+        return wrapper
+    
+    if func is not None:
+        return decorator(func)
+    return decorator
 
 # Instancia global del gestor de seguridad
 security_manager = SecurityManager() 
\ No newline at end of file
@@ -0,0 +1,58 @@
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicación de operaciones asíncronas concurrentes por clave.
+
+    Mientras una operación está en curso, los demás llamadores con la misma
+    clave esperan ese mismo resultado (o excepción) en lugar de repetirla. El
+    resultado no se guarda: la siguiente llamada tras completarse vuelve a
+    ejecutar la operación.
+    """
+
+    def __init__(self):
+        """Inicializa el registro de operaciones en curso."""
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ejecuta `factory()` o se une a la ejecución en curso con la misma clave.
+
+        Args:
+            key (Hashable): Clave de la operación
+            factory (Callable[[], Awaitable[T]]): Crea la corrutina a ejecutar
+
+        Returns:
+            T: Resultado de la operación compartida
+        """
+        self.calls += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.shared += 1
+        else:
+            future = asyncio.ensure_future(factory())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: si un llamador se cancela, la operación sigue para los demás
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Obtiene las métricas de deduplicación.
+
+        Returns:
+            Dict[str, float]: Llamadas, llamadas que compartieron una operación,
+            proporción compartida y operaciones en curso
+        """
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "shared_rate": self.shared / self.calls if self.calls else 0.0,
+            "in_flight": len(self._in_flight),
+        }
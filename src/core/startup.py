@@ -0,0 +1,52 @@
+from typing import List, Tuple
+from contextlib import contextmanager
+import time
+from .logger import logger
+
+
+class StartupTimer:
+    """
+    Mide la duración de cada fase del arranque del proceso.
+
+    La medición comienza al importar este módulo, por lo que debe importarse
+    antes que el resto de la aplicación para incluir el costo de las importaciones.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        """
+        Registra una fase que terminó ahora y comenzó al final de la anterior.
+
+        Returns:
+            float: Duración de la fase en segundos
+        """
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self.phases.append((name, elapsed))
+        self._last = now
+        return elapsed
+
+    @contextmanager
+    def phase(self, name: str):
+        """Registra la duración del bloque como una fase."""
+        self._last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def report(self) -> str:
+        """Registra en el log y devuelve el resumen de tiempos del arranque."""
+        total = time.perf_counter() - self.started
+        lines = [f"  {name:<24} {elapsed * 1000:8.1f} ms" for name, elapsed in self.phases]
+        summary = "\n".join(["Tiempos de arranque:", *lines, f"  {'total':<24} {total * 1000:8.1f} ms"])
+        logger.info(summary)
+        return summary
+
+
+# Instancia global del medidor de arranque
+startup_timer = StartupTimer()
@@ -0,0 +1,202 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import threading
+import numpy as np
+from .config import Config
+
+# Los timestamps se guardan como milisegundos UTC (datetimes naive en UTC, como datetime.utcnow())
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_millis(timestamp: datetime) -> int:
+    """Convierte un datetime (naive en UTC o con zona horaria) a milisegundos desde la época."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // timedelta(milliseconds=1)
+
+
+def from_millis(millis: int) -> datetime:
+    """Convierte milisegundos desde la época a datetime naive en UTC."""
+    return _EPOCH + timedelta(milliseconds=int(millis))
+
+
+def to_local(timestamp: datetime) -> datetime:
+    """Convierte un datetime naive en UTC a la hora local del servidor (naive), para mostrarlo."""
+    return timestamp.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def local_to_utc(timestamp: datetime) -> datetime:
+    """Convierte un datetime naive en hora local del servidor a naive en UTC."""
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def local_offset_millis() -> int:
+    """Diferencia actual entre la hora local del servidor y UTC, en milisegundos."""
+    now = datetime.utcnow()
+    return to_millis(to_local(now)) - to_millis(now)
+
+
+class RingBuffer:
+    """
+    Buffer circular de capacidad fija para una serie (timestamp, viewers).
+
+    Cada muestra se escribe dos veces (en i y en i + capacidad), de modo que la
+    ventana activa siempre es un bloque contiguo del arreglo: las lecturas son
+    vistas sin copia y las búsquedas por tiempo son binarias sobre datos ordenados.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Inicializa el buffer.
+
+        Args:
+            capacity (int): Cantidad máxima de muestras retenidas
+        """
+        self.capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._viewers = np.zeros(2 * capacity, dtype=np.int32)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp_ms: int, viewers: int) -> bool:
+        """
+        Agrega una muestra en O(1).
+
+        Las muestras deben llegar en orden: una muestra con el mismo timestamp
+        que la última la reemplaza y una más antigua se descarta.
+
+        Returns:
+            bool: True si la serie cambió
+        """
+        if self._size:
+            last = self._start + self._size - 1
+            last_ts = self._timestamps[last]
+            if timestamp_ms < last_ts:
+                return False
+            if timestamp_ms == last_ts:
+                self._write(last % self.capacity, timestamp_ms, viewers)
+                return True
+
+        if self._size < self.capacity:
+            slot = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._write(slot, timestamp_ms, viewers)
+        return True
+
+    def _write(self, slot: int, timestamp_ms: int, viewers: int) -> None:
+        self._timestamps[slot] = self._timestamps[slot + self.capacity] = timestamp_ms
+        self._viewers[slot] = self._viewers[slot + self.capacity] = viewers
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve vistas de solo lectura de toda la serie en orden cronológico.
+
+        Las vistas comparten memoria con el buffer; copiarlas si deben
+        conservarse más allá de las siguientes escrituras.
+        """
+        end = self._start + self._size
+        timestamps = self._timestamps[self._start:end]
+        viewers = self._viewers[self._start:end]
+        timestamps.flags.writeable = False
+        viewers.flags.writeable = False
+        return timestamps, viewers
+
+    def window(self, start_ms: Optional[int] = None,
+               end_ms: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve las muestras con start_ms <= timestamp <= end_ms en O(log n).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Vistas (timestamps int64, viewers int32)
+        """
+        timestamps, viewers = self.view()
+        lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side="left"))
+        hi = len(timestamps) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side="right"))
+        return timestamps[lo:hi], viewers[lo:hi]
+
+    def latest(self) -> Optional[Tuple[int, int]]:
+        """Devuelve la última muestra (timestamp_ms, viewers) o None si está vacío."""
+        if not self._size:
+            return None
+        last = self._start + self._size - 1
+        return int(self._timestamps[last]), int(self._viewers[last])
+
+
+class TimeSeriesStore:
+    """
+    Almacén en memoria de las series recientes de viewers, un RingBuffer por stream.
+
+    Es la fuente compartida para el gráfico, los análisis y las alertas.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Inicializa el almacén.
+
+        Args:
+            capacity (int): Muestras retenidas por stream
+        """
+        self.capacity = capacity
+        self._buffers: Dict[str, RingBuffer] = {}
+        self._lock = threading.Lock()
+
+    def append(self, stream_id: str, viewers: int, timestamp: Optional[datetime] = None) -> bool:
+        """
+        Registra una muestra de viewers para un stream.
+
+        Args:
+            stream_id (str): ID del stream
+            viewers (int): Viewers concurrentes
+            timestamp (Optional[datetime]): Momento de la muestra en UTC (ahora por defecto)
+
+        Returns:
+            bool: True si la serie cambió
+        """
+        buffer = self._buffers.get(stream_id)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(stream_id, RingBuffer(self.capacity))
+        return buffer.append(to_millis(timestamp or datetime.utcnow()), viewers)
+
+    def window(self, stream_id: str, start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Obtiene las muestras de un stream en un rango, como vistas sin copia.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (timestamps en ms, viewers); vacías si no hay datos
+        """
+        buffer = self._buffers.get(stream_id)
+        if buffer is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)
+        return buffer.window(
+            to_millis(start) if start else None,
+            to_millis(end) if end else None
+        )
+
+    def latest(self, stream_id: str) -> Optional[Tuple[datetime, int]]:
+        """Obtiene la última muestra (timestamp, viewers) de un stream."""
+        buffer = self._buffers.get(stream_id)
+        sample = buffer.latest() if buffer else None
+        if sample is None:
+            return None
+        return from_millis(sample[0]), sample[1]
+
+    def stream_ids(self) -> List[str]:
+        """Lista los streams con datos en el almacén."""
+        return list(self._buffers)
+
+    def remove(self, stream_id: str) -> None:
+        """Descarta la serie de un stream."""
+        with self._lock:
+            self._buffers.pop(stream_id, None)
+
+
+# Instancia global del almacén de series
+timeseries_store = TimeSeriesStore(Config.TIMESERIES_CAPACITY)
@@ -0,0 +1,167 @@
+from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+import inspect
+import itertools
+import os
+import threading
+import time
+import orjson
+from .config import Config
+from .logger import logger
+
+# Span activo en la tarea o hilo actual (las tareas de asyncio heredan el contexto)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """Etapa medida de una operación, con su padre y atributos."""
+
+    __slots__ = ("name", "span_id", "parent_id", "trace_id", "attributes", "start", "_started")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = parent.trace_id if parent else self.span_id
+        self.attributes = attributes
+        self.start = time.time()
+        self._started = time.perf_counter()
+
+    def set(self, **attributes) -> None:
+        """Agrega atributos al span (p. ej. resultados conocidos al final)."""
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    """
+    Instrumentación liviana de las etapas del camino crítico.
+
+    Con TRACE_EXPORT=log cada span terminado se registra como una línea JSON;
+    con TRACE_EXPORT=file se agrega a un archivo en formato Trace Event de
+    Chrome (abrible en Perfetto o chrome://tracing). Con "off" los spans no
+    miden nada. Solo se exportan los spans de al menos TRACE_MIN_MS.
+    """
+
+    def __init__(self, export: str, file_path: str, min_ms: float):
+        """
+        Inicializa el tracer.
+
+        Args:
+            export (str): Destino de los spans: "off", "log" o "file"
+            file_path (str): Archivo de trazas para el destino "file"
+            min_ms (float): Duración mínima de un span para exportarlo
+        """
+        self.export = export
+        self.file_path = Path(file_path)
+        self.min_ms = min_ms
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.export != "off"
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Mide un bloque como span hijo del span activo.
+
+        Args:
+            name (str): Nombre de la etapa (p. ej. "youtube.get_stream_details")
+            **attributes: Atributos del span (video_id, colección, ...)
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            duration_ms = (time.perf_counter() - span._started) * 1000
+            if error:
+                span.attributes["error"] = error
+            if duration_ms >= self.min_ms:
+                self._emit(span, duration_ms)
+
+    def _emit(self, span: Span, duration_ms: float) -> None:
+        try:
+            if self.export == "log":
+                logger.info("span " + orjson.dumps({
+                    "name": span.name,
+                    "trace_id": span.trace_id,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "duration_ms": round(duration_ms, 3),
+                    **span.attributes
+                }, default=str).decode())
+            elif self.export == "file":
+                event = orjson.dumps({
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": int(span.start * 1_000_000),
+                    "dur": int(duration_ms * 1000),
+                    "pid": os.getpid(),
+                    "tid": span.trace_id,
+                    "args": {"span_id": span.span_id, "parent_id": span.parent_id, **span.attributes}
+                }, default=str)
+                self._write(event, flush=span.parent_id is None)
+        except Exception as e:
+            logger.error(f"Error al exportar span {span.name}: {str(e)}")
+
+    def _write(self, event: bytes, flush: bool) -> None:
+        with self._lock:
+            if self._file is None:
+                self.file_path.parent.mkdir(parents=True, exist_ok=True)
+                new_file = not self.file_path.exists() or self.file_path.stat().st_size == 0
+                self._file = open(self.file_path, "ab")
+                if new_file:
+                    # El formato admite omitir el "]" final, así el archivo es válido en todo momento
+                    self._file.write(b"[\n")
+            self._file.write(event + b",\n")
+            if flush:
+                self._file.flush()
+
+    def close(self) -> None:
+        """Cierra el archivo de trazas."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def traced(name: str):
+    """
+    Decorador que mide cada llamada a una función (síncrona o asíncrona) como span.
+
+    Args:
+        name (str): Nombre del span
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Instancia global del tracer
+tracer = Tracer(Config.TRACE_EXPORT, Config.TRACE_FILE_PATH, Config.TRACE_MIN_MS)
@@ -0,0 +1,81 @@
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+from collections import OrderedDict
+import time
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Caché en memoria con expiración por tiempo y tamaño máximo (LRU).
+
+    Lleva la cuenta de aciertos y fallos para reportar la tasa de aciertos.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        """
+        Inicializa la caché.
+
+        Args:
+            ttl (float): Segundos de validez de cada entrada
+            max_entries (int): Cantidad máxima de entradas
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Obtiene un valor vigente o None si no existe o expiró."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: V) -> None:
+        """Guarda un valor con el TTL de la caché."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Elimina una entrada. Devuelve True si existía."""
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+            return True
+        return False
+
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Obtiene las métricas de la caché.
+
+        Returns:
+            Dict[str, Any]: Tamaño, aciertos, fallos, tasa de aciertos, desalojos e invalidaciones
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -1,28 +1,65 @@
 import os
-from googleapiclient.discovery import build
+import threading
+import time
 from typing import Dict, Optional
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
+from .metrics import YOUTUBE_QUOTA_UNITS, YOUTUBE_REQUEST_SECONDS
+from .tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+# Costo en unidades de cuota de cada endpoint usado (según la tabla de cuotas de la API de YouTube)
+QUOTA_COSTS = {
+    "videos.list": 1,
+    "channels.list": 1,
+    "liveChatMessages.list": 5,
+}
+
 class YouTubeClient:
     def __init__(self):
         load_dotenv()
         self.api_key = os.getenv('YOUTUBE_API_KEY')
         if not self.api_key:
             raise ValueError("YOUTUBE_API_KEY no está configurada en las variables de entorno")
+        # Importación diferida: googleapiclient es costoso de cargar
+        from googleapiclient.discovery import build
         self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        # httplib2.Http no es seguro entre hilos: cada hilo usa su propia conexión
+        self._local = threading.local()
+
+    def _http(self):
+        """Conexión HTTP del hilo actual."""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            import httplib2
+            http = self._local.http = httplib2.Http()
+        return http
+
+    def _execute(self, endpoint: str, request):
+        """Ejecuta una solicitud a la API registrando su latencia, resultado y cuota."""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            with tracer.span(f"youtube.{endpoint}"):
+                return request.execute(http=self._http())
+        except Exception as e:
+            # HttpError expone el código HTTP en resp.status
+            status = str(getattr(getattr(e, "resp", None), "status", None) or "error")
+            raise
+        finally:
+            YOUTUBE_REQUEST_SECONDS.labels(endpoint, status).observe(time.perf_counter() - started)
+            YOUTUBE_QUOTA_UNITS.labels(endpoint).inc(QUOTA_COSTS.get(endpoint, 1))
 
     def get_live_metrics(self, video_id: str) -> dict:
         """Obtiene las métricas en vivo que se actualizan cada 10 segundos"""
         try:
             # Obtener estadísticas del video
-            video_response = self.youtube.videos().list(
+            video_response = self._execute("videos.list", self.youtube.videos().list(
                 part='liveStreamingDetails,statistics',
                 id=video_id
-            ).execute()
+            ))
 
             if not video_response['items']:
                 print(f"No se encontraron métricas en vivo para el video ID: {video_id}")
@@ -44,10 +81,10 @@ class YouTubeClient:
         """Obtiene los detalles del video que se actualizan cada 30 minutos"""
         try:
             print(f"Obteniendo detalles para el video ID: {video_id}")
-            video_response = self.youtube.videos().list(
+            video_response = self._execute("videos.list", self.youtube.videos().list(
                 part='snippet,contentDetails',
                 id=video_id
-            ).execute()
+            ))
 
             if not video_response['items']:
                 print(f"No se encontró información del video: {video_id}")
@@ -73,10 +110,10 @@ class YouTubeClient:
         """Obtiene los detalles del canal que se actualizan cada 24 horas"""
         try:
             # Primero obtenemos el ID del canal desde el video
-            video_response = self.youtube.videos().list(
+            video_response = self._execute("videos.list", self.youtube.videos().list(
                 part='snippet',
                 id=video_id
-            ).execute()
+            ))
 
             if not video_response['items']:
                 return {}
@@ -85,10 +122,10 @@ class YouTubeClient:
             print(f"Channel ID obtenido: {channel_id}")
 
             # Luego obtenemos los detalles del canal
-            channel_response = self.youtube.channels().list(
+            channel_response = self._execute("channels.list", self.youtube.channels().list(
                 part='snippet,statistics',
                 id=channel_id
-            ).execute()
+            ))
 
             if not channel_response['items']:
                 print(f"No se encontró información del canal: {channel_id}")
@@ -119,10 +156,10 @@ class YouTubeClient:
     def _get_live_chat_message_count(self, video_id: str) -> int:
         """Obtiene la cantidad de mensajes en el chat en vivo"""
         try:
-            video_response = self.youtube.videos().list(
+            video_response = self._execute("videos.list", self.youtube.videos().list(
                 part='liveStreamingDetails',
                 id=video_id
-            ).execute()
+            ))
 
             if not video_response['items']:
                 return 0
@@ -131,11 +168,11 @@ class YouTubeClient:
             if not live_chat_id:
                 return 0
 
-            chat_response = self.youtube.liveChatMessages().list(
+            chat_response = self._execute("liveChatMessages.list", self.youtube.liveChatMessages().list(
                 liveChatId=live_chat_id,
                 part='snippet',
                 maxResults=1
-            ).execute()
+            ))
 
             return chat_response.get('pageInfo', {}).get('totalResults', 0)
         except Exception as e:
@@ -168,7 +205,7 @@ class YouTubeClient:
                     part="snippet,liveStreamingDetails,statistics,contentDetails,status,topicDetails",
                     id=video_id
                 )
-                video_response = video_request.execute()
+                video_response = self._execute("videos.list", video_request)
                 logger.info("Respuesta de la API de videos recibida")
             except Exception as e:
                 logger.error(f"Error al llamar a la API de videos: {str(e)}")
@@ -200,7 +237,7 @@ class YouTubeClient:
                         part="snippet,statistics,brandingSettings",
                         id=channel_id
                     )
-                    channel_response = channel_request.execute()
+                    channel_response = self._execute("channels.list", channel_request)
                     
                     if channel_response.get('items'):
                         channel_data = channel_response['items'][0]
@@ -220,7 +257,7 @@ class YouTubeClient:
                         liveChatId=live_details['activeLiveChatId'],
                         part="snippet"
                     )
-                    chat_response = chat_request.execute()
+                    chat_response = self._execute("liveChatMessages.list", chat_request)
                     live_chat_messages = chat_response.get('pageInfo', {}).get('totalResults', 0)
                     logger.info(f"Métricas del chat obtenidas: {live_chat_messages} mensajes")
                 except Exception as e:
@@ -0,0 +1,61 @@
+import sys
+import asyncio
+import argparse
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+from .core.database import Database
+from .core.logger import logger
+from .services.export_service import ExportService, EXPORT_COLUMNS, EXPORT_FORMATS
+
+# Cargar variables de entorno
+root_dir = Path(__file__).parent.parent
+load_dotenv(root_dir / '.env')
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Define y procesa los argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.export',
+        description='Exporta el historial de métricas a Parquet, Arrow IPC o CSV.'
+    )
+    parser.add_argument('collection', choices=sorted(EXPORT_COLUMNS), help='Colección a exportar')
+    parser.add_argument('output', help='Ruta del archivo de salida')
+    parser.add_argument('--format', dest='fmt', choices=EXPORT_FORMATS, default='parquet')
+    parser.add_argument('--stream-id', help='Filtrar por stream')
+    parser.add_argument('--channel-id', help='Filtrar por canal')
+    parser.add_argument('--start', type=datetime.fromisoformat, help='Inicio del rango (ISO 8601, UTC)')
+    parser.add_argument('--end', type=datetime.fromisoformat, help='Fin del rango (ISO 8601, UTC)')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Documentos por lote')
+    return parser.parse_args(argv)
+
+async def run_export(args: argparse.Namespace) -> int:
+    """Conecta a la base de datos y ejecuta la exportación."""
+    await Database.connect_to_database()
+    try:
+        service = ExportService(batch_size=args.batch_size)
+        return await service.export(
+            args.collection,
+            args.output,
+            fmt=args.fmt,
+            stream_id=args.stream_id,
+            channel_id=args.channel_id,
+            start_time=args.start,
+            end_time=args.end
+        )
+    finally:
+        await Database.close_database_connection()
+
+def main(argv=None):
+    """
+    Punto de entrada del comando de exportación.
+    """
+    args = parse_args(argv)
+    try:
+        rows = asyncio.run(run_export(args))
+        print(f"{rows} filas exportadas a {args.output}")
+    except Exception as e:
+        logger.error(f"Error al exportar {args.collection}: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
 import os
 import sys
-import asyncio
 from pathlib import Path
 import logging
+# Debe importarse primero: mide también el costo de las importaciones
+from .core.startup import startup_timer
 from dotenv import load_dotenv
-from nicegui import ui
+from nicegui import app, ui
 from .core.config import Config
 from .core.database import Database
 from .core.logger import logger
+from .core.tracing import tracer
+from .repositories import get_stream_repository
+from .routes import include_routers
+from .services.metrics_state import metrics_state
 from .ui.app import StreamViewerApp
 
 # Agregar el directorio raíz al path de Python
@@ -17,14 +22,24 @@ sys.path.append(str(root_dir))
 # Cargar variables de entorno
 env_path = root_dir.parent / '.env'
 load_dotenv(env_path)
+startup_timer.mark('importaciones')
 
 async def init_database():
     """Inicializa la conexión a la base de datos."""
-    await Database.connect_to_database()
+    startup_timer.mark('arranque del servidor')
+    with startup_timer.phase('base de datos'):
+        await get_stream_repository().connect()
     logger.info("Base de datos inicializada correctamente")
 
+async def init_state():
+    """Carga el estado compartido desde la última foto e inicia el sondeo."""
+    with startup_timer.phase('estado inicial'):
+        await metrics_state.start()
+    startup_timer.report()
+
 async def close_database():
     """Cierra la conexión a la base de datos."""
+    await get_stream_repository().close()
     await Database.close_database_connection()
     logger.info("Conexión a la base de datos cerrada")
 
@@ -37,16 +52,26 @@ def main():
         if not Config.validate():
             logger.error("Error en la configuración de la aplicación")
             return
+        startup_timer.mark('configuración')
         
-        # Inicializar la base de datos de forma asíncrona
-        asyncio.run(init_database())
+        # Cada cliente obtiene su propia vista suscrita al estado compartido
+        @ui.page('/')
+        def index():
+            StreamViewerApp().setup_ui()
         
-        # Crear la aplicación
-        app = StreamViewerApp()
-        logger.info("Aplicación creada correctamente")
+        # API REST, autenticación, administración y métricas
+        include_routers(app)
         
-        # Configurar la interfaz de usuario
-        app.setup_ui()
+        # Arranque asíncrono dentro del bucle del servidor: la base de datos se
+        # conecta y el estado se carga desde la última foto sin bloquear la UI;
+        # un único sondeo de métricas por proceso alimenta a todos los clientes
+        app.on_startup(init_database)
+        app.on_startup(init_state)
+        app.on_shutdown(metrics_state.stop)
+        app.on_shutdown(close_database)
+        app.on_shutdown(tracer.close)
+        startup_timer.mark('registro de páginas')
+        logger.info("Aplicación creada correctamente")
         
         # Iniciar la aplicación
         ui.run(
@@ -60,9 +85,6 @@ def main():
     except Exception as e:
         logger.error(f"Error al iniciar la aplicación: {str(e)}")
         raise
-    finally:
-        # Cerrar la conexión a la base de datos de forma asíncrona
-        asyncio.run(close_database())
 
 # Ejecutar main() directamente
 if __name__ in {"__main__", "__mp_main__"}:
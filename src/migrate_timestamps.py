@@ -0,0 +1,48 @@
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+from dotenv import load_dotenv
+from .core.database import Database
+from .core.logger import logger
+from .repositories import get_stream_repository
+
+# Cargar variables de entorno
+root_dir = Path(__file__).parent.parent
+load_dotenv(root_dir / '.env')
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Define y procesa los argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(
+        prog='python -m src.migrate_timestamps',
+        description='Convierte a UTC los timestamps que las versiones anteriores guardaban en hora local. '
+                    'Ejecutar una vez, con la aplicación detenida y en el huso horario del servidor original.'
+    )
+    return parser.parse_args(argv)
+
+async def run_migration() -> dict:
+    """Conecta al almacenamiento configurado y convierte sus timestamps."""
+    repository = get_stream_repository()
+    try:
+        return await repository.migrate_local_timestamps()
+    finally:
+        await repository.close()
+        await Database.close_database_connection()
+
+def main(argv=None):
+    """
+    Punto de entrada del comando de migración.
+    """
+    parse_args(argv)
+    try:
+        converted = asyncio.run(run_migration())
+        if not converted:
+            print("Los timestamps ya están en UTC")
+        for collection, count in converted.items():
+            print(f"{collection}: {count} registros convertidos a UTC")
+    except Exception as e:
+        logger.error(f"Error al migrar timestamps: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ class StreamMetrics(BaseModel):
     comment_count: int
     live_chat_messages: int
     subscriber_count: int
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
 
     model_config = {
         "json_encoders": {ObjectId: str},
@@ -37,8 +37,8 @@ class Stream(BaseModel):
     thumbnail_url: Optional[str] = None
     current_viewers: int = 0
     is_active: bool = True
-    last_updated: datetime = Field(default_factory=datetime.now)
-    created_at: datetime = Field(default_factory=datetime.now)
+    last_updated: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
     model_config = {
         "json_encoders": {ObjectId: str},
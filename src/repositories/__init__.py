@@ -2,6 +2,7 @@
 Paquete de repositorios para la aplicación Stream Views.
 """
 
-from .stream_repository import StreamRepository
+from .base_repository import BaseStreamRepository
+from .factory import get_stream_repository
 
-__all__ = ['StreamRepository'] 
\ No newline at end of file
+__all__ = ['BaseStreamRepository', 'get_stream_repository']
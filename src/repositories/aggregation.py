@@ -0,0 +1,63 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from ..core.config import Config
+
+def build_downsample_pipeline(match: Dict, time_field: str,
+                              fields: List[str], output: Dict,
+                              start_time: Optional[datetime],
+                              end_time: Optional[datetime],
+                              target_points: Optional[int]) -> List[Dict]:
+    """
+    Construye un pipeline de agregación que reduce una serie temporal.
+    
+    Con un rango explícito se usan cubetas de ancho fijo (`$bucket`);
+    sin rango se deja que MongoDB reparta los documentos (`$bucketAuto`).
+    
+    Args:
+        match (Dict): Filtro inicial
+        time_field (str): Campo temporal por el que se agrupa
+        fields (List[str]): Campos proyectados antes de agrupar
+        output (Dict): Acumuladores de cada cubeta
+        start_time (Optional[datetime]): Inicio del rango
+        end_time (Optional[datetime]): Fin del rango
+        target_points (Optional[int]): Cantidad máxima de cubetas
+        
+    Returns:
+        List[Dict]: Etapas del pipeline
+    """
+    target_points = max(1, target_points or Config.CHART_MAX_POINTS)
+
+    pipeline = [
+        {"$match": match},
+        {"$project": {"_id": 0, **{field: 1 for field in fields}}}
+    ]
+
+    if start_time and end_time and end_time > start_time:
+        # MongoDB guarda fechas con precisión de milisegundos
+        span_ms = int((end_time - start_time) / timedelta(milliseconds=1))
+        target_points = max(1, min(target_points, span_ms))
+        width = timedelta(milliseconds=span_ms // target_points)
+        boundaries = [start_time + width * i for i in range(target_points)]
+        # El límite superior es exclusivo en $bucket
+        boundaries.append(end_time + timedelta(milliseconds=1))
+        pipeline.append({
+            "$bucket": {
+                "groupBy": f"${time_field}",
+                "boundaries": boundaries,
+                "output": output
+            }
+        })
+    else:
+        pipeline.append({
+            "$bucketAuto": {
+                "groupBy": f"${time_field}",
+                "buckets": target_points,
+                "output": output
+            }
+        })
+
+    pipeline.extend([
+        {"$project": {"_id": 0}},
+        {"$sort": {time_field: 1}}
+    ])
+    return pipeline
@@ -0,0 +1,150 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+from ..models.stream_metrics import Stream, StreamMetrics
+
+# Campos por los que se puede ordenar la lista de streams (siempre desempatados por video_id)
+STREAM_SORT_FIELDS = ("current_viewers", "channel_name", "last_updated", "created_at")
+_DATETIME_SORT_FIELDS = {"last_updated", "created_at"}
+
+
+def encode_stream_cursor(stream: Stream, sort_by: str) -> str:
+    """
+    Codifica la posición de un stream en un orden dado como cursor opaco.
+
+    El cursor contiene el valor del campo de orden y el video_id del último
+    stream de la página, suficiente para continuar con una consulta por rango
+    (keyset) en lugar de saltar filas con skip/offset.
+    """
+    value = getattr(stream, sort_by)
+    if sort_by in _DATETIME_SORT_FIELDS:
+        value = value.isoformat(timespec='microseconds')
+    raw = json.dumps([value, stream.video_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_stream_cursor(cursor: str, sort_by: str) -> Tuple[Any, str]:
+    """
+    Decodifica un cursor generado por encode_stream_cursor.
+
+    Returns:
+        Tuple[Any, str]: (valor del campo de orden, video_id)
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        value, video_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if sort_by in _DATETIME_SORT_FIELDS:
+            value = datetime.fromisoformat(value)
+        return value, str(video_id)
+    except Exception as e:
+        raise ValueError(f"Cursor de paginación inválido: {cursor}") from e
+
+
+class BaseStreamRepository(ABC):
+    """
+    Interfaz asíncrona común para la persistencia de streams y sus métricas.
+
+    Las implementaciones concretas (MongoDB, SQLite) son intercambiables
+    mediante la variable de entorno STORAGE_BACKEND.
+    """
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """Abre la conexión con el almacenamiento. Debe ser idempotente."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Cierra la conexión y persiste cualquier escritura pendiente."""
+
+    @property
+    def pending_writes(self) -> int:
+        """Muestras de métricas aceptadas que aún no se escribieron (0 si se escriben de inmediato)."""
+        return 0
+
+    @abstractmethod
+    async def get_all_streams(self) -> List[Stream]:
+        """Obtiene todos los streams monitoreados."""
+
+    @abstractmethod
+    async def get_streams_page(self, sort_by: str = "current_viewers", descending: bool = True,
+                               channel: Optional[str] = None, is_active: Optional[bool] = None,
+                               min_viewers: Optional[int] = None, limit: int = 25,
+                               cursor: Optional[str] = None) -> Tuple[List[Stream], Optional[str]]:
+        """
+        Obtiene una página de streams ordenada y filtrada en el almacenamiento.
+
+        Args:
+            sort_by (str): Campo de orden (uno de STREAM_SORT_FIELDS)
+            descending (bool): Orden descendente
+            channel (Optional[str]): Texto contenido en el nombre del canal (sin distinguir mayúsculas)
+            is_active (Optional[bool]): Filtrar por estado
+            min_viewers (Optional[int]): Viewers mínimos
+            limit (int): Tamaño de la página
+            cursor (Optional[str]): Cursor devuelto por la página anterior
+
+        Returns:
+            Tuple[List[Stream], Optional[str]]: Streams de la página y cursor de la
+            siguiente (None si no hay más)
+        """
+
+    @abstractmethod
+    async def get_streams_by_ids(self, video_ids: List[str]) -> List[Stream]:
+        """Obtiene varios streams por video_id en una sola consulta (sin orden garantizado)."""
+
+    @abstractmethod
+    async def get_stream(self, video_id: str) -> Optional[Stream]:
+        """Obtiene un stream por su video_id."""
+
+    @abstractmethod
+    async def create_stream(self, stream: Stream) -> Stream:
+        """Crea un stream nuevo y lo devuelve con su identificador."""
+
+    @abstractmethod
+    async def update_stream(self, stream: Stream) -> Stream:
+        """Actualiza (o crea) un stream identificado por su video_id."""
+
+    @abstractmethod
+    async def delete_stream(self, video_id: str) -> bool:
+        """Elimina un stream. Devuelve True si existía."""
+
+    @abstractmethod
+    async def add_metrics(self, metrics: StreamMetrics) -> None:
+        """Registra una muestra de métricas de un stream."""
+
+    @abstractmethod
+    async def add_metrics_batch(self, metrics: List[StreamMetrics]) -> int:
+        """Registra varias muestras en una sola operación. Devuelve la cantidad insertada."""
+
+    @abstractmethod
+    async def get_metrics_history(self, video_id: str,
+                                  start_time: Optional[datetime] = None,
+                                  end_time: Optional[datetime] = None,
+                                  limit: Optional[int] = None) -> List[StreamMetrics]:
+        """Obtiene el historial de métricas de un stream en orden cronológico."""
+
+    @abstractmethod
+    async def get_viewer_series(self, video_id: str, start_time: datetime,
+                                end_time: datetime, max_points: int) -> List[Dict]:
+        """
+        Obtiene la serie de viewers de un stream agregada en el almacenamiento.
+
+        Devuelve como máximo `max_points` puntos {"timestamp", "viewers"} en orden
+        cronológico, promediando las muestras de cada intervalo.
+        """
+
+    @abstractmethod
+    async def migrate_local_timestamps(self) -> Dict[str, int]:
+        """
+        Convierte a UTC los timestamps que las versiones anteriores guardaban en hora local.
+
+        Se aplica una sola vez (queda registrada en el almacenamiento) y debe
+        ejecutarse con la aplicación detenida, antes de iniciar la versión que
+        guarda en UTC.
+
+        Returns:
+            Dict[str, int]: Registros convertidos por colección (vacío si ya estaba aplicada)
+        """
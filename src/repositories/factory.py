@@ -0,0 +1,24 @@
+from typing import Optional
+from ..core.config import Config
+from .base_repository import BaseStreamRepository
+
+_repository: Optional[BaseStreamRepository] = None
+
+def get_stream_repository() -> BaseStreamRepository:
+    """
+    Obtiene el repositorio de streams configurado en STORAGE_BACKEND.
+
+    La instancia se comparte en todo el proceso.
+
+    Returns:
+        BaseStreamRepository: Repositorio MongoDB o SQLite
+    """
+    global _repository
+    if _repository is None:
+        if Config.STORAGE_BACKEND == 'sqlite':
+            from .sqlite_stream_repository import SQLiteStreamRepository
+            _repository = SQLiteStreamRepository(Config.SQLITE_PATH, batch_size=Config.SQLITE_BATCH_SIZE)
+        else:
+            from .mongo_stream_repository import MongoStreamRepository
+            _repository = MongoStreamRepository()
+    return _repository
@@ -0,0 +1,242 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import re
+from ..core.database import Database
+from ..core.logger import logger
+from ..core.timeseries import local_to_utc
+from ..models.stream_metrics import Stream, StreamMetrics
+from .base_repository import (
+    BaseStreamRepository, STREAM_SORT_FIELDS, encode_stream_cursor, decode_stream_cursor
+)
+from .aggregation import build_downsample_pipeline
+
+# Campos guardados en hora local antes de pasar a UTC, por colección
+LOCAL_TIME_FIELDS = {
+    "streams": ("last_updated", "created_at"),
+    "stream_metrics": ("timestamp",),
+}
+UTC_MIGRATION = "utc_timestamps"
+
+class MongoStreamRepository(BaseStreamRepository):
+    """
+    Implementación de BaseStreamRepository sobre MongoDB (Motor).
+    """
+
+    def __init__(self):
+        self.db = None
+
+    async def connect(self) -> None:
+        if self.db is None:
+            await Database.connect_to_database()
+            self.db = Database.get_database()
+            await self._ensure_indexes()
+
+    async def _ensure_indexes(self) -> None:
+        """Crea los índices que sostienen la paginación por keyset de la lista de streams."""
+        try:
+            for field in STREAM_SORT_FIELDS:
+                await self.db.streams.create_index([(field, -1), ("video_id", -1)])
+            await self.db.streams.create_index("video_id")
+        except Exception as e:
+            logger.error(f"Error al crear índices de streams: {str(e)}")
+        await self._check_utc_migration()
+
+    async def _check_utc_migration(self) -> None:
+        """Marca como migrada una base vacía o avisa si tiene timestamps en hora local."""
+        try:
+            migration = await self.db.migrations.find_one({"_id": UTC_MIGRATION})
+            if migration and migration.get("done"):
+                return
+            if migration is None and not await self.db.streams.find_one({}, {"_id": 1}) \
+                    and not await self.db.stream_metrics.find_one({}, {"_id": 1}):
+                # Una base nueva ya guarda los timestamps en UTC
+                await self.db.migrations.insert_one(
+                    {"_id": UTC_MIGRATION, "done": True, "applied_at": datetime.utcnow()}
+                )
+                return
+            logger.warning("MongoDB tiene timestamps en hora local: ejecute python -m src.migrate_timestamps")
+        except Exception as e:
+            logger.error(f"Error al verificar la migración de timestamps: {str(e)}")
+
+    async def close(self) -> None:
+        self.db = None
+
+    async def get_all_streams(self) -> List[Stream]:
+        await self.connect()
+        docs = await self.db.streams.find().to_list(length=None)
+        return [Stream(**doc) for doc in docs]
+
+    async def get_streams_page(self, sort_by: str = "current_viewers", descending: bool = True,
+                               channel: Optional[str] = None, is_active: Optional[bool] = None,
+                               min_viewers: Optional[int] = None, limit: int = 25,
+                               cursor: Optional[str] = None) -> Tuple[List[Stream], Optional[str]]:
+        if sort_by not in STREAM_SORT_FIELDS:
+            raise ValueError(f"Campo de orden no soportado: {sort_by}")
+        await self.connect()
+
+        conditions = []
+        if channel:
+            conditions.append({"channel_name": {"$regex": re.escape(channel), "$options": "i"}})
+        if is_active is not None:
+            conditions.append({"is_active": is_active})
+        if min_viewers is not None:
+            conditions.append({"current_viewers": {"$gte": min_viewers}})
+        if cursor:
+            value, video_id = decode_stream_cursor(cursor, sort_by)
+            op = "$lt" if descending else "$gt"
+            conditions.append({"$or": [
+                {sort_by: {op: value}},
+                {sort_by: value, "video_id": {op: video_id}}
+            ]})
+        query = {"$and": conditions} if conditions else {}
+
+        direction = -1 if descending else 1
+        docs = await (
+            self.db.streams.find(query)
+            .sort([(sort_by, direction), ("video_id", direction)])
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+        streams = [Stream(**doc) for doc in docs[:limit]]
+        next_cursor = encode_stream_cursor(streams[-1], sort_by) if len(docs) > limit else None
+        return streams, next_cursor
+
+    async def get_streams_by_ids(self, video_ids: List[str]) -> List[Stream]:
+        if not video_ids:
+            return []
+        await self.connect()
+        docs = await self.db.streams.find({"video_id": {"$in": list(video_ids)}}).to_list(length=None)
+        return [Stream(**doc) for doc in docs]
+
+    async def get_stream(self, video_id: str) -> Optional[Stream]:
+        await self.connect()
+        doc = await self.db.streams.find_one({"video_id": video_id})
+        return Stream(**doc) if doc else None
+
+    async def create_stream(self, stream: Stream) -> Stream:
+        await self.connect()
+        stream_dict = stream.model_dump(by_alias=True, exclude_none=True)
+        result = await self.db.streams.insert_one(stream_dict)
+        stream.id = result.inserted_id
+        return stream
+
+    async def update_stream(self, stream: Stream) -> Stream:
+        await self.connect()
+        await self.db.streams.update_one(
+            {"video_id": stream.video_id},
+            {"$set": stream.model_dump(by_alias=True, exclude={"id"})},
+            upsert=True
+        )
+        return stream
+
+    async def delete_stream(self, video_id: str) -> bool:
+        await self.connect()
+        result = await self.db.streams.delete_one({"video_id": video_id})
+        return result.deleted_count > 0
+
+    async def add_metrics(self, metrics: StreamMetrics) -> None:
+        await self.connect()
+        await self.db.stream_metrics.insert_one(metrics.model_dump(by_alias=True, exclude_none=True))
+
+    async def add_metrics_batch(self, metrics: List[StreamMetrics]) -> int:
+        if not metrics:
+            return 0
+        await self.connect()
+        result = await self.db.stream_metrics.insert_many(
+            [m.model_dump(by_alias=True, exclude_none=True) for m in metrics],
+            ordered=False
+        )
+        return len(result.inserted_ids)
+
+    async def get_metrics_history(self, video_id: str,
+                                  start_time: Optional[datetime] = None,
+                                  end_time: Optional[datetime] = None,
+                                  limit: Optional[int] = None) -> List[StreamMetrics]:
+        await self.connect()
+        query = {"stream_id": video_id}
+        time_filter = {}
+        if start_time:
+            time_filter["$gte"] = start_time
+        if end_time:
+            time_filter["$lte"] = end_time
+        if time_filter:
+            query["timestamp"] = time_filter
+
+        if limit:
+            # Las últimas `limit` muestras, devueltas en orden cronológico
+            cursor = self.db.stream_metrics.find(query).sort("timestamp", -1).limit(limit)
+            docs = await cursor.to_list(length=limit)
+            docs.reverse()
+        else:
+            docs = await self.db.stream_metrics.find(query).sort("timestamp", 1).to_list(length=None)
+        return [StreamMetrics(**doc) for doc in docs]
+
+    async def get_viewer_series(self, video_id: str, start_time: datetime,
+                                end_time: datetime, max_points: int) -> List[Dict]:
+        await self.connect()
+        pipeline = build_downsample_pipeline(
+            match={"stream_id": video_id, "timestamp": {"$gte": start_time, "$lte": end_time}},
+            time_field="timestamp",
+            fields=["timestamp", "concurrent_viewers"],
+            output={
+                "timestamp": {"$min": "$timestamp"},
+                "viewers": {"$avg": "$concurrent_viewers"}
+            },
+            start_time=start_time,
+            end_time=end_time,
+            target_points=max_points
+        )
+        # Consulta analítica de solo lectura: va por el pool de análisis si está configurado
+        analytics_db = Database.get_analytics_database()
+        return await analytics_db.stream_metrics.aggregate(pipeline).to_list(length=None)
+
+    async def migrate_local_timestamps(self, batch_size: int = 1000) -> Dict[str, int]:
+        await self.connect()
+        migration = await self.db.migrations.find_one({"_id": UTC_MIGRATION}) or {}
+        if migration.get("done"):
+            return {}
+
+        converted = {}
+        progress = migration.get("progress", {})
+        for collection, fields in LOCAL_TIME_FIELDS.items():
+            converted[collection] = await self._convert_local_fields(
+                collection, fields, progress.get(collection), batch_size
+            )
+        await self.db.migrations.update_one(
+            {"_id": UTC_MIGRATION},
+            {"$set": {"done": True, "applied_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return converted
+
+    async def _convert_local_fields(self, collection: str, fields: Tuple[str, ...],
+                                    last_id, batch_size: int) -> int:
+        """
+        Convierte los campos de una colección en lotes ordenados por _id.
+
+        Tras cada lote se guarda el último _id convertido, así una ejecución
+        interrumpida se retoma sin convertir dos veces el mismo documento.
+        """
+        from pymongo import UpdateOne
+
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        cursor = self.db[collection].find(query, {field: 1 for field in fields}).sort("_id", 1)
+        converted = 0
+        while True:
+            docs = await cursor.to_list(length=batch_size)
+            if not docs:
+                return converted
+            operations = []
+            for doc in docs:
+                update = {field: local_to_utc(doc[field]) for field in fields
+                          if isinstance(doc.get(field), datetime)}
+                if update:
+                    operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+            if operations:
+                await self.db[collection].bulk_write(operations, ordered=False)
+            await self.db.migrations.update_one(
+                {"_id": UTC_MIGRATION},
+                {"$set": {f"progress.{collection}": docs[-1]["_id"]}},
+                upsert=True
+            )
+            converted += len(operations)
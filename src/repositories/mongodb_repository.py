@@ -1,11 +1,19 @@
-from typing import List, Optional
-from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from bson import ObjectId # type: ignore
 from ..core.database import Database
 from ..models.mongodb_models import Stream, Channel, ViewerHistory
 
 class MongoDBRepository:
-    def __init__(self):
-        self.db = Database.get_database()
+    def __init__(self, db=None):
+        """
+        Inicializa el repositorio.
+
+        Args:
+            db: Base de datos a usar (por defecto la del cliente compartido; p. ej.
+                la analítica para consultas de solo lectura)
+        """
+        self.db = db if db is not None else Database.get_database()
 
     # Stream Operations
     async def create_stream(self, stream: Stream) -> Stream:
@@ -58,4 +66,156 @@ class MongoDBRepository:
         cursor = self.db.viewer_history.find(
             {"channel_id": channel_id}
         ).sort("timestamp", -1).limit(limit)
-        return [ViewerHistory(**doc) async for doc in cursor] 
\ No newline at end of file
+        return [ViewerHistory(**doc) async for doc in cursor] 
+
+    async def get_stream_history_page(self, stream_id: str, cursor: Optional[str] = None,
+                                      page_size: int = 100,
+                                      fields: Optional[List[str]] = None,
+                                      ascending: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Obtiene una página del historial de un stream paginando por timestamp.
+        
+        Args:
+            stream_id (str): ID del stream
+            cursor (Optional[str]): Cursor devuelto por la página anterior
+            page_size (int): Cantidad de documentos por página
+            fields (Optional[List[str]]): Campos a proyectar (None para todos)
+            ascending (bool): Orden cronológico ascendente
+            
+        Returns:
+            Tuple[List[Dict], Optional[str]]: Documentos y cursor de la página siguiente
+            
+        Raises:
+            ValueError: Si page_size es menor que 1
+        """
+        return await self._get_history_page(
+            {"stream_id": stream_id}, cursor, page_size, fields, ascending
+        )
+
+    async def get_channel_history_page(self, channel_id: str, cursor: Optional[str] = None,
+                                       page_size: int = 100,
+                                       fields: Optional[List[str]] = None,
+                                       ascending: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Obtiene una página del historial de un canal paginando por timestamp.
+        
+        Args:
+            channel_id (str): ID del canal
+            cursor (Optional[str]): Cursor devuelto por la página anterior
+            page_size (int): Cantidad de documentos por página
+            fields (Optional[List[str]]): Campos a proyectar (None para todos)
+            ascending (bool): Orden cronológico ascendente
+            
+        Returns:
+            Tuple[List[Dict], Optional[str]]: Documentos y cursor de la página siguiente
+            
+        Raises:
+            ValueError: Si page_size es menor que 1
+        """
+        return await self._get_history_page(
+            {"channel_id": channel_id}, cursor, page_size, fields, ascending
+        )
+
+    async def iter_stream_history(self, stream_id: str,
+                                  start_time: Optional[datetime] = None,
+                                  end_time: Optional[datetime] = None,
+                                  fields: Optional[List[str]] = None,
+                                  batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """
+        Recorre el historial de un stream en orden cronológico sin cargarlo en memoria.
+        """
+        query = self._time_range_query({"stream_id": stream_id}, start_time, end_time)
+        async for doc in self._iter_history(query, fields, batch_size):
+            yield doc
+
+    async def iter_channel_history(self, channel_id: str,
+                                   start_time: Optional[datetime] = None,
+                                   end_time: Optional[datetime] = None,
+                                   fields: Optional[List[str]] = None,
+                                   batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """
+        Recorre el historial de un canal en orden cronológico sin cargarlo en memoria.
+        """
+        query = self._time_range_query({"channel_id": channel_id}, start_time, end_time)
+        async for doc in self._iter_history(query, fields, batch_size):
+            yield doc
+
+    async def _get_history_page(self, query: Dict, cursor: Optional[str], page_size: int,
+                                fields: Optional[List[str]],
+                                ascending: bool) -> Tuple[List[Dict], Optional[str]]:
+        """Ejecuta una consulta paginada por (timestamp, _id) sobre viewer_history."""
+        if page_size < 1:
+            raise ValueError(f"page_size debe ser mayor que 0: {page_size}")
+        direction = 1 if ascending else -1
+        query = dict(query)
+        if cursor:
+            timestamp, last_id = decode_history_cursor(cursor)
+            op = "$gt" if ascending else "$lt"
+            query["$or"] = [
+                {"timestamp": {op: timestamp}},
+                {"timestamp": timestamp, "_id": {op: last_id}}
+            ]
+
+        docs = await self.db.viewer_history.find(
+            query, self._projection(fields, ["timestamp", "_id"])
+        ).sort([("timestamp", direction), ("_id", direction)]).limit(page_size + 1).to_list(length=page_size + 1)
+
+        # Se pide un documento de más para saber si existe una página siguiente
+        next_cursor = None
+        if len(docs) > page_size:
+            docs = docs[:page_size]
+            next_cursor = encode_history_cursor(docs[-1]["timestamp"], docs[-1]["_id"])
+        return docs, next_cursor
+
+    async def _iter_history(self, query: Dict, fields: Optional[List[str]],
+                            batch_size: int) -> AsyncIterator[Dict]:
+        """Itera viewer_history en lotes acotados usando el cursor del servidor."""
+        cursor = self.db.viewer_history.find(
+            query, self._projection(fields, ["timestamp"])
+        ).sort("timestamp", 1).batch_size(batch_size)
+        async for doc in cursor:
+            yield doc
+
+    @staticmethod
+    def _time_range_query(query: Dict, start_time: Optional[datetime],
+                          end_time: Optional[datetime]) -> Dict:
+        """Agrega el filtro de rango temporal a una consulta."""
+        time_filter = {}
+        if start_time:
+            time_filter["$gte"] = start_time
+        if end_time:
+            time_filter["$lte"] = end_time
+        if time_filter:
+            query = {**query, "timestamp": time_filter}
+        return query
+
+    @staticmethod
+    def _projection(fields: Optional[List[str]], required: List[str]) -> Optional[Dict]:
+        """Construye la proyección incluyendo los campos necesarios para paginar."""
+        if not fields:
+            return None
+        projection = {field: 1 for field in fields}
+        for field in required:
+            projection[field] = 1
+        if "_id" not in required and "_id" not in fields:
+            projection["_id"] = 0
+        return projection
+
+
+# Las fechas se almacenan como UTC sin zona horaria
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_history_cursor(timestamp: datetime, last_id: ObjectId) -> str:
+    """Codifica la posición (timestamp, _id) como cursor opaco."""
+    millis = (timestamp.replace(tzinfo=None) - _EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}:{last_id}"
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decodifica un cursor generado por encode_history_cursor."""
+    try:
+        millis, last_id = cursor.split(":", 1)
+        return _EPOCH + timedelta(milliseconds=int(millis)), ObjectId(last_id)
+    except Exception:
+        raise ValueError(f"Cursor de paginación inválido: {cursor}")
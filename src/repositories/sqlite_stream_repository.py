@@ -0,0 +1,415 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import asyncio
+import sqlite3
+import time
+from ..core.logger import logger
+from ..core.timeseries import local_to_utc
+from ..models.stream_metrics import Stream, StreamMetrics
+from .base_repository import (
+    BaseStreamRepository, STREAM_SORT_FIELDS, encode_stream_cursor, decode_stream_cursor
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS streams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    video_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    channel_name TEXT NOT NULL,
+    thumbnail_url TEXT,
+    current_viewers INTEGER NOT NULL DEFAULT 0,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    last_updated TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stream_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream_id TEXT NOT NULL,
+    concurrent_viewers INTEGER NOT NULL,
+    total_views INTEGER NOT NULL,
+    like_count INTEGER NOT NULL,
+    comment_count INTEGER NOT NULL,
+    live_chat_messages INTEGER NOT NULL,
+    subscriber_count INTEGER NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stream_metrics_stream_ts ON stream_metrics(stream_id, timestamp);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_streams_{field} ON streams({field}, video_id);\n"
+    for field in STREAM_SORT_FIELDS
+)
+
+# Sentencias fijas: sqlite3 las prepara una vez y las reutiliza desde su caché
+STREAM_COLUMNS = "id, video_id, title, channel_name, thumbnail_url, current_viewers, is_active, last_updated, created_at"
+SELECT_ALL_STREAMS = f"SELECT {STREAM_COLUMNS} FROM streams ORDER BY id"
+SELECT_STREAM = f"SELECT {STREAM_COLUMNS} FROM streams WHERE video_id = ?"
+INSERT_STREAM = """
+INSERT INTO streams (video_id, title, channel_name, thumbnail_url, current_viewers, is_active, last_updated, created_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+UPSERT_STREAM = INSERT_STREAM.strip() + """
+ON CONFLICT(video_id) DO UPDATE SET
+    title = excluded.title,
+    channel_name = excluded.channel_name,
+    thumbnail_url = excluded.thumbnail_url,
+    current_viewers = excluded.current_viewers,
+    is_active = excluded.is_active,
+    last_updated = excluded.last_updated
+"""
+DELETE_STREAM = "DELETE FROM streams WHERE video_id = ?"
+INSERT_METRICS = """
+INSERT INTO stream_metrics (stream_id, concurrent_viewers, total_views, like_count,
+                            comment_count, live_chat_messages, subscriber_count, timestamp)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_VIEWER_SERIES = """
+SELECT MIN(timestamp), AVG(concurrent_viewers)
+FROM stream_metrics
+WHERE stream_id = ? AND timestamp >= ? AND timestamp <= ?
+GROUP BY CAST((julianday(timestamp) - julianday(?)) * 86400000 / ? AS INTEGER)
+ORDER BY 1
+"""
+# Campos guardados en hora local antes de pasar a UTC, por tabla
+LOCAL_TIME_FIELDS = {
+    "streams": ("last_updated", "created_at"),
+    "stream_metrics": ("timestamp",),
+}
+# PRAGMA user_version a partir del cual los timestamps están en UTC
+UTC_SCHEMA_VERSION = 1
+METRICS_COLUMNS = "id, stream_id, concurrent_viewers, total_views, like_count, comment_count, live_chat_messages, subscriber_count, timestamp"
+
+
+class SQLiteStreamRepository(BaseStreamRepository):
+    """
+    Implementación embebida de BaseStreamRepository sobre SQLite.
+
+    Pensada para despliegues de un solo nodo y benchmarks sin servidor MongoDB:
+    usa modo WAL, sentencias preparadas y agrupa las muestras de métricas en
+    transacciones por lotes. Todas las operaciones se ejecutan en un único hilo
+    dedicado para no bloquear el bucle de eventos.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 5.0):
+        """
+        Inicializa el repositorio SQLite.
+
+        Args:
+            path (str): Ruta del archivo de base de datos
+            batch_size (int): Muestras acumuladas antes de escribir una transacción
+            flush_interval (float): Segundos máximos que una muestra espera en memoria
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._pending: List[tuple] = []
+        self._last_flush = time.monotonic()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._pending)
+
+    async def _run(self, func, *args):
+        """Ejecuta una función bloqueante en el hilo de SQLite."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def connect(self) -> None:
+        if self._conn is None:
+            await self._run(self._open)
+        if self._flush_task is None and self.flush_interval > 0:
+            # Garantiza flush_interval aunque el sondeo se detenga o se demore
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def _open(self) -> None:
+        if self._conn is not None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        is_new = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'streams'").fetchone() is None
+        conn.executescript(SCHEMA)
+        if is_new:
+            # Una base nueva ya guarda los timestamps en UTC
+            conn.execute(f"PRAGMA user_version = {UTC_SCHEMA_VERSION}")
+        elif conn.execute("PRAGMA user_version").fetchone()[0] < UTC_SCHEMA_VERSION:
+            logger.warning("La base SQLite tiene timestamps en hora local: ejecute python -m src.migrate_timestamps")
+        conn.commit()
+        self._conn = conn
+        logger.info(f"Conectado a SQLite en {self.path} (WAL)")
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._conn is not None:
+            await self._flush()
+            await self._run(self._conn.close)
+            self._conn = None
+            logger.info("Conexión a SQLite cerrada")
+
+    async def get_all_streams(self) -> List[Stream]:
+        await self.connect()
+        rows = await self._run(self._fetchall, SELECT_ALL_STREAMS, ())
+        return [self._row_to_stream(row) for row in rows]
+
+    async def get_streams_page(self, sort_by: str = "current_viewers", descending: bool = True,
+                               channel: Optional[str] = None, is_active: Optional[bool] = None,
+                               min_viewers: Optional[int] = None, limit: int = 25,
+                               cursor: Optional[str] = None) -> Tuple[List[Stream], Optional[str]]:
+        if sort_by not in STREAM_SORT_FIELDS:
+            raise ValueError(f"Campo de orden no soportado: {sort_by}")
+        await self.connect()
+
+        conditions = []
+        params: list = []
+        if channel:
+            escaped = channel.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append("channel_name LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        if is_active is not None:
+            conditions.append("is_active = ?")
+            params.append(int(is_active))
+        if min_viewers is not None:
+            conditions.append("current_viewers >= ?")
+            params.append(min_viewers)
+        if cursor:
+            value, video_id = decode_stream_cursor(cursor, sort_by)
+            if isinstance(value, datetime):
+                value = value.isoformat(timespec='microseconds')
+            conditions.append(f"({sort_by}, video_id) {'<' if descending else '>'} (?, ?)")
+            params.extend([value, video_id])
+
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT {STREAM_COLUMNS} FROM streams"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {sort_by} {direction}, video_id {direction} LIMIT ?"
+        params.append(limit + 1)
+
+        rows = await self._run(self._fetchall, sql, tuple(params))
+        streams = [self._row_to_stream(row) for row in rows[:limit]]
+        next_cursor = encode_stream_cursor(streams[-1], sort_by) if len(rows) > limit else None
+        return streams, next_cursor
+
+    async def get_streams_by_ids(self, video_ids: List[str]) -> List[Stream]:
+        if not video_ids:
+            return []
+        await self.connect()
+        ids = list(video_ids)
+        placeholders = ", ".join("?" * len(ids))
+        sql = f"SELECT {STREAM_COLUMNS} FROM streams WHERE video_id IN ({placeholders})"
+        rows = await self._run(self._fetchall, sql, tuple(ids))
+        return [self._row_to_stream(row) for row in rows]
+
+    async def get_stream(self, video_id: str) -> Optional[Stream]:
+        await self.connect()
+        rows = await self._run(self._fetchall, SELECT_STREAM, (video_id,))
+        return self._row_to_stream(rows[0]) if rows else None
+
+    async def create_stream(self, stream: Stream) -> Stream:
+        await self.connect()
+        await self._run(self._write, INSERT_STREAM, self._stream_params(stream))
+        return stream
+
+    async def update_stream(self, stream: Stream) -> Stream:
+        await self.connect()
+        await self._run(self._write, UPSERT_STREAM, self._stream_params(stream))
+        return stream
+
+    async def delete_stream(self, video_id: str) -> bool:
+        await self.connect()
+        deleted = await self._run(self._write_rowcount, DELETE_STREAM, (video_id,))
+        return deleted > 0
+
+    async def add_metrics(self, metrics: StreamMetrics) -> None:
+        await self.connect()
+        self._pending.append(self._metrics_params(metrics))
+        if (len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            await self._flush()
+
+    async def add_metrics_batch(self, metrics: List[StreamMetrics]) -> int:
+        if not metrics:
+            return 0
+        await self.connect()
+        self._pending.extend(self._metrics_params(m) for m in metrics)
+        await self._flush()
+        return len(metrics)
+
+    async def get_metrics_history(self, video_id: str,
+                                  start_time: Optional[datetime] = None,
+                                  end_time: Optional[datetime] = None,
+                                  limit: Optional[int] = None) -> List[StreamMetrics]:
+        await self.connect()
+        await self._flush()
+
+        sql = f"SELECT {METRICS_COLUMNS} FROM stream_metrics WHERE stream_id = ?"
+        params: list = [video_id]
+        if start_time:
+            sql += " AND timestamp >= ?"
+            params.append(start_time.isoformat(timespec='microseconds'))
+        if end_time:
+            sql += " AND timestamp <= ?"
+            params.append(end_time.isoformat(timespec='microseconds'))
+        if limit:
+            sql += " ORDER BY timestamp DESC LIMIT ?"
+            params.append(limit)
+        else:
+            sql += " ORDER BY timestamp ASC"
+
+        rows = await self._run(self._fetchall, sql, tuple(params))
+        if limit:
+            rows.reverse()
+        return [self._row_to_metrics(row) for row in rows]
+
+    async def get_viewer_series(self, video_id: str, start_time: datetime,
+                                end_time: datetime, max_points: int) -> List[Dict]:
+        await self.connect()
+        await self._flush()
+        span_ms = max(1, (end_time - start_time) // timedelta(milliseconds=1))
+        width_ms = max(1, span_ms // max(1, max_points))
+        start = start_time.isoformat(timespec='microseconds')
+        rows = await self._run(self._fetchall, SELECT_VIEWER_SERIES, (
+            video_id,
+            start,
+            end_time.isoformat(timespec='microseconds'),
+            start,
+            width_ms
+        ))
+        return [{"timestamp": datetime.fromisoformat(row[0]), "viewers": row[1]} for row in rows]
+
+    async def _flush(self) -> None:
+        """Escribe las muestras pendientes en una única transacción."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            await self._run(self._insert_metrics, pending)
+            self._last_flush = time.monotonic()
+        except Exception as e:
+            # Conservar las muestras para el próximo intento
+            self._pending = pending + self._pending
+            logger.error(f"Error al guardar lote de métricas en SQLite: {str(e)}")
+            raise
+
+    async def migrate_local_timestamps(self) -> Dict[str, int]:
+        await self.connect()
+        await self._flush()
+        return await self._run(self._migrate_local_timestamps)
+
+    async def _flush_loop(self) -> None:
+        """Escribe periódicamente las muestras que llevan flush_interval en memoria."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+                try:
+                    await self._flush()
+                except Exception:
+                    # _flush ya registró el error y conservó las muestras
+                    pass
+
+    # Operaciones bloqueantes (se ejecutan en el hilo de SQLite)
+
+    def _fetchall(self, sql: str, params: tuple) -> list:
+        return self._conn.execute(sql, params).fetchall()
+
+    def _write(self, sql: str, params: tuple) -> int:
+        with self._conn:
+            return self._conn.execute(sql, params).lastrowid
+
+    def _write_rowcount(self, sql: str, params: tuple) -> int:
+        with self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def _insert_metrics(self, rows: List[tuple]) -> None:
+        with self._conn:
+            self._conn.executemany(INSERT_METRICS, rows)
+
+    def _migrate_local_timestamps(self) -> Dict[str, int]:
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= UTC_SCHEMA_VERSION:
+            return {}
+        converted = {}
+        # Una sola transacción: la conversión y la marca de versión se aplican juntas
+        with self._conn:
+            for table, fields in LOCAL_TIME_FIELDS.items():
+                rows = self._conn.execute(f"SELECT id, {', '.join(fields)} FROM {table}").fetchall()
+                assignments = ", ".join(f"{field} = ?" for field in fields)
+                self._conn.executemany(
+                    f"UPDATE {table} SET {assignments} WHERE id = ?",
+                    (
+                        tuple(
+                            local_to_utc(datetime.fromisoformat(value)).isoformat(timespec='microseconds')
+                            for value in row[1:]
+                        ) + (row[0],)
+                        for row in rows
+                    )
+                )
+                converted[table] = len(rows)
+            self._conn.execute(f"PRAGMA user_version = {UTC_SCHEMA_VERSION}")
+        return converted
+
+    # Conversión entre filas y modelos
+
+    @staticmethod
+    def _stream_params(stream: Stream) -> tuple:
+        return (
+            stream.video_id,
+            stream.title,
+            stream.channel_name,
+            stream.thumbnail_url,
+            stream.current_viewers,
+            int(stream.is_active),
+            stream.last_updated.isoformat(timespec='microseconds'),
+            stream.created_at.isoformat(timespec='microseconds')
+        )
+
+    @staticmethod
+    def _metrics_params(metrics: StreamMetrics) -> tuple:
+        return (
+            metrics.stream_id,
+            metrics.concurrent_viewers,
+            metrics.total_views,
+            metrics.like_count,
+            metrics.comment_count,
+            metrics.live_chat_messages,
+            metrics.subscriber_count,
+            metrics.timestamp.isoformat(timespec='microseconds')
+        )
+
+    @staticmethod
+    def _row_to_stream(row: tuple) -> Stream:
+        return Stream(
+            video_id=row[1],
+            title=row[2],
+            channel_name=row[3],
+            thumbnail_url=row[4],
+            current_viewers=row[5],
+            is_active=bool(row[6]),
+            last_updated=datetime.fromisoformat(row[7]),
+            created_at=datetime.fromisoformat(row[8])
+        )
+
+    @staticmethod
+    def _row_to_metrics(row: tuple) -> StreamMetrics:
+        return StreamMetrics(
+            stream_id=row[1],
+            concurrent_viewers=row[2],
+            total_views=row[3],
+            like_count=row[4],
+            comment_count=row[5],
+            live_chat_messages=row[6],
+            subscriber_count=row[7],
+            timestamp=datetime.fromisoformat(row[8])
+        )
@@ -0,0 +1,33 @@
+"""
+Rutas HTTP de la aplicación Stream Views.
+"""
+
+from ..core.config import Config
+
+
+def include_routers(app) -> None:
+    """
+    Registra todas las rutas de la API en la aplicación.
+
+    Es el único punto de registro, compartido por src.main y StreamViewerApp.start().
+
+    Args:
+        app: Aplicación FastAPI (la de NiceGUI)
+    """
+    from . import admin_routes, auth_routes, stream_routes, thumbnail_routes
+
+    # API REST de lectura (JSON con orjson) y miniaturas en caché; NiceGUI ya
+    # instala GZipMiddleware, que comprime las respuestas JSON
+    app.include_router(stream_routes.router)
+    app.include_router(thumbnail_routes.router)
+
+    # Usuarios: registro, token Bearer en /auth/token y favoritos
+    app.include_router(auth_routes.router)
+
+    # Captura de perfiles bajo demanda (solo superusuarios)
+    app.include_router(admin_routes.router)
+
+    # Métricas para Prometheus en /metrics
+    if Config.ENABLE_METRICS:
+        from . import metrics_routes
+        app.include_router(metrics_routes.router)
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from src.core.config import Config
+from src.core.profiler import ProfilerBusy, sampling_profiler
+from src.models.user_model import User
+from src.services.auth_service import get_current_user
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+async def require_superuser(current_user: User = Depends(get_current_user)) -> User:
+    """Permite el acceso solo a superusuarios"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Se requieren permisos de administrador"
+        )
+    return current_user
+
+@router.post("/profile")
+async def capture_profile(
+    seconds: float = Query(30, gt=0, le=Config.PROFILE_MAX_SECONDS),
+    admin: User = Depends(require_superuser)
+):
+    """
+    Captura un perfil de muestreo del proceso durante `seconds` segundos.
+
+    Responde al terminar la captura con el nombre del archivo generado
+    (formato collapsed stacks, listo para flamegraph.pl o speedscope).
+    """
+    try:
+        return await sampling_profiler.capture(seconds)
+    except ProfilerBusy:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Ya hay una captura del profiler en curso"
+        )
+
+@router.get("/profile/{name}")
+async def download_profile(name: str, admin: User = Depends(require_superuser)):
+    """Descarga una captura del profiler"""
+    try:
+        path = sampling_profiler.path_for(name)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Captura no encontrada"
+        )
+    return FileResponse(path, media_type="text/plain", filename=name)
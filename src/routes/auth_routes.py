@@ -1,20 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from src.services.auth_service import AuthService
+from src.services.auth_service import get_auth_service, get_current_user
+from src.core.password_hasher import HashingQueueFull
+from src.core.security import rate_limit
+from src.core.config import Config
+from src.services.favorites_service import favorites_service
 from src.models.user_model import UserCreate, User
 from typing import List
 
 router = APIRouter(prefix="/auth", tags=["auth"])
-auth_service = AuthService()
+
+def _hashing_busy() -> HTTPException:
+    """Respuesta cuando el pool de contraseñas está saturado"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio ocupado, intenta nuevamente",
+        headers={"Retry-After": "1"},
+    )
 
 @router.post("/register", response_model=User)
-async def register(user: UserCreate):
+@rate_limit
+async def register(request: Request, user: UserCreate):
     """Registra un nuevo usuario"""
     try:
-        return await auth_service.create_user(user)
+        return await get_auth_service().create_user(user)
     except HTTPException as e:
         raise e
+    except HashingQueueFull:
+        raise _hashing_busy()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -22,9 +36,13 @@ async def register(user: UserCreate):
         )
 
 @router.post("/token")
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+@rate_limit
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """Inicia sesión y devuelve un token JWT"""
-    user = await auth_service.authenticate_user(form_data.username, form_data.password)
+    try:
+        user = await get_auth_service().authenticate_user(form_data.username, form_data.password)
+    except HashingQueueFull:
+        raise _hashing_busy()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,7 +50,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = auth_service.create_access_token(
+    access_token = get_auth_service().create_access_token(
         data={"sub": user.email}
     )
     return {
@@ -42,17 +60,18 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     }
 
 @router.get("/me", response_model=User)
-async def read_users_me(current_user: User = Depends(auth_service.get_current_user)):
+async def read_users_me(current_user: User = Depends(get_current_user)):
     """Obtiene la información del usuario actual"""
     return current_user
 
 @router.post("/favorites/{stream_id}")
 async def add_favorite(
     stream_id: str,
-    current_user: User = Depends(auth_service.get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """Agrega un stream a favoritos"""
-    success = await auth_service.add_favorite_stream(current_user.id, stream_id)
+    success = await get_auth_service().add_favorite_stream(current_user.id, stream_id, current_user.email)
+    favorites_service.invalidate(current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -63,10 +82,11 @@ async def add_favorite(
 @router.delete("/favorites/{stream_id}")
 async def remove_favorite(
     stream_id: str,
-    current_user: User = Depends(auth_service.get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     """Elimina un stream de favoritos"""
-    success = await auth_service.remove_favorite_stream(current_user.id, stream_id)
+    success = await get_auth_service().remove_favorite_stream(current_user.id, stream_id, current_user.email)
+    favorites_service.invalidate(current_user.id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -75,6 +95,16 @@ async def remove_favorite(
     return {"message": "Stream eliminado de favoritos"}
 
 @router.get("/favorites", response_model=List[str])
-async def get_favorites(current_user: User = Depends(auth_service.get_current_user)):
+async def get_favorites(current_user: User = Depends(get_current_user)):
     """Obtiene los streams favoritos del usuario"""
-    return await auth_service.get_favorite_streams(current_user.id) 
\ No newline at end of file
+    # El usuario en caché ya trae sus favoritos (se invalida al modificarlos)
+    return current_user.favorite_streams
+
+@router.get("/favorites/feed")
+async def get_favorites_feed(
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """Obtiene los streams favoritos del usuario con sus últimas métricas en una sola respuesta"""
+    response.headers["Cache-Control"] = f"private, max-age={Config.FAVORITES_FEED_TTL}"
+    return await favorites_service.get_feed(current_user.id, current_user.favorite_streams)
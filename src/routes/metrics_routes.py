@@ -0,0 +1,58 @@
+import time
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from src.core.database import Database
+from src.core.metrics import render_metrics, stats_collector
+from src.core.password_hasher import password_hasher
+from src.core.rate_limiter import api_limiter, read_limiter, youtube_limiter
+from src.repositories import get_stream_repository
+from src.services.auth_service import principal_cache
+from src.services.favorites_service import favorites_service
+from src.services.live_feed import live_feed
+from src.services.metrics_state import metrics_state
+from src.services.stream_service import youtube_flights
+from src.services.thumbnail_cache import thumbnail_cache
+from src.ui.components.sparkline import sparkline_cache
+
+router = APIRouter(tags=["metrics"])
+
+_CACHE_COUNTERS = ("hits", "misses", "evictions", "invalidations")
+
+
+def _state_stats() -> dict:
+    age = time.time() - metrics_state.last_refresh if metrics_state.last_refresh else -1
+    return {
+        "streams": len(metrics_state.streams),
+        "version": metrics_state.version,
+        "last_refresh_age_seconds": age,
+    }
+
+
+# Componentes que ya publican sus métricas con stats(): se consultan en cada scrape
+stats_collector.register("state", _state_stats)
+stats_collector.register("ingest", lambda: {"pending_writes": get_stream_repository().pending_writes})
+stats_collector.register("live_feed", live_feed.stats)
+stats_collector.register("youtube_single_flight", youtube_flights.stats, counters=("calls", "shared"))
+stats_collector.register(
+    "rate_limiter",
+    lambda: {limiter.name: limiter.stats() for limiter in (api_limiter, read_limiter, youtube_limiter)},
+    counters=("allowed", "rejected"),
+    label="limiter"
+)
+stats_collector.register(
+    "mongo_pool",
+    Database.get_pool_stats,
+    counters=("created", "closed", "checkouts", "checkout_failures", "cleared"),
+    label="pool"
+)
+stats_collector.register("password_hasher", password_hasher.stats, counters=("completed", "rejected"))
+stats_collector.register("principal_cache", principal_cache.stats, counters=_CACHE_COUNTERS)
+stats_collector.register("favorites_cache", favorites_service.cache.stats, counters=_CACHE_COUNTERS)
+stats_collector.register("sparkline_cache", sparkline_cache.stats, counters=_CACHE_COUNTERS)
+stats_collector.register("thumbnail_cache", thumbnail_cache.stats, counters=_CACHE_COUNTERS + ("fetch_errors",))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expone las métricas de la aplicación en formato de texto de Prometheus"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,155 @@
+from typing import Any, Callable, Optional
+from datetime import datetime, timedelta
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from src.core.config import Config
+from src.core.downsampling import lttb
+from src.core.rate_limiter import read_limiter
+from src.core.security import rate_limit
+from src.core.timeseries import timeseries_store, to_millis
+from src.services.live_feed import live_feed
+from src.services.metrics_state import metrics_state
+
+router = APIRouter(prefix="/streams", tags=["streams"])
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Respuesta JSON serializada con orjson (incluye arrays de NumPy y datetimes)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _conditional(request: Request, etag: str, build: Callable[[], Any]) -> Response:
+    """
+    Responde 304 si el cliente ya tiene la versión `etag`; si no, serializa `build()`.
+
+    El ETag se deriva de la versión de los datos, así que una consulta repetida
+    sin cambios no serializa ni transfiere el cuerpo.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FastJSONResponse(build(), headers=headers)
+
+
+def _get_stream_or_404(video_id: str):
+    stream = metrics_state.streams.get(video_id)
+    if stream is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Stream no encontrado"
+        )
+    return stream
+
+
+def _stream_summary(stream) -> dict:
+    return {
+        "video_id": stream.video_id,
+        "title": stream.title,
+        "channel_name": stream.channel_name,
+        "thumbnail_url": stream.thumbnail_url,
+        "current_viewers": stream.current_viewers,
+        "is_active": stream.is_active,
+        "last_updated": stream.last_updated,
+    }
+
+
+@router.get("")
+@rate_limit(limiter=read_limiter)
+async def list_streams(
+    request: Request,
+    active: Optional[bool] = None,
+    channel: Optional[str] = None,
+    min_viewers: Optional[int] = Query(None, ge=0)
+):
+    """Lista los streams monitoreados con sus métricas actuales"""
+    etag = f'W/"streams-{metrics_state.version}-{active}-{channel}-{min_viewers}"'
+
+    def build():
+        needle = channel.lower() if channel else None
+        return [
+            _stream_summary(stream)
+            for stream in metrics_state.get_streams()
+            if (active is None or stream.is_active == active)
+            and (needle is None or needle in stream.channel_name.lower())
+            and (min_viewers is None or stream.current_viewers >= min_viewers)
+        ]
+
+    return _conditional(request, etag, build)
+
+
+@router.get("/live")
+@rate_limit(limiter=read_limiter)
+async def stream_live(
+    request: Request,
+    ids: Optional[str] = Query(None, description="video_ids separados por coma (todos si se omite)"),
+    last_event_id: Optional[int] = Query(None, description="Secuencia desde la que reanudar")
+):
+    """
+    Envía las métricas en vivo como Server-Sent Events.
+
+    El primer mensaje es una foto (`event: snapshot`) y luego llega un
+    `event: delta` por ciclo de sondeo, fusionado si el cliente se atrasó. Al
+    reconectarse, el navegador envía `Last-Event-ID` y el feed retoma desde allí.
+    """
+    video_ids = {video_id for video_id in ids.split(",") if video_id} if ids else None
+    header_id = request.headers.get("last-event-id")
+    if header_id and header_id.isdigit():
+        last_event_id = int(header_id)
+
+    # Content-Encoding: identity excluye el stream de GZipMiddleware, que no vacía
+    # su buffer entre mensajes y retendría los eventos
+    return StreamingResponse(
+        live_feed.subscribe(video_ids, last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"}
+    )
+
+
+@router.get("/{video_id}/metrics")
+@rate_limit(limiter=read_limiter)
+async def get_stream_metrics(request: Request, video_id: str):
+    """Obtiene las métricas actuales de un stream"""
+    stream = _get_stream_or_404(video_id)
+    latest = timeseries_store.latest(video_id)
+    last_ts = to_millis(latest[0]) if latest else 0
+    etag = f'W/"metrics-{video_id}-{last_ts}-{metrics_state.version}"'
+
+    def build():
+        summary = _stream_summary(stream)
+        if latest and latest[0] >= stream.last_updated:
+            summary["last_updated"], summary["current_viewers"] = latest
+        return summary
+
+    return _conditional(request, etag, build)
+
+
+@router.get("/{video_id}/history")
+@rate_limit(limiter=read_limiter)
+async def get_stream_history(
+    request: Request,
+    video_id: str,
+    minutes: int = Query(60, gt=0, le=7 * 24 * 60),
+    max_points: int = Query(Config.CHART_MAX_POINTS, gt=2, le=10000)
+):
+    """
+    Obtiene la serie reciente de viewers de un stream desde memoria.
+
+    La respuesta es columnar ({"timestamps": [ms...], "viewers": [...]}) y se
+    reduce con LTTB a `max_points` puntos.
+    """
+    _get_stream_or_404(video_id)
+    latest = timeseries_store.latest(video_id)
+    last_ts = to_millis(latest[0]) if latest else 0
+    etag = f'W/"history-{video_id}-{last_ts}-{minutes}-{max_points}"'
+
+    def build():
+        end = latest[0] if latest else datetime.utcnow()
+        timestamps, viewers = timeseries_store.window(video_id, end - timedelta(minutes=minutes), end)
+        timestamps, viewers = lttb(timestamps, viewers, max_points)
+        return {"video_id": video_id, "timestamps": timestamps, "viewers": viewers}
+
+    return _conditional(request, etag, build)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import FileResponse
+from src.core.rate_limiter import read_limiter
+from src.core.security import rate_limit
+from src.repositories import get_stream_repository
+from src.services.thumbnail_cache import thumbnail_cache, source_key, CACHE_HEADERS
+
+router = APIRouter(prefix="/thumbnails", tags=["thumbnails"])
+
+@router.get("/{video_id}/{key}.webp")
+@rate_limit(limiter=read_limiter)
+async def get_thumbnail(request: Request, video_id: str, key: str):
+    """Sirve la miniatura redimensionada de un stream desde la caché local"""
+    # Solo se sirven miniaturas de streams monitoreados (evita usar el endpoint como proxy abierto)
+    stream = await get_stream_repository().get_stream(video_id)
+    if not stream or not stream.thumbnail_url or source_key(stream.thumbnail_url) != key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Miniatura no encontrada"
+        )
+
+    path = await thumbnail_cache.get(video_id, stream.thumbnail_url)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="No se pudo obtener la miniatura"
+        )
+    return FileResponse(path, media_type="image/webp", headers=CACHE_HEADERS)
@@ -0,0 +1,266 @@
+from typing import Dict, List, Optional, Set
+from datetime import datetime, timedelta
+from pathlib import Path
+from collections import defaultdict
+import asyncio
+import os
+from src.core.config import Config
+from src.core.logger import logger
+from src.core.timeseries import to_millis
+from src.services.export_service import arrow_schema, docs_to_record_batch, TIME_FIELDS
+
+# Colecciones que se archivan; todas tienen channel_id para particionar
+ARCHIVED_COLLECTIONS = ("viewer_history", "stream_analytics")
+
+
+class ArchiveService:
+    """
+    Servicio para mover el historial de streams finalizados a archivos Parquet locales.
+
+    Los archivos se organizan como `<ARCHIVE_PATH>/<colección>/channel_id=<id>/month=<YYYY-MM>/`
+    y se leen con mapeo en memoria, leyendo solo las columnas y los meses
+    necesarios para cada consulta.
+    """
+
+    def __init__(self, db, base_path: Optional[str] = None,
+                 hot_retention_days: Optional[int] = None):
+        """
+        Inicializa el servicio de archivo.
+
+        Args:
+            db: Base de datos de MongoDB (Motor)
+            base_path (Optional[str]): Directorio raíz del archivo
+            hot_retention_days (Optional[int]): Días que el historial permanece en MongoDB
+        """
+        self.db = db
+        self.base_path = Path(base_path or Config.ARCHIVE_PATH)
+        self.hot_retention = timedelta(days=hot_retention_days or Config.HOT_RETENTION_DAYS)
+
+    def hot_cutoff(self) -> datetime:
+        """Fecha a partir de la cual los datos siguen en MongoDB."""
+        return datetime.utcnow() - self.hot_retention
+
+    def needs_archive(self, start_time: Optional[datetime]) -> bool:
+        """Indica si un rango que empieza en start_time alcanza datos archivados."""
+        return start_time is None or start_time < self.hot_cutoff()
+
+    async def archive_ended_streams(self, batch_size: int = 10000) -> Dict[str, int]:
+        """
+        Archiva el historial anterior a la ventana de retención de los streams finalizados.
+
+        Los documentos se eliminan de MongoDB solo después de escribir el archivo.
+        Es idempotente: si una ejecución anterior escribió un lote pero no llegó
+        a eliminarlo, los documentos ya archivados no se vuelven a escribir.
+
+        Returns:
+            Dict[str, int]: Documentos archivados por colección
+        """
+        cutoff = self.hot_cutoff()
+        archived = {collection: 0 for collection in ARCHIVED_COLLECTIONS}
+
+        cursor = self.db.streams.find(
+            {"$or": [{"is_live": False}, {"ended_at": {"$ne": None}}]},
+            {"_id": 0, "stream_id": 1}
+        )
+        async for stream in cursor:
+            for collection in ARCHIVED_COLLECTIONS:
+                try:
+                    archived[collection] += await self._archive_stream(
+                        collection, stream["stream_id"], cutoff, batch_size
+                    )
+                except Exception as e:
+                    logger.error(f"Error al archivar {collection} del stream {stream['stream_id']}: {str(e)}")
+
+        logger.info(f"Historial archivado: {archived}")
+        return archived
+
+    async def _archive_stream(self, collection: str, stream_id: str,
+                              cutoff: datetime, batch_size: int) -> int:
+        """Archiva el historial de un stream anterior a cutoff en una colección."""
+        time_field = TIME_FIELDS[collection]
+        cursor = self.db[collection].find(
+            {"stream_id": stream_id, time_field: {"$lt": cutoff}}
+        ).sort(time_field, 1).batch_size(batch_size)
+
+        total = 0
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                total += await self._flush(collection, stream_id, batch)
+                batch = []
+        if batch:
+            total += await self._flush(collection, stream_id, batch)
+        return total
+
+    async def _flush(self, collection: str, stream_id: str, docs: List[Dict]) -> int:
+        """Escribe un lote en sus particiones y lo elimina de MongoDB."""
+        time_field = TIME_FIELDS[collection]
+        partitions = defaultdict(list)
+        for doc in docs:
+            month = doc[time_field].strftime("%Y-%m")
+            partitions[(doc.get("channel_id") or "unknown", month)].append(doc)
+
+        await asyncio.to_thread(self._write_partitions, collection, stream_id, partitions)
+        await self.db[collection].delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        return len(docs)
+
+    def _write_partitions(self, collection: str, stream_id: str, partitions: Dict) -> None:
+        """
+        Escribe un archivo Parquet nuevo por partición (canal, mes).
+
+        Cada archivo se nombra con el rango de tiempo que cubre
+        (`<stream_id>-<desde_ms>-<hasta_ms>.parquet`) y guarda el `_id` de cada
+        documento; antes de escribir se descartan los documentos cuyo `_id` ya
+        está en un archivo del mismo rango.
+        """
+        import pyarrow as pa # type: ignore
+        import pyarrow.parquet as pq # type: ignore
+
+        time_field = TIME_FIELDS[collection]
+        schema = arrow_schema(collection).append(pa.field("_id", pa.string()))
+        for (channel_id, month), docs in partitions.items():
+            directory = self._partition_dir(collection, channel_id, month)
+            directory.mkdir(parents=True, exist_ok=True)
+
+            first_ms = min(to_millis(doc[time_field]) for doc in docs)
+            last_ms = max(to_millis(doc[time_field]) for doc in docs)
+            archived_ids = self._archived_ids(directory, stream_id, first_ms, last_ms)
+            docs = [
+                {**doc, "_id": str(doc["_id"])}
+                for doc in docs if str(doc["_id"]) not in archived_ids
+            ]
+            if not docs:
+                continue
+
+            first_ms = min(to_millis(doc[time_field]) for doc in docs)
+            last_ms = max(to_millis(doc[time_field]) for doc in docs)
+            path = directory / f"{stream_id}-{first_ms}-{last_ms}.parquet"
+            tmp_path = path.with_suffix(".tmp")
+            batch = docs_to_record_batch(docs, schema)
+            pq.write_table(
+                pa.Table.from_batches([batch]),
+                str(tmp_path),
+                compression="zstd",
+                write_statistics=True
+            )
+            os.replace(tmp_path, path)
+
+    @staticmethod
+    def _archived_ids(directory: Path, stream_id: str, first_ms: int, last_ms: int) -> Set[str]:
+        """_id ya archivados en los archivos de un stream que se solapan con [first_ms, last_ms]."""
+        import pyarrow.parquet as pq # type: ignore
+
+        ids: Set[str] = set()
+        for path in directory.glob(f"{stream_id}-*.parquet"):
+            bounds = path.stem[len(stream_id) + 1:].split("-")
+            if len(bounds) == 2 and all(bound.isdigit() for bound in bounds):
+                if int(bounds[1]) < first_ms or int(bounds[0]) > last_ms:
+                    continue
+            if "_id" not in pq.read_schema(path).names:
+                continue
+            ids.update(pq.read_table(path, columns=["_id"]).column("_id").to_pylist())
+        return ids
+
+    def _partition_dir(self, collection: str, channel_id: str, month: str) -> Path:
+        return self.base_path / collection / f"channel_id={channel_id}" / f"month={month}"
+
+    async def read_channel_history(self, channel_id: str,
+                                   start_time: Optional[datetime] = None,
+                                   end_time: Optional[datetime] = None,
+                                   columns: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Lee el historial archivado de un canal.
+
+        Args:
+            channel_id (str): ID del canal
+            start_time (Optional[datetime]): Inicio del rango
+            end_time (Optional[datetime]): Fin del rango
+            columns (Optional[List[str]]): Columnas a leer (None para todas)
+
+        Returns:
+            List[Dict]: Documentos archivados en orden cronológico
+        """
+        return await asyncio.to_thread(
+            self._scan, "viewer_history", channel_id, None, start_time, end_time, columns
+        )
+
+    async def read_stream_analytics(self, stream_id: str, period_type: str,
+                                    channel_id: Optional[str] = None,
+                                    start_time: Optional[datetime] = None,
+                                    end_time: Optional[datetime] = None,
+                                    columns: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Lee los análisis archivados de un stream.
+
+        Args:
+            stream_id (str): ID del stream
+            period_type (str): Tipo de período de los análisis
+            channel_id (Optional[str]): Canal del stream; limita las particiones leídas
+            start_time (Optional[datetime]): Inicio del rango
+            end_time (Optional[datetime]): Fin del rango
+            columns (Optional[List[str]]): Columnas a leer (None para todas)
+
+        Returns:
+            List[Dict]: Documentos archivados en orden cronológico
+        """
+        return await asyncio.to_thread(
+            self._scan, "stream_analytics", channel_id,
+            {"stream_id": stream_id, "period_type": period_type},
+            start_time, end_time, columns
+        )
+
+    def _scan(self, collection: str, channel_id: Optional[str], equals: Optional[Dict],
+              start_time: Optional[datetime], end_time: Optional[datetime],
+              columns: Optional[List[str]]) -> List[Dict]:
+        """Escanea los archivos de las particiones relevantes con mapeo en memoria."""
+        files = self._partition_files(collection, channel_id, start_time, end_time)
+        if not files:
+            return []
+
+        import pyarrow.dataset as ds # type: ignore
+        from pyarrow import fs # type: ignore
+
+        time_field = TIME_FIELDS[collection]
+        expression = None
+        conditions = [ds.field(name) == value for name, value in (equals or {}).items()]
+        if start_time:
+            conditions.append(ds.field(time_field) >= start_time)
+        if end_time:
+            conditions.append(ds.field(time_field) <= end_time)
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        dataset = ds.dataset(
+            files,
+            schema=arrow_schema(collection),
+            format="parquet",
+            filesystem=fs.LocalFileSystem(use_mmap=True)
+        )
+        if columns and time_field not in columns:
+            columns = [*columns, time_field]
+        table = dataset.to_table(columns=columns, filter=expression)
+        return table.sort_by(time_field).to_pylist()
+
+    def _partition_files(self, collection: str, channel_id: Optional[str],
+                         start_time: Optional[datetime],
+                         end_time: Optional[datetime]) -> List[str]:
+        """Lista los archivos de las particiones que intersectan el rango."""
+        root = self.base_path / collection
+        if not root.exists():
+            return []
+
+        channel_dirs = [root / f"channel_id={channel_id}"] if channel_id else root.glob("channel_id=*")
+        first_month = start_time.strftime("%Y-%m") if start_time else None
+        last_month = end_time.strftime("%Y-%m") if end_time else None
+
+        files = []
+        for channel_dir in channel_dirs:
+            for month_dir in channel_dir.glob("month=*"):
+                month = month_dir.name.split("=", 1)[1]
+                if first_month and month < first_month:
+                    continue
+                if last_month and month > last_month:
+                    continue
+                files.extend(str(path) for path in sorted(month_dir.glob("*.parquet")))
+        return files
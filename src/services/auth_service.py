@@ -1,36 +1,44 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 import jwt
-from passlib.context import CryptContext
 from fastapi import HTTPException, Security
 from fastapi.security import OAuth2PasswordBearer
 from src.models.user_model import User, UserCreate, UserInDB
-from motor.motor_asyncio import AsyncIOMotorClient
+from src.core.password_hasher import password_hasher
+from src.core.ttl_cache import TTLCache
+from src.core.config import Config
+from src.core.database import Database
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Usuarios ya resueltos por el sujeto del token (email); compartida por el proceso
+principal_cache: TTLCache[User] = TTLCache(Config.AUTH_CACHE_TTL, Config.AUTH_CACHE_MAX_ENTRIES)
+
+# Esquema Bearer de todas las rutas protegidas; el token se obtiene en POST /auth/token
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+
 class AuthService:
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+        self.password_hasher = password_hasher
+        self.principal_cache = principal_cache
+        self.oauth2_scheme = oauth2_scheme
         self.secret_key = os.getenv("JWT_SECRET")
         self.algorithm = "HS256"
         self.access_token_expire_minutes = 30
         
-        # MongoDB
-        self.mongo_client = AsyncIOMotorClient(os.getenv('MONGODB_URI'))
-        self.db = self.mongo_client.stream_views
+        # MongoDB (cliente compartido del proceso)
+        self.db = Database.get_database()
         self.users = self.db.users
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        """Verifica si la contraseña coincide con el hash"""
-        return self.pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verifica si la contraseña coincide con el hash (en el pool de bcrypt)"""
+        return await self.password_hasher.verify(plain_password, hashed_password)
 
-    def get_password_hash(self, password: str) -> str:
-        """Genera el hash de una contraseña"""
-        return self.pwd_context.hash(password)
+    async def get_password_hash(self, password: str) -> str:
+        """Genera el hash de una contraseña (en el pool de bcrypt)"""
+        return await self.password_hasher.hash(password)
 
     async def create_user(self, user: UserCreate) -> User:
         """Crea un nuevo usuario"""
@@ -46,7 +54,7 @@ class AuthService:
         user_in_db = UserInDB(
             email=user.email,
             username=user.username,
-            hashed_password=self.get_password_hash(user.password),
+            hashed_password=await self.get_password_hash(user.password),
             favorite_streams=user.favorite_streams
         )
 
@@ -58,7 +66,7 @@ class AuthService:
         user = await self.users.find_one({"email": email})
         if not user:
             return None
-        if not self.verify_password(password, user["hashed_password"]):
+        if not await self.verify_password(password, user["hashed_password"]):
             return None
         
         # Actualizar último login
@@ -66,6 +74,7 @@ class AuthService:
             {"email": email},
             {"$set": {"last_login": datetime.utcnow()}}
         )
+        self.invalidate_principal(email)
         
         return User(**user)
 
@@ -81,7 +90,7 @@ class AuthService:
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
-    async def get_current_user(self, token: str = Security(OAuth2PasswordBearer(tokenUrl="token"))) -> User:
+    async def get_current_user(self, token: str = Security(oauth2_scheme)) -> User:
         """Obtiene el usuario actual desde el token"""
         credentials_exception = HTTPException(
             status_code=401,
@@ -96,32 +105,48 @@ class AuthService:
                 raise credentials_exception
         except jwt.PyJWTError:
             raise credentials_exception
+        
+        cached = self.principal_cache.get(email)
+        if cached is not None:
+            return cached
             
         user = await self.users.find_one({"email": email})
         if user is None:
             raise credentials_exception
-            
-        return User(**user)
+        
+        principal = User(**user)
+        self.principal_cache.set(email, principal)
+        return principal
 
-    async def add_favorite_stream(self, user_id: str, stream_id: str) -> bool:
+    def invalidate_principal(self, email: str) -> None:
+        """Descarta el usuario en caché tras una modificación"""
+        self.principal_cache.invalidate(email)
+
+    def principal_cache_stats(self) -> Dict:
+        """Métricas de la caché de usuarios autenticados"""
+        return self.principal_cache.stats()
+
+    async def add_favorite_stream(self, user_id: str, stream_id: str, email: str) -> bool:
         """Agrega un stream a favoritos"""
         try:
             result = await self.users.update_one(
                 {"_id": user_id},
                 {"$addToSet": {"favorite_streams": stream_id}}
             )
+            self.invalidate_principal(email)
             return result.modified_count > 0
         except Exception as e:
             print(f"Error al agregar stream favorito: {str(e)}")
             return False
 
-    async def remove_favorite_stream(self, user_id: str, stream_id: str) -> bool:
+    async def remove_favorite_stream(self, user_id: str, stream_id: str, email: str) -> bool:
         """Elimina un stream de favoritos"""
         try:
             result = await self.users.update_one(
                 {"_id": user_id},
                 {"$pull": {"favorite_streams": stream_id}}
             )
+            self.invalidate_principal(email)
             return result.modified_count > 0
         except Exception as e:
             print(f"Error al eliminar stream favorito: {str(e)}")
@@ -134,4 +159,18 @@ class AuthService:
             return user.get("favorite_streams", []) if user else []
         except Exception as e:
             print(f"Error al obtener streams favoritos: {str(e)}")
-            return [] 
\ No newline at end of file
+            return [] 
+
+
+_auth_service: Optional[AuthService] = None
+
+def get_auth_service() -> AuthService:
+    """Instancia compartida del servicio, creada al primer uso (abre el cliente de MongoDB)"""
+    global _auth_service
+    if _auth_service is None:
+        _auth_service = AuthService()
+    return _auth_service
+
+async def get_current_user(token: str = Security(oauth2_scheme)) -> User:
+    """Dependencia de FastAPI: usuario autenticado por el token Bearer"""
+    return await get_auth_service().get_current_user(token)
@@ -1,11 +1,14 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime, timedelta
 import asyncio
 from src.models.mongodb_models import Stream, Channel, ViewerHistory, StreamAnalytics
-from src.core.youtube_client import YouTubeClient
+from src.core.container import services
 from src.core.logger import logger
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from src.core.timeseries import timeseries_store
+from src.services.archive_service import ArchiveService
+from src.repositories.aggregation import build_downsample_pipeline
+from src.repositories.mongodb_repository import MongoDBRepository
+from src.core.database import Database
 from dotenv import load_dotenv
 
 class DataProcessor:
@@ -16,9 +19,10 @@ class DataProcessor:
     
     def __init__(self):
         load_dotenv()
-        self.youtube_client = YouTubeClient()
-        self.mongo_client = AsyncIOMotorClient(os.getenv('MONGODB_URI'))
-        self.db = self.mongo_client.stream_views
+        self.youtube_client = services.youtube_client
+        # Cliente compartido del proceso; las consultas analíticas usan su propio pool
+        self.db = Database.get_database()
+        self.analytics_db = Database.get_analytics_database()
         
         # Colecciones
         self.streams = self.db.streams
@@ -26,10 +30,19 @@ class DataProcessor:
         self.viewer_history = self.db.viewer_history
         self.stream_analytics = self.db.stream_analytics
         
+        # Recorridos paginados del historial (sobre el pool analítico)
+        self.history = MongoDBRepository(self.analytics_db)
+        
+        # Historial frío en archivos Parquet locales
+        self.archive = ArchiveService(self.db)
+        
         # Configuración
         self.raw_data_interval = 30  # segundos
         self.average_interval = 5    # minutos
         self.channel_update_interval = 24  # horas
+        
+        # Canal de cada stream procesado (para los análisis desde memoria)
+        self._channel_ids: Dict[str, str] = {}
 
     async def start_processing(self, stream_id: str):
         """
@@ -76,7 +89,9 @@ class DataProcessor:
                     period_type="raw"
                 )
 
-                # Guardar en la base de datos
+                # Guardar en memoria y en la base de datos
+                timeseries_store.append(stream_id, viewer_history.viewer_count, viewer_history.timestamp)
+                self._channel_ids[stream_id] = viewer_history.channel_id
                 await self.viewer_history.insert_one(viewer_history.dict(by_alias=True))
                 
                 # Actualizar datos del stream
@@ -106,28 +121,19 @@ class DataProcessor:
                 end_time = datetime.utcnow()
                 start_time = end_time - timedelta(minutes=self.average_interval)
 
-                # Obtener datos crudos del período
-                cursor = self.viewer_history.find({
-                    "stream_id": stream_id,
-                    "timestamp": {
-                        "$gte": start_time,
-                        "$lt": end_time
-                    },
-                    "period_type": "raw"
-                })
-                
-                viewers = await cursor.to_list(length=None)
+                # Obtener datos crudos del período desde la serie en memoria
+                _, viewer_counts = timeseries_store.window(stream_id, start_time, end_time)
+                channel_id = self._channel_ids.get(stream_id)
                 
-                if viewers:
+                if len(viewer_counts) and channel_id:
                     # Calcular estadísticas
-                    viewer_counts = [v["viewer_count"] for v in viewers]
-                    avg_viewers = sum(viewer_counts) / len(viewer_counts)
-                    peak_viewers = max(viewer_counts)
+                    avg_viewers = float(viewer_counts.mean())
+                    peak_viewers = int(viewer_counts.max())
 
                     # Crear registro de analytics
                     analytics = StreamAnalytics(
                         stream_id=stream_id,
-                        channel_id=viewers[0]["channel_id"],
+                        channel_id=channel_id,
                         period_start=start_time,
                         period_end=end_time,
                         average_viewers=avg_viewers,
@@ -204,8 +210,21 @@ class DataProcessor:
                     "$lte": end_time
                 }
 
-            cursor = self.stream_analytics.find(query).sort("period_start", 1)
-            return await cursor.to_list(length=None)
+            cursor = self.analytics_db.stream_analytics.find(query).sort("period_start", 1)
+            results = await cursor.to_list(length=None)
+
+            if self.archive.needs_archive(start_time):
+                stream = await self.streams.find_one({"stream_id": stream_id}, {"channel_id": 1})
+                archived = await self.archive.read_stream_analytics(
+                    stream_id,
+                    period_type,
+                    channel_id=stream.get("channel_id") if stream else None,
+                    start_time=start_time if end_time else None,
+                    end_time=end_time if start_time else None
+                )
+                results = self._merge_by_time(archived, results, "period_start")
+
+            return results
 
         except Exception as e:
             logger.error(f"Error al obtener análisis para stream {stream_id}: {str(e)}")
@@ -226,9 +245,155 @@ class DataProcessor:
                     "$lte": end_time
                 }
 
-            cursor = self.viewer_history.find(query).sort("timestamp", 1)
-            return await cursor.to_list(length=None)
+            cursor = self.analytics_db.viewer_history.find(query).sort("timestamp", 1)
+            results = await cursor.to_list(length=None)
+
+            if self.archive.needs_archive(start_time):
+                archived = await self.archive.read_channel_history(
+                    channel_id,
+                    start_time=start_time if end_time else None,
+                    end_time=end_time if start_time else None
+                )
+                results = self._merge_by_time(archived, results, "timestamp")
+
+            return results
 
         except Exception as e:
             logger.error(f"Error al obtener historial para canal {channel_id}: {str(e)}")
-            return [] 
\ No newline at end of file
+            return [] 
+
+    @staticmethod
+    def _merge_by_time(archived: List[Dict], recent: List[Dict], time_field: str) -> List[Dict]:
+        """Combina resultados archivados y de MongoDB manteniendo el orden temporal."""
+        if not archived:
+            return recent
+        if not recent or archived[-1][time_field] <= recent[0][time_field]:
+            return archived + recent
+        return sorted(archived + recent, key=lambda doc: doc[time_field])
+
+    async def iter_channel_history(self, channel_id: str,
+                                   start_time: Optional[datetime] = None,
+                                   end_time: Optional[datetime] = None,
+                                   fields: Optional[List[str]] = None,
+                                   batch_size: int = 1000) -> AsyncIterator[Dict]:
+        """
+        Recorre el historial de un canal en lotes sin cargarlo completo en memoria.
+        
+        Args:
+            channel_id (str): ID del canal
+            start_time (Optional[datetime]): Inicio del rango
+            end_time (Optional[datetime]): Fin del rango
+            fields (Optional[List[str]]): Campos a proyectar (None para todos)
+            batch_size (int): Documentos por lote del cursor
+            
+        Yields:
+            Dict: Documentos de viewer_history en orden cronológico
+        """
+        async for doc in self.history.iter_channel_history(
+            channel_id, start_time, end_time, fields, batch_size
+        ):
+            yield doc
+
+    async def get_stream_analytics_series(self, stream_id: str,
+                                          start_time: Optional[datetime] = None,
+                                          end_time: Optional[datetime] = None,
+                                          period_type: str = "5min",
+                                          target_points: Optional[int] = None) -> List[Dict]:
+        """
+        Obtiene la serie de análisis de un stream reducida en el servidor.
+        
+        El filtrado, el agrupamiento y la proyección se ejecutan en MongoDB,
+        de modo que solo se transfieren como máximo `target_points` puntos.
+        
+        Args:
+            stream_id (str): ID del stream
+            start_time (Optional[datetime]): Inicio del rango
+            end_time (Optional[datetime]): Fin del rango
+            period_type (str): Tipo de período de los análisis
+            target_points (Optional[int]): Cantidad máxima de puntos a devolver
+            
+        Returns:
+            List[Dict]: Puntos con period_start, period_end, average_viewers,
+                peak_viewers y samples
+        """
+        try:
+            match = {
+                "stream_id": stream_id,
+                "period_type": period_type
+            }
+            if start_time and end_time:
+                match["period_start"] = {
+                    "$gte": start_time,
+                    "$lte": end_time
+                }
+
+            pipeline = build_downsample_pipeline(
+                match=match,
+                time_field="period_start",
+                fields=["period_start", "period_end", "average_viewers", "peak_viewers"],
+                output={
+                    "period_start": {"$min": "$period_start"},
+                    "period_end": {"$max": "$period_end"},
+                    "average_viewers": {"$avg": "$average_viewers"},
+                    "peak_viewers": {"$max": "$peak_viewers"},
+                    "samples": {"$sum": 1}
+                },
+                start_time=start_time,
+                end_time=end_time,
+                target_points=target_points
+            )
+
+            cursor = self.analytics_db.stream_analytics.aggregate(pipeline)
+            return await cursor.to_list(length=None)
+
+        except Exception as e:
+            logger.error(f"Error al obtener serie de análisis para stream {stream_id}: {str(e)}")
+            return []
+
+    async def get_channel_history_series(self, channel_id: str,
+                                         start_time: Optional[datetime] = None,
+                                         end_time: Optional[datetime] = None,
+                                         target_points: Optional[int] = None) -> List[Dict]:
+        """
+        Obtiene el historial de viewers de un canal reducido en el servidor.
+        
+        Args:
+            channel_id (str): ID del canal
+            start_time (Optional[datetime]): Inicio del rango
+            end_time (Optional[datetime]): Fin del rango
+            target_points (Optional[int]): Cantidad máxima de puntos a devolver
+            
+        Returns:
+            List[Dict]: Puntos con timestamp, viewer_count (promedio),
+                min_viewers, max_viewers y samples
+        """
+        try:
+            match = {"channel_id": channel_id}
+            if start_time and end_time:
+                match["timestamp"] = {
+                    "$gte": start_time,
+                    "$lte": end_time
+                }
+
+            pipeline = build_downsample_pipeline(
+                match=match,
+                time_field="timestamp",
+                fields=["timestamp", "viewer_count"],
+                output={
+                    "timestamp": {"$min": "$timestamp"},
+                    "viewer_count": {"$avg": "$viewer_count"},
+                    "min_viewers": {"$min": "$viewer_count"},
+                    "max_viewers": {"$max": "$viewer_count"},
+                    "samples": {"$sum": 1}
+                },
+                start_time=start_time,
+                end_time=end_time,
+                target_points=target_points
+            )
+
+            cursor = self.analytics_db.viewer_history.aggregate(pipeline)
+            return await cursor.to_list(length=None)
+
+        except Exception as e:
+            logger.error(f"Error al obtener serie histórica para canal {channel_id}: {str(e)}")
+            return []
@@ -0,0 +1,237 @@
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import datetime
+from pathlib import Path
+import csv
+from src.core.database import Database
+from src.core.logger import logger
+
+# Columnas exportables por colección: (nombre, tipo)
+EXPORT_COLUMNS: Dict[str, List[tuple]] = {
+    "viewer_history": [
+        ("stream_id", "string"),
+        ("channel_id", "string"),
+        ("viewer_count", "int64"),
+        ("timestamp", "timestamp"),
+        ("period_type", "string"),
+    ],
+    "stream_metrics": [
+        ("stream_id", "string"),
+        ("concurrent_viewers", "int64"),
+        ("total_views", "int64"),
+        ("like_count", "int64"),
+        ("comment_count", "int64"),
+        ("live_chat_messages", "int64"),
+        ("subscriber_count", "int64"),
+        ("timestamp", "timestamp"),
+    ],
+    "stream_analytics": [
+        ("stream_id", "string"),
+        ("channel_id", "string"),
+        ("period_start", "timestamp"),
+        ("period_end", "timestamp"),
+        ("average_viewers", "float64"),
+        ("peak_viewers", "int64"),
+        ("total_duration", "int64"),
+        ("period_type", "string"),
+    ],
+}
+
+# Campo temporal usado para filtrar y ordenar cada colección
+TIME_FIELDS = {
+    "viewer_history": "timestamp",
+    "stream_metrics": "timestamp",
+    "stream_analytics": "period_start",
+}
+
+EXPORT_FORMATS = ("parquet", "arrow", "csv")
+
+
+def arrow_schema(collection: str):
+    """
+    Construye el esquema de Arrow para una colección exportable.
+
+    Args:
+        collection (str): Nombre de la colección
+
+    Returns:
+        pyarrow.Schema: Esquema con tipos fijos para todos los lotes
+    """
+    import pyarrow as pa # type: ignore
+
+    types = {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("ms"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS[collection]])
+
+
+def docs_to_record_batch(docs: List[Dict], schema):
+    """
+    Convierte una lista de documentos en un RecordBatch columnar.
+
+    Args:
+        docs (List[Dict]): Documentos de MongoDB
+        schema (pyarrow.Schema): Esquema de destino
+
+    Returns:
+        pyarrow.RecordBatch: Lote con una columna por campo del esquema
+    """
+    import pyarrow as pa # type: ignore
+
+    arrays = [
+        pa.array([doc.get(field.name) for doc in docs], type=field.type)
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ExportService:
+    """
+    Servicio para exportar el historial de métricas a archivos columnar o CSV.
+
+    Los documentos se leen con un cursor en lotes acotados y se escriben
+    incrementalmente, por lo que el uso de memoria no depende del rango exportado.
+    """
+
+    def __init__(self, batch_size: int = 10000):
+        """
+        Inicializa el servicio de exportación.
+
+        Args:
+            batch_size (int): Documentos por lote (y por row group en Parquet)
+        """
+        self.batch_size = batch_size
+
+    async def export(self, collection: str, output_path: str, fmt: str = "parquet",
+                     stream_id: Optional[str] = None,
+                     channel_id: Optional[str] = None,
+                     start_time: Optional[datetime] = None,
+                     end_time: Optional[datetime] = None) -> int:
+        """
+        Exporta una colección filtrada a un archivo.
+
+        Args:
+            collection (str): viewer_history, stream_metrics o stream_analytics
+            output_path (str): Ruta del archivo de salida
+            fmt (str): parquet, arrow o csv
+            stream_id (Optional[str]): Filtrar por stream
+            channel_id (Optional[str]): Filtrar por canal
+            start_time (Optional[datetime]): Inicio del rango
+            end_time (Optional[datetime]): Fin del rango
+
+        Returns:
+            int: Cantidad de filas exportadas
+        """
+        if collection not in EXPORT_COLUMNS:
+            raise ValueError(f"Colección no exportable: {collection}")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Formato de exportación no soportado: {fmt}")
+        if channel_id and collection == "stream_metrics":
+            raise ValueError("stream_metrics no tiene channel_id; filtre por stream_id")
+
+        query = self.build_query(collection, stream_id, channel_id, start_time, end_time)
+        path = Path(output_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        batches = self.iter_batches(collection, query)
+        if fmt == "csv":
+            rows = await self._write_csv(collection, batches, path)
+        else:
+            rows = await self.write_arrow(collection, batches, path, fmt)
+
+        logger.info(f"Exportadas {rows} filas de {collection} a {path} ({fmt})")
+        return rows
+
+    @staticmethod
+    def build_query(collection: str, stream_id: Optional[str] = None,
+                    channel_id: Optional[str] = None,
+                    start_time: Optional[datetime] = None,
+                    end_time: Optional[datetime] = None) -> Dict:
+        """Construye el filtro de MongoDB para una exportación."""
+        query = {}
+        if stream_id:
+            query["stream_id"] = stream_id
+        if channel_id:
+            query["channel_id"] = channel_id
+
+        time_filter = {}
+        if start_time:
+            time_filter["$gte"] = start_time
+        if end_time:
+            time_filter["$lte"] = end_time
+        if time_filter:
+            query[TIME_FIELDS[collection]] = time_filter
+        return query
+
+    async def iter_batches(self, collection: str, query: Dict) -> AsyncIterator[List[Dict]]:
+        """
+        Lee una colección en lotes proyectando solo las columnas exportables.
+
+        Yields:
+            List[Dict]: Lotes de hasta batch_size documentos
+        """
+        db = Database.get_analytics_database()
+        projection = {"_id": 0, **{name: 1 for name, _ in EXPORT_COLUMNS[collection]}}
+        cursor = db[collection].find(query, projection)\
+            .sort(TIME_FIELDS[collection], 1)\
+            .batch_size(self.batch_size)
+
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    async def write_arrow(collection: str, batches: AsyncIterator[List[Dict]],
+                          path: Path, fmt: str) -> int:
+        """
+        Escribe lotes en Parquet (un row group con estadísticas por lote) o Arrow IPC.
+
+        Returns:
+            int: Cantidad de filas escritas
+        """
+        try:
+            import pyarrow as pa # type: ignore
+            import pyarrow.parquet as pq # type: ignore
+        except ImportError:
+            raise RuntimeError("pyarrow es necesario para exportar en formato parquet o arrow")
+
+        schema = arrow_schema(collection)
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(str(path), schema, compression="zstd", write_statistics=True)
+            write = writer.write_batch
+        else:
+            writer = pa.ipc.new_file(str(path), schema)
+            write = writer.write_batch
+
+        rows = 0
+        try:
+            async for docs in batches:
+                write(docs_to_record_batch(docs, schema))
+                rows += len(docs)
+        finally:
+            writer.close()
+        return rows
+
+    @staticmethod
+    async def _write_csv(collection: str, batches: AsyncIterator[List[Dict]], path: Path) -> int:
+        """Escribe lotes en CSV con las columnas de la colección."""
+        columns = [name for name, _ in EXPORT_COLUMNS[collection]]
+        rows = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+            async for docs in batches:
+                for doc in docs:
+                    writer.writerow({
+                        key: value.isoformat() if isinstance(value, datetime) else value
+                        for key, value in doc.items()
+                    })
+                rows += len(docs)
+        return rows
@@ -0,0 +1,88 @@
+from typing import Dict, List, Tuple
+from datetime import datetime
+from src.core.config import Config
+from src.core.logger import logger
+from src.core.timeseries import timeseries_store
+from src.core.ttl_cache import TTLCache
+from src.repositories import get_stream_repository
+from src.services.thumbnail_cache import thumbnail_cache
+
+
+class FavoritesService:
+    """
+    Arma el feed de streams favoritos de un usuario en una sola respuesta.
+
+    Los streams se resuelven con una única consulta por video_id y las métricas
+    recientes salen del almacén de series en memoria. El resultado se guarda
+    por usuario durante FAVORITES_FEED_TTL segundos.
+    """
+
+    def __init__(self):
+        self.repository = get_stream_repository()
+        self.samples = Config.FAVORITES_FEED_SAMPLES
+        self.cache: TTLCache[Tuple[Tuple[str, ...], Dict]] = TTLCache(Config.FAVORITES_FEED_TTL)
+
+    async def get_feed(self, user_id: str, favorite_streams: List[str]) -> Dict:
+        """
+        Obtiene el feed de favoritos de un usuario.
+
+        Args:
+            user_id (str): ID del usuario
+            favorite_streams (List[str]): video_ids favoritos, en el orden del usuario
+
+        Returns:
+            Dict: {"generated_at", "streams": [...], "missing": [video_ids no encontrados]}
+        """
+        favorites = tuple(favorite_streams)
+        cached = self.cache.get(user_id)
+        if cached is not None and cached[0] == favorites:
+            return cached[1]
+
+        try:
+            found = {
+                stream.video_id: stream
+                for stream in await self.repository.get_streams_by_ids(favorite_streams)
+            }
+        except Exception as e:
+            logger.error(f"Error al obtener streams favoritos: {str(e)}")
+            found = {}
+
+        feed = {
+            "generated_at": datetime.utcnow().isoformat(timespec='seconds'),
+            "streams": [self._entry(found[video_id]) for video_id in favorite_streams if video_id in found],
+            "missing": [video_id for video_id in favorite_streams if video_id not in found],
+        }
+        self.cache.set(user_id, (favorites, feed))
+        return feed
+
+    def _entry(self, stream) -> Dict:
+        """Resumen compacto de un stream con su última muestra y la tendencia reciente."""
+        viewers = stream.current_viewers
+        updated = stream.last_updated
+        latest = timeseries_store.latest(stream.video_id)
+        if latest and latest[0] >= updated:
+            updated, viewers = latest
+
+        recent: List[int] = []
+        if self.samples:
+            _, values = timeseries_store.window(stream.video_id)
+            recent = values[-self.samples:].tolist()
+
+        return {
+            "video_id": stream.video_id,
+            "title": stream.title,
+            "channel_name": stream.channel_name,
+            "thumbnail": thumbnail_cache.url_for(stream.video_id, stream.thumbnail_url),
+            "is_active": stream.is_active,
+            "viewers": viewers,
+            "updated": updated.isoformat(timespec='seconds'),
+            "recent": recent,
+        }
+
+    def invalidate(self, user_id: str) -> None:
+        """Descarta el feed en caché de un usuario (por ejemplo al cambiar sus favoritos)."""
+        self.cache.invalidate(user_id)
+
+
+# Instancia global del servicio de favoritos
+favorites_service = FavoritesService()
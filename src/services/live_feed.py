@@ -0,0 +1,202 @@
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+from collections import deque
+import asyncio
+import orjson
+from src.core.config import Config
+from src.core.logger import logger
+from src.services.metrics_state import MetricsState, metrics_state
+
+
+class FeedEvent:
+    """Cambio publicado por el estado, con cada stream ya serializado."""
+
+    __slots__ = ("seq", "fragments", "removed", "frame")
+
+    def __init__(self, seq: int, fragments: Dict[str, bytes], removed: List[str]):
+        self.seq = seq
+        self.fragments = fragments
+        self.removed = removed
+        # Frame completo (sin filtro), compartido por todos los clientes que siguen todos los streams
+        self.frame = _frame(seq, "delta", fragments, removed)
+
+
+def _frame(seq: int, event: str, fragments: Dict[str, bytes], removed: Iterable[str]) -> bytes:
+    """
+    Arma un mensaje SSE a partir de fragmentos JSON ya serializados.
+
+    Solo concatena bytes: el costo de serialización se paga una vez por stream
+    y por actualización, no por cliente.
+    """
+    streams = b",".join(orjson.dumps(video_id) + b":" + fragment for video_id, fragment in fragments.items())
+    data = (
+        b'{"seq":' + str(seq).encode()
+        + b',"streams":{' + streams + b'},"removed":' + orjson.dumps(list(removed)) + b"}"
+    )
+    return b"id: " + str(seq).encode() + b"\nevent: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class LiveFeed:
+    """
+    Difusión en vivo de las métricas a clientes externos (Server-Sent Events).
+
+    Cada ciclo de sondeo del estado compartido genera un evento numerado que
+    se serializa una sola vez y se guarda en un historial acotado. Cada cliente
+    avanza a su propio ritmo sobre ese historial:
+
+    - si se atrasó varios eventos, los recibe fusionados en uno (último valor
+      por stream);
+    - si se atrasó más de lo que guarda el historial, o reanuda desde una
+      secuencia que ya no existe, recibe una foto completa;
+    - al reconectarse con Last-Event-ID retoma desde esa secuencia.
+
+    Un cliente lento no acumula memoria en el servidor: solo recuerda la última
+    secuencia que recibió.
+    """
+
+    def __init__(self, state: MetricsState, history: int, heartbeat: float):
+        """
+        Inicializa el feed (se suscribe al estado con el primer cliente).
+
+        Args:
+            state (MetricsState): Estado compartido de métricas
+            history (int): Eventos conservados para reanudar o fusionar
+            heartbeat (float): Segundos sin eventos tras los que se envía un keep-alive
+        """
+        self.state = state
+        self.heartbeat = heartbeat
+        self.seq = 0
+        self.clients = 0
+        self._events: "deque[FeedEvent]" = deque(maxlen=history)
+        self._updated = asyncio.Event()
+        self._unsubscribe: Optional[Callable[[], None]] = None
+
+    def start(self):
+        """Suscribe el feed a los cambios del estado."""
+        if self._unsubscribe is None:
+            self._unsubscribe = self.state.subscribe(self._on_change)
+
+    def stop(self):
+        """Cancela la suscripción al estado."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    def stats(self) -> Dict[str, int]:
+        """Clientes conectados, última secuencia y eventos en el historial."""
+        return {"clients": self.clients, "seq": self.seq, "history": len(self._events)}
+
+    def _fragment(self, video_id: str) -> Optional[bytes]:
+        stream = self.state.streams.get(video_id)
+        if stream is None:
+            return None
+        return orjson.dumps({
+            "viewers": stream.current_viewers,
+            "is_active": stream.is_active,
+            "title": stream.title,
+            "updated": stream.last_updated,
+        })
+
+    def _on_change(self, changed: List[str], removed: List[str]):
+        fragments = {}
+        for video_id in changed:
+            fragment = self._fragment(video_id)
+            if fragment is not None:
+                fragments[video_id] = fragment
+        if not fragments and not removed:
+            return
+
+        self.seq += 1
+        self._events.append(FeedEvent(self.seq, fragments, list(removed)))
+
+        # Despertar a todos los clientes que esperan y preparar la señal siguiente
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    def _snapshot(self, video_ids: Optional[Set[str]]) -> bytes:
+        """Foto completa de los streams seguidos por un cliente."""
+        ids = self.state.streams.keys() if video_ids is None else video_ids
+        fragments = {}
+        for video_id in ids:
+            fragment = self._fragment(video_id)
+            if fragment is not None:
+                fragments[video_id] = fragment
+        return _frame(self.seq, "snapshot", fragments, [])
+
+    def _catch_up(self, last_seq: int, video_ids: Optional[Set[str]]) -> Optional[bytes]:
+        """
+        Arma el mensaje que lleva a un cliente desde `last_seq` hasta la secuencia actual.
+
+        Returns:
+            Optional[bytes]: Frame SSE, o None si no hay nada nuevo para el cliente
+        """
+        if last_seq >= self.seq:
+            return None
+        if not self._events or last_seq < self._events[0].seq - 1:
+            # El historial ya no cubre al cliente: se le envía una foto
+            return self._snapshot(video_ids)
+
+        pending = [event for event in self._events if event.seq > last_seq]
+        if len(pending) == 1 and video_ids is None:
+            return pending[0].frame
+
+        # Fusionar: último valor de cada stream y bajas que no volvieron a aparecer
+        fragments: Dict[str, bytes] = {}
+        removed: Set[str] = set()
+        for event in pending:
+            for video_id, fragment in event.fragments.items():
+                if video_ids is None or video_id in video_ids:
+                    fragments[video_id] = fragment
+                    removed.discard(video_id)
+            for video_id in event.removed:
+                if video_ids is None or video_id in video_ids:
+                    fragments.pop(video_id, None)
+                    removed.add(video_id)
+        if not fragments and not removed:
+            return b""
+        return _frame(self.seq, "delta", fragments, sorted(removed))
+
+    async def subscribe(self, video_ids: Optional[Set[str]], last_event_id: Optional[int],
+                        is_disconnected: Callable) -> AsyncIterator[bytes]:
+        """
+        Genera los mensajes SSE para un cliente.
+
+        Args:
+            video_ids (Optional[Set[str]]): Streams a seguir (None = todos)
+            last_event_id (Optional[int]): Secuencia desde la que reanudar (si no es
+                válida, por ejemplo tras un reinicio del servidor, se envía una foto)
+            is_disconnected: Corrutina que indica si el cliente se desconectó
+        """
+        self.start()
+        self.clients += 1
+        try:
+            if last_event_id is None or last_event_id > self.seq:
+                last_seq = self.seq
+                yield self._snapshot(video_ids)
+            else:
+                last_seq = last_event_id
+
+            while not await is_disconnected():
+                frame = self._catch_up(last_seq, video_ids)
+                if frame is not None:
+                    # La secuencia se fija antes de ceder: lo publicado durante el envío llega después
+                    last_seq = self.seq
+                    if frame:
+                        yield frame
+                    continue
+
+                updated = self._updated
+                try:
+                    await asyncio.wait_for(updated.wait(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+        except asyncio.CancelledError:
+            # La cancelación debe propagarse para que el servidor cierre la respuesta
+            raise
+        except Exception as e:
+            logger.error(f"Error en el feed en vivo: {str(e)}")
+        finally:
+            self.clients -= 1
+
+
+# Instancia global del feed en vivo
+live_feed = LiveFeed(metrics_state, Config.LIVE_FEED_HISTORY, Config.LIVE_FEED_HEARTBEAT)
@@ -0,0 +1,237 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from pathlib import Path
+import asyncio
+import json
+import os
+import time
+from src.core.config import Config
+from src.core.container import services
+from src.core.logger import logger
+from src.core.metrics import POLL_CYCLE_SECONDS, POLL_LAG_SECONDS
+from src.core.tracing import tracer
+from src.models.stream_metrics import Stream
+
+# Callback de suscripción: recibe (video_ids actualizados, video_ids eliminados)
+Subscriber = Callable[[List[str], List[str]], None]
+
+
+class MetricsState:
+    """
+    Estado autoritativo de los streams monitoreados, compartido por todo el proceso.
+
+    Un único ciclo de sondeo consulta YouTube y la base de datos cada
+    UPDATE_INTERVAL segundos y notifica los cambios a todos los clientes
+    suscritos, de modo que el costo de API no depende de cuántos navegadores
+    tengan abierto el panel.
+
+    Tras cada ciclo se guarda una foto del estado en disco; al arrancar se
+    carga esa foto antes del primer sondeo, así la interfaz muestra las
+    últimas métricas conocidas de inmediato.
+    """
+
+    def __init__(self, interval: Optional[int] = None, snapshot_path: Optional[str] = None):
+        """
+        Inicializa el estado.
+
+        Args:
+            interval (Optional[int]): Segundos entre ciclos de sondeo
+            snapshot_path (Optional[str]): Archivo de la foto del estado
+        """
+        self.interval = interval or Config.UPDATE_INTERVAL
+        self.snapshot_path = Path(snapshot_path or Config.SNAPSHOT_PATH)
+        self.streams: Dict[str, Stream] = {}
+        self.last_refresh: Optional[float] = None
+        self.version = 0  # se incrementa con cada cambio publicado
+        self._subscribers: Set[Subscriber] = set()
+        self._stream_service = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def stream_service(self):
+        """Servicio de streams (el compartido del proceso salvo que se asigne otro)."""
+        if self._stream_service is None:
+            self._stream_service = services.stream_service
+        return self._stream_service
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """
+        Suscribe un callback a los cambios del estado.
+
+        Returns:
+            Callable[[], None]: Función para cancelar la suscripción
+        """
+        self._subscribers.add(callback)
+        return lambda: self._subscribers.discard(callback)
+
+    def get_streams(self) -> List[Stream]:
+        """Obtiene los streams actuales en orden de alta."""
+        return list(self.streams.values())
+
+    async def start(self):
+        """Carga la última foto del estado e inicia el ciclo de sondeo en segundo plano."""
+        if self._task is None:
+            await self.load_snapshot()
+            self._task = asyncio.create_task(self._poll_loop())
+            logger.info(f"Sondeo de métricas iniciado (cada {self.interval} s)")
+
+    async def stop(self):
+        """Detiene el ciclo de sondeo y guarda la foto del estado."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.save_snapshot()
+
+    async def load_snapshot(self) -> int:
+        """
+        Carga los streams guardados en la última foto del estado.
+
+        Returns:
+            int: Cantidad de streams cargados
+        """
+        try:
+            if not self.snapshot_path.exists():
+                return 0
+            data = await asyncio.to_thread(self.snapshot_path.read_text, encoding='utf-8')
+            streams = [Stream(**item) for item in json.loads(data).get('streams', [])]
+            for stream in streams:
+                self.streams.setdefault(stream.video_id, stream)
+            self._publish([stream.video_id for stream in streams], [])
+            logger.info(f"Foto de métricas cargada: {len(streams)} streams")
+            return len(streams)
+        except Exception as e:
+            logger.error(f"Error al cargar la foto de métricas: {str(e)}")
+            return 0
+
+    async def save_snapshot(self) -> None:
+        """Guarda los streams actuales en disco de forma atómica."""
+        try:
+            data = json.dumps({
+                'saved_at': time.time(),
+                'streams': [
+                    stream.model_dump(mode='json', exclude={'id'})
+                    for stream in self.streams.values()
+                ]
+            })
+            await asyncio.to_thread(self._write_snapshot, data)
+        except Exception as e:
+            logger.error(f"Error al guardar la foto de métricas: {str(e)}")
+
+    def _write_snapshot(self, data: str) -> None:
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        tmp_path.write_text(data, encoding='utf-8')
+        os.replace(tmp_path, self.snapshot_path)
+
+    async def _poll_loop(self):
+        # Ciclos a intervalos fijos: el retraso respecto del horario indica saturación
+        due = time.monotonic()
+        while True:
+            started = time.monotonic()
+            lag = started - due
+            POLL_LAG_SECONDS.observe(max(0.0, lag))
+            if lag > self.interval:
+                # Un ciclo se excedió: no encadenar los ciclos perdidos
+                logger.warning(f"Ciclo de sondeo atrasado {lag:.1f} s")
+                due = started
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error en el ciclo de sondeo: {str(e)}")
+            POLL_CYCLE_SECONDS.observe(time.monotonic() - started)
+            due += self.interval
+            await asyncio.sleep(max(0.0, due - time.monotonic()))
+
+    async def refresh(self):
+        """
+        Ejecuta un ciclo completo: recorre la lista y actualiza las métricas de cada stream.
+
+        La lista se lee por páginas de POLL_PAGE_SIZE ordenadas por fecha de alta
+        (un orden que el propio sondeo no modifica), así ninguna consulta trae
+        todos los streams de una vez.
+        """
+        with tracer.span("poll.refresh") as span:
+            async with self._lock:
+                current: Set[str] = set()
+                changed = []
+                cursor = None
+                while True:
+                    with tracer.span("storage.get_streams_page"):
+                        streams, cursor = await self.stream_service.get_streams_page(
+                            sort_by="created_at", descending=False,
+                            limit=Config.POLL_PAGE_SIZE, cursor=cursor
+                        )
+                    for stream in streams:
+                        current.add(stream.video_id)
+                        updated = await self.stream_service.update_stream_metrics(stream.video_id)
+                        self.streams[stream.video_id] = updated or stream
+                        changed.append(stream.video_id)
+                    if cursor is None:
+                        break
+
+                removed = [video_id for video_id in self.streams if video_id not in current]
+                for video_id in removed:
+                    del self.streams[video_id]
+
+                self.last_refresh = time.time()
+            with tracer.span("state.publish", subscribers=len(self._subscribers)):
+                self._publish(changed, removed)
+            with tracer.span("state.save_snapshot"):
+                await self.save_snapshot()
+            if span is not None:
+                span.set(streams=len(self.streams))
+        logger.info(f"Streams actualizados: {len(self.streams)}")
+
+    async def refresh_stream(self, video_id: str) -> Optional[Stream]:
+        """Actualiza las métricas de un solo stream y notifica el cambio."""
+        stream = await self.stream_service.update_stream_metrics(video_id)
+        if stream:
+            self.streams[video_id] = stream
+            self._publish([video_id], [])
+        return stream
+
+    async def add_stream(self, video_id: str) -> Optional[Stream]:
+        """Agrega un stream al monitoreo y lo publica a todos los clientes."""
+        stream = await self.stream_service.add_stream(video_id)
+        if stream:
+            self.streams[stream.video_id] = stream
+            self._publish([stream.video_id], [])
+        return stream
+
+    async def remove_stream(self, video_id: str) -> bool:
+        """Elimina un stream del monitoreo y lo quita de todos los clientes."""
+        deleted = await self.stream_service.delete_stream(video_id)
+        if deleted and self.streams.pop(video_id, None) is not None:
+            self._publish([], [video_id])
+        return deleted
+
+    async def get_streams_page(self, **filters) -> Tuple[List[Stream], Optional[str]]:
+        """
+        Obtiene una página de streams ordenada y filtrada en el almacenamiento.
+
+        Los streams de la página se reemplazan por su versión en memoria cuando
+        existe, para que reflejen el último ciclo de sondeo.
+        """
+        streams, next_cursor = await self.stream_service.get_streams_page(**filters)
+        return [self.streams.get(stream.video_id, stream) for stream in streams], next_cursor
+
+    async def get_stream_metrics(self, video_id: str) -> Optional[Dict]:
+        """Obtiene las métricas detalladas actuales de un stream."""
+        return await self.stream_service.get_stream_metrics(video_id)
+
+    def _publish(self, changed: List[str], removed: List[str]):
+        """Notifica un cambio a todos los suscriptores."""
+        self.version += 1
+        for callback in list(self._subscribers):
+            try:
+                callback(changed, removed)
+            except Exception as e:
+                logger.error(f"Error al notificar cambios a un cliente: {str(e)}")
+
+
+# Instancia global del estado de métricas
+metrics_state = MetricsState()
@@ -1,16 +1,19 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import asyncio
 from src.models.stream_metrics import StreamMetrics, Stream
-from src.core.youtube_client import YouTubeClient
+from src.core.container import services
 from datetime import datetime, timedelta
-from src.core.security import security_manager, require_api_key, rate_limit
+from src.core.config import Config
+from src.core.rate_limiter import youtube_limiter
+from src.core.security import security_manager, require_api_key
+from src.core.single_flight import SingleFlight
+from src.core.tracing import tracer, traced
 from src.core.logger import logger
-from src.core.database import Database
-from bson import ObjectId
-import asyncio
-import nest_asyncio
+from src.core.timeseries import timeseries_store
+from src.repositories import get_stream_repository
 
-# Aplicar parche para permitir anidar bucles de eventos
-nest_asyncio.apply()
+# Llamadas a YouTube en curso por (video_id, clase de datos), compartidas por todo el proceso
+youtube_flights = SingleFlight()
 
 class StreamService:
     """
@@ -19,18 +22,37 @@ class StreamService:
     Este servicio implementa medidas de seguridad y validación de datos.
     """
     
-    def __init__(self):
-        """Inicializa el servicio de streams."""
-        self.youtube_client = YouTubeClient()
+    def __init__(self, youtube_client=None):
+        """
+        Inicializa el servicio de streams.
+        
+        Args:
+            youtube_client: Cliente de YouTube (por defecto el compartido del proceso)
+        """
+        self.youtube_client = youtube_client or services.youtube_client
         self.security_manager = security_manager
-        self._db = None
-        self._loop = asyncio.get_event_loop()
+        self.repository = get_stream_repository()
 
-    async def _ensure_db(self):
-        """Asegura que la conexión a la base de datos esté establecida."""
-        if self._db is None:
-            await Database.connect_to_database()
-            self._db = Database.get_database()
+    async def _fetch_video_details(self, video_id: str) -> Optional[Dict]:
+        """
+        Obtiene los detalles de un video desde YouTube respetando el límite saliente.
+        
+        Todas las llamadas del proceso comparten `youtube_limiter`, así que el
+        sondeo, los refrescos manuales y el diálogo de detalles no pueden
+        superar juntos YOUTUBE_REQUESTS_PER_SECOND. Si ya hay una consulta en
+        curso para el mismo video, se espera su resultado en lugar de repetirla.
+        
+        Raises:
+            RateLimitExceeded: Si la espera supera YOUTUBE_MAX_WAIT
+        """
+        async def fetch() -> Optional[Dict]:
+            with tracer.span("youtube.rate_limit_wait"):
+                await youtube_limiter.wait("youtube", max_wait=Config.YOUTUBE_MAX_WAIT)
+            with tracer.span("youtube.get_stream_details", video_id=video_id):
+                # El cliente de YouTube es bloqueante: se ejecuta fuera del bucle de eventos
+                return await asyncio.to_thread(self.youtube_client.get_stream_details_old, video_id)
+        
+        return await youtube_flights.do((video_id, "details"), fetch)
 
     async def get_all_streams(self) -> List[Stream]:
         """
@@ -40,22 +62,27 @@ class StreamService:
             List[Stream]: Lista de streams activos
         """
         try:
-            await self._ensure_db()
-            cursor = self._db.streams.find()
-            streams = []
-            
-            # Convertir el cursor a una lista de documentos
-            docs = await cursor.to_list(length=None)
-            
-            # Convertir los documentos a objetos Stream
-            for doc in docs:
-                streams.append(Stream(**doc))
-            
-            return streams
+            return await self.repository.get_all_streams()
         except Exception as e:
             logger.error(f"Error al obtener streams: {str(e)}")
             return []
 
+    async def get_streams_page(self, **filters) -> Tuple[List[Stream], Optional[str]]:
+        """
+        Obtiene una página de streams ordenada y filtrada por el almacenamiento.
+        
+        Args:
+            **filters: Orden, filtros y cursor (ver BaseStreamRepository.get_streams_page)
+            
+        Returns:
+            Tuple[List[Stream], Optional[str]]: Streams de la página y cursor de la siguiente
+        """
+        try:
+            return await self.repository.get_streams_page(**filters)
+        except Exception as e:
+            logger.error(f"Error al obtener página de streams: {str(e)}")
+            return [], None
+
     async def get_stream_details(self, video_id: str) -> Optional[Stream]:
         """
         Obtiene los detalles de un stream específico.
@@ -72,18 +99,12 @@ class StreamService:
                 logger.warning(f"Intento de obtener detalles de stream con ID inválido: {video_id}")
                 return None
             
-            await self._ensure_db()
-            stream_data = await self._db.streams.find_one({"video_id": video_id})
-            
-            if stream_data:
-                return Stream(**stream_data)
-            return None
+            return await self.repository.get_stream(video_id)
         except Exception as e:
             logger.error(f"Error al obtener detalles del stream {video_id}: {str(e)}")
             return None
 
     @require_api_key
-    @rate_limit
     async def add_stream(self, video_id: str) -> Optional[Stream]:
         """
         Agrega un nuevo stream para monitorear.
@@ -107,7 +128,7 @@ class StreamService:
                 return existing_stream
             
             # Obtener detalles del video
-            video_details = self.youtube_client.get_stream_details_old(video_id)
+            video_details = await self._fetch_video_details(video_id)
             if not video_details:
                 logger.error(f"No se pudieron obtener los detalles del video {video_id}")
                 return None
@@ -122,10 +143,7 @@ class StreamService:
             )
             
             # Guardar el stream
-            await self._ensure_db()
-            result = await self._db.streams.insert_one(stream.model_dump(by_alias=True))
-            stream.id = result.inserted_id
-            return stream
+            return await self.repository.create_stream(stream)
             
         except Exception as e:
             logger.error(f"Error al agregar stream {video_id}: {str(e)}")
@@ -134,15 +152,14 @@ class StreamService:
     async def remove_stream(self, video_id: str) -> bool:
         """Elimina un stream del monitoreo"""
         try:
-            await self._ensure_db()
-            result = await self._db.streams.delete_one({"video_id": video_id})
-            return result.deleted_count > 0
+            timeseries_store.remove(video_id)
+            return await self.repository.delete_stream(video_id)
         except Exception as e:
             logger.error(f"Error al eliminar stream {video_id}: {str(e)}")
             return False
 
+    @traced("stream.update_metrics")
     @require_api_key
-    @rate_limit
     async def update_stream_metrics(self, video_id: str) -> Optional[Stream]:
         """
         Actualiza las métricas de un stream.
@@ -160,34 +177,48 @@ class StreamService:
                 return None
             
             # Obtener stream actual
-            stream = await self.get_stream_details(video_id)
+            with tracer.span("storage.get_stream", video_id=video_id):
+                stream = await self.get_stream_details(video_id)
             if not stream:
                 logger.warning(f"Stream {video_id} no encontrado")
                 return None
             
             # Obtener métricas actualizadas
-            video_details = self.youtube_client.get_stream_details_old(video_id)
+            video_details = await self._fetch_video_details(video_id)
             if not video_details:
                 logger.error(f"No se pudieron obtener los detalles del video {video_id}")
                 return None
             
             # Actualizar métricas
             stream.current_viewers = video_details.get('current_viewers', 0)
-            stream.last_updated = datetime.now()
-            
-            # Guardar cambios
-            await self._ensure_db()
-            await self._db.streams.update_one(
-                {"video_id": video_id},
-                {"$set": stream.model_dump(by_alias=True)}
-            )
+            stream.last_updated = datetime.utcnow()
+            timeseries_store.append(video_id, stream.current_viewers, stream.last_updated)
             
-            return stream
+            # Guardar cambios y la muestra en el historial (para rangos largos del gráfico)
+            with tracer.span("storage.add_metrics", video_id=video_id):
+                await self.repository.add_metrics(self._build_metrics(video_id, video_details, stream.last_updated))
+            with tracer.span("storage.update_stream", video_id=video_id):
+                return await self.repository.update_stream(stream)
             
         except Exception as e:
             logger.error(f"Error al actualizar métricas del stream {video_id}: {str(e)}")
             return None
 
+    @staticmethod
+    def _build_metrics(video_id: str, video_details: Dict,
+                       timestamp: Optional[datetime] = None) -> StreamMetrics:
+        """Crea una muestra de métricas a partir de los detalles del video."""
+        return StreamMetrics(
+            stream_id=video_id,
+            concurrent_viewers=video_details.get('current_viewers', 0),
+            total_views=video_details.get('total_views', 0),
+            like_count=video_details.get('like_count', 0),
+            comment_count=video_details.get('comment_count', 0),
+            live_chat_messages=video_details.get('live_chat_messages', 0),
+            subscriber_count=video_details.get('subscriber_count', 0),
+            timestamp=timestamp or datetime.utcnow()
+        )
+
     async def get_stream_metrics(self, video_id: str) -> Optional[Dict]:
         """
         Obtiene las métricas actuales de un stream.
@@ -200,24 +231,16 @@ class StreamService:
         """
         try:
             # Obtener detalles del video
-            video_details = self.youtube_client.get_stream_details_old(video_id)
+            video_details = await self._fetch_video_details(video_id)
             if not video_details:
                 return None
             
             # Crear métricas
-            metrics = StreamMetrics(
-                stream_id=video_id,
-                concurrent_viewers=video_details.get('current_viewers', 0),
-                total_views=video_details.get('total_views', 0),
-                like_count=video_details.get('like_count', 0),
-                comment_count=video_details.get('comment_count', 0),
-                live_chat_messages=video_details.get('live_chat_messages', 0),
-                subscriber_count=video_details.get('subscriber_count', 0)
-            )
+            metrics = self._build_metrics(video_id, video_details)
             
             # Guardar métricas
-            await self._ensure_db()
-            await self._db.stream_metrics.insert_one(metrics.model_dump(by_alias=True))
+            timeseries_store.append(video_id, metrics.concurrent_viewers, metrics.timestamp)
+            await self.repository.add_metrics(metrics)
             
             return {
                 'current_viewers': metrics.concurrent_viewers,
@@ -233,7 +256,7 @@ class StreamService:
             logger.error(f"Error al obtener métricas para stream {video_id}: {str(e)}")
             return None
 
-    def delete_stream(self, video_id: str) -> bool:
+    async def delete_stream(self, video_id: str) -> bool:
         """
         Elimina un stream del monitoreo.
         
@@ -243,9 +266,4 @@ class StreamService:
         Returns:
             bool: True si se eliminó correctamente, False en caso contrario
         """
-        try:
-            result = self._db.streams.delete_one({"video_id": video_id})
-            return result.deleted_count > 0
-        except Exception as e:
-            logger.error(f"Error al eliminar stream {video_id}: {str(e)}")
-            return False 
\ No newline at end of file
+        return await self.remove_stream(video_id) 
\ No newline at end of file
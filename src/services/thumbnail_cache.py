@@ -0,0 +1,182 @@
+from typing import Dict, Optional
+from pathlib import Path
+from io import BytesIO
+import asyncio
+import hashlib
+import os
+import threading
+import urllib.request
+from PIL import Image
+from src.core.config import Config
+from src.core.logger import logger
+
+# Las URLs incluyen el hash de la imagen de origen, por lo que su contenido nunca cambia
+CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+FETCH_TIMEOUT = 10
+WEBP_QUALITY = 80
+
+
+def source_key(source_url: str) -> str:
+    """Identificador corto y estable de una URL de miniatura de origen."""
+    return hashlib.sha1(source_url.encode()).hexdigest()[:16]
+
+
+class ThumbnailCache:
+    """
+    Caché en disco de miniaturas de YouTube redimensionadas.
+
+    Cada miniatura se descarga una sola vez, se reduce al ancho en que se
+    muestra y se guarda como WebP. Los archivos menos usados se eliminan cuando
+    la caché supera su tamaño máximo.
+    """
+
+    def __init__(self, base_path: str, max_bytes: int, width: int):
+        """
+        Inicializa la caché.
+
+        Args:
+            base_path (str): Directorio de la caché
+            max_bytes (int): Tamaño máximo de la caché en bytes
+            width (int): Ancho de las miniaturas guardadas en píxeles
+        """
+        self.base_path = Path(base_path)
+        self.max_bytes = max_bytes
+        self.width = width
+        self._total_bytes: Optional[int] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._size_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fetch_errors = 0
+
+    @staticmethod
+    def url_for(video_id: str, source_url: Optional[str]) -> Optional[str]:
+        """
+        Obtiene la URL local de la miniatura de un stream.
+
+        Returns:
+            Optional[str]: Ruta servida por /thumbnails o None si el stream no tiene miniatura
+        """
+        if not source_url:
+            return None
+        return f"/thumbnails/{video_id}/{source_key(source_url)}.webp"
+
+    def path_for(self, video_id: str, key: str) -> Path:
+        """Ruta del archivo en caché para una miniatura."""
+        return self.base_path / f"{video_id}-{key}.webp"
+
+    async def get(self, video_id: str, source_url: str) -> Optional[Path]:
+        """
+        Obtiene el archivo en caché de una miniatura, descargándolo si hace falta.
+
+        Args:
+            video_id (str): ID del stream
+            source_url (str): URL de la miniatura original
+
+        Returns:
+            Optional[Path]: Archivo WebP o None si no se pudo obtener
+        """
+        path = self.path_for(video_id, source_key(source_url))
+        if path.exists():
+            self.hits += 1
+            self._touch(path)
+            return path
+        self.misses += 1
+
+        # Una sola descarga por miniatura aunque varios clientes la pidan a la vez
+        lock = self._locks.setdefault(path.name, asyncio.Lock())
+        try:
+            async with lock:
+                if path.exists():
+                    return path
+                await asyncio.to_thread(self._fetch_and_store, source_url, path)
+                return path
+        except Exception as e:
+            self.fetch_errors += 1
+            logger.error(f"Error al obtener miniatura de {video_id}: {str(e)}")
+            return None
+        finally:
+            if not lock.locked():
+                self._locks.pop(path.name, None)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Marca un archivo como usado recientemente (orden LRU por fecha de modificación)."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _fetch_and_store(self, source_url: str, path: Path) -> None:
+        """Descarga, redimensiona y guarda una miniatura (bloqueante)."""
+        with urllib.request.urlopen(source_url, timeout=FETCH_TIMEOUT) as response:
+            data = response.read()
+
+        with Image.open(BytesIO(data)) as image:
+            image = image.convert("RGB")
+            if image.width > self.width:
+                height = round(image.height * self.width / image.width)
+                image = image.resize((self.width, height), Image.LANCZOS)
+            buffer = BytesIO()
+            image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+
+        self.base_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+        with self._size_lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += buffer.tell()
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Obtiene las métricas de la caché.
+
+        Returns:
+            Dict[str, float]: Aciertos, fallos, tasa de aciertos, errores de descarga y bytes en disco
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "fetch_errors": self.fetch_errors,
+            "bytes": self._total_bytes or 0,
+        }
+
+    def _scan_size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.base_path.glob("*.webp"))
+
+    def _evict(self) -> None:
+        """Elimina los archivos usados hace más tiempo hasta quedar bajo el 90% del límite."""
+        entries = sorted(
+            (entry.stat().st_mtime, entry.stat().st_size, entry)
+            for entry in self.base_path.glob("*.webp")
+        )
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            try:
+                entry.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        self._total_bytes = total
+        logger.info(f"Caché de miniaturas: {removed} archivos eliminados ({total} bytes en uso)")
+
+
+# Instancia global de la caché de miniaturas
+thumbnail_cache = ThumbnailCache(
+    Config.THUMBNAIL_CACHE_PATH,
+    Config.THUMBNAIL_CACHE_MAX_MB * 1024 * 1024,
+    Config.THUMBNAIL_WIDTH
+)
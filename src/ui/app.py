@@ -1,31 +1,71 @@
-from nicegui import ui # type: ignore
+from typing import List, Optional
+from nicegui import app, ui, context, background_tasks # type: ignore
+from ..core.config import Config
 from ..core.logger import logger
-from ..core.database import Database
-from ..services.stream_service import StreamService
+from ..core.metrics import UI_RENDER_SECONDS
+from ..core.timeseries import to_local
+from ..core.tracing import traced
+from ..routes import include_routers
+from ..services.metrics_state import metrics_state, MetricsState
 from .components.stream_graph import StreamGraph
-import asyncio
-from datetime import datetime
-from collections import defaultdict
+from .components.stream_card import StreamCard
 
-# CSS global para diálogos anchos
-ui.add_head_html('<style>.q-dialog__inner--minimized, .q-dialog__inner { max-width: 90vw !important; }</style>')
+# CSS global para diálogos anchos (compartido por todas las páginas)
+ui.add_head_html('<style>.q-dialog__inner--minimized, .q-dialog__inner { max-width: 90vw !important; }</style>', shared=True)
 
 # CSS global para diálogos anchos personalizados
-ui.add_head_html('<style>.dialog-ancho { max-width: 90vw !important; min-width: 70vw !important; }</style>')
+ui.add_head_html('<style>.dialog-ancho { max-width: 90vw !important; min-width: 70vw !important; }</style>', shared=True)
+
+# Opciones de orden y estado de la lista de streams
+SORT_OPTIONS = {
+    'current_viewers': 'Viewers',
+    'channel_name': 'Canal',
+    'last_updated': 'Última actualización',
+    'created_at': 'Fecha de alta'
+}
+STATUS_OPTIONS = {'all': 'Todos', 'active': 'Activos', 'inactive': 'Inactivos'}
 
 class StreamViewerApp:
     """
-    Aplicación principal para monitorear streams de YouTube.
+    Vista de un cliente (pestaña del navegador) para monitorear streams de YouTube.
+
+    No consulta YouTube ni la base de datos por su cuenta: se suscribe al
+    estado compartido del proceso (MetricsState) y solo aplica los cambios que
+    este publica, de modo que N clientes conectados cuestan un único sondeo.
+
+    La lista se muestra por páginas de STREAM_PAGE_SIZE tarjetas; el orden, los
+    filtros y la paginación (por keyset) se resuelven en el almacenamiento, así
+    que solo se crean las tarjetas visibles aunque haya miles de streams.
     """
     
-    def __init__(self):
-        """Inicializa la aplicación."""
-        self.stream_service = StreamService()
-        self.streams = []
+    def __init__(self, state: MetricsState = metrics_state):
+        """
+        Inicializa la vista.
+
+        Args:
+            state (MetricsState): Estado compartido al que se suscribe la vista
+        """
+        self.state = state
         self.stream_graph = StreamGraph()
         self.streams_container = None
-        self._loop = None
-        logger.info("Iniciando aplicación Stream Views")
+        self._cards = {}  # video_id -> StreamCard
+        self._empty_label = None
+        self._unsubscribe = None
+        self.client = None
+        
+        # Página actual: streams visibles, cursores de las páginas visitadas y de la siguiente
+        self.page_size = Config.STREAM_PAGE_SIZE
+        self.page_streams = []
+        self._page_cursors: List[Optional[str]] = [None]
+        self._next_cursor: Optional[str] = None
+        self._known_ids = set()
+        
+        # Orden y filtros
+        self.sort_by = 'current_viewers'
+        self.descending = True
+        self.channel_filter = ''
+        self.status_filter = 'all'
+        self.min_viewers: Optional[int] = None
     
     def setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -44,11 +84,45 @@ class StreamViewerApp:
                 # Gráfico de streams
                 self.stream_graph.setup()
                 
-                # Contenedor de streams
+                # Orden y filtros (se aplican en el almacenamiento)
+                with ui.row().classes('w-full items-center gap-4'):
+                    ui.input(
+                        label='Canal',
+                        on_change=lambda e: self.set_filters(channel=e.value or '')
+                    ).props('debounce=400 clearable').classes('w-64')
+                    ui.number(
+                        label='Viewers mínimos', min=0, precision=0,
+                        on_change=lambda e: self.set_filters(min_viewers=e.value)
+                    ).props('debounce=400 clearable').classes('w-40')
+                    ui.select(
+                        STATUS_OPTIONS, value=self.status_filter, label='Estado',
+                        on_change=lambda e: self.set_filters(status=e.value)
+                    ).classes('w-40')
+                    ui.select(
+                        SORT_OPTIONS, value=self.sort_by, label='Ordenar por',
+                        on_change=lambda e: self.set_filters(sort_by=e.value)
+                    ).classes('w-56')
+                    ui.switch(
+                        'Descendente', value=self.descending,
+                        on_change=lambda e: self.set_filters(descending=e.value)
+                    )
+                
+                # Contenedor de streams (solo la página actual)
                 self.streams_container = ui.column().classes('w-full gap-4')
+                with self.streams_container:
+                    self._empty_label = ui.label('No hay streams monitoreados').classes('text-gray-500 text-center p-4')
                 
-                # Cargar streams iniciales
-                ui.timer(0.1, self._load_streams_initial, once=True)
+                # Navegación entre páginas
+                with ui.row().classes('w-full justify-center items-center gap-4'):
+                    self._prev_button = ui.button(icon='chevron_left', on_click=self.previous_page).props('flat')
+                    self._page_label = ui.label()
+                    self._next_button = ui.button(icon='chevron_right', on_click=self.next_page).props('flat')
+                
+            # Primera página y suscripción a los cambios del estado compartido
+            self.client = context.get_client()
+            ui.timer(0, self.load_page, once=True)
+            self._unsubscribe = self.state.subscribe(self.on_state_change)
+            self.client.on_disconnect(self._unsubscribe)
                 
             logger.info("Interfaz de usuario iniciada correctamente")
             
@@ -56,10 +130,6 @@ class StreamViewerApp:
             logger.error(f"Error al configurar la interfaz: {str(e)}")
             raise
     
-    def _load_streams_initial(self):
-        """Carga los streams iniciales usando un timer."""
-        asyncio.run(self.load_streams())
-    
     def show_add_dialog(self):
         """Muestra el diálogo para agregar un nuevo stream."""
         dialog = ui.dialog()
@@ -99,12 +169,11 @@ class StreamViewerApp:
                 return
             
             # Intentar agregar el stream
-            stream = await self.stream_service.add_stream(video_id)
+            stream = await self.state.add_stream(video_id)
             
             if stream:
                 ui.notify('Stream agregado correctamente', type='positive')
                 dialog.close()
-                await self.load_streams()  # Recargar la lista de streams
             else:
                 ui.notify('No se pudo agregar el stream. Verifica el ID y que el video esté en vivo.', type='negative')
                 
@@ -112,91 +181,132 @@ class StreamViewerApp:
             logger.error(f"Error al agregar stream: {str(e)}")
             ui.notify('Error al agregar el stream. Por favor intenta nuevamente.', type='negative')
     
-    async def load_streams(self):
-        """Carga y actualiza la lista de streams."""
+    @traced("ui.update_cards")
+    @UI_RENDER_SECONDS.labels("cards").time()
+    def on_state_change(self, changed: List[str], removed: List[str]):
+        """
+        Aplica a esta vista los cambios publicados por el estado compartido.
+
+        Si cambió el conjunto de streams (altas o bajas) se vuelve a pedir la
+        página actual; si no, solo se actualizan las tarjetas visibles.
+
+        Args:
+            changed (List[str]): video_ids nuevos o con métricas actualizadas
+            removed (List[str]): video_ids que dejaron de monitorearse
+        """
         try:
-            # Obtener streams de la base de datos
-            self.streams = await self.stream_service.get_all_streams()
-            
-            # Actualizar métricas de cada stream
-            for stream in self.streams:
-                updated_stream = await self.stream_service.update_stream_metrics(stream.video_id)
-                if updated_stream:
-                    stream.current_viewers = updated_stream.current_viewers
-                    stream.last_updated = updated_stream.last_updated
-                    # Actualizar el gráfico con los nuevos datos
-                    self.stream_graph.update_data(
-                        stream_id=stream.video_id,
-                        viewers=stream.current_viewers,
-                        timestamp=stream.last_updated
-                    )
-            
-            # Actualizar la visualización
+            membership_changed = bool(removed) or any(
+                video_id not in self._known_ids for video_id in changed
+            )
+            self._known_ids = set(self.state.streams)
+            if membership_changed:
+                background_tasks.create(self.load_page(), name='load_page')
+                return
+
+            visible = [video_id for video_id in changed if video_id in self._cards]
+            for video_id in visible:
+                stream = self.state.streams.get(video_id)
+                if stream:
+                    self._cards[video_id].update(stream)
+                    self.stream_graph.update_data(stream_id=video_id, name=stream.channel_name)
+        except Exception as e:
+            logger.error(f"Error al actualizar la vista de streams: {str(e)}")
+    
+    def set_filters(self, **changes):
+        """Cambia el orden o los filtros y vuelve a la primera página."""
+        if 'channel' in changes:
+            self.channel_filter = changes['channel'].strip()
+        if 'status' in changes:
+            self.status_filter = changes['status']
+        if 'min_viewers' in changes:
+            value = changes['min_viewers']
+            self.min_viewers = int(value) if value else None
+        if 'sort_by' in changes:
+            self.sort_by = changes['sort_by']
+        if 'descending' in changes:
+            self.descending = changes['descending']
+        self._page_cursors = [None]
+        background_tasks.create(self.load_page(), name='load_page')
+    
+    async def next_page(self):
+        """Avanza a la página siguiente."""
+        if self._next_cursor:
+            self._page_cursors.append(self._next_cursor)
+            await self.load_page()
+    
+    async def previous_page(self):
+        """Vuelve a la página anterior."""
+        if len(self._page_cursors) > 1:
+            self._page_cursors.pop()
+            await self.load_page()
+    
+    async def load_page(self):
+        """Obtiene la página actual del almacenamiento y la muestra."""
+        try:
+            is_active = {'active': True, 'inactive': False}.get(self.status_filter)
+            self.page_streams, self._next_cursor = await self.state.get_streams_page(
+                sort_by=self.sort_by,
+                descending=self.descending,
+                channel=self.channel_filter or None,
+                is_active=is_active,
+                min_viewers=self.min_viewers,
+                limit=self.page_size,
+                cursor=self._page_cursors[-1]
+            )
             self.update_streams_display()
-            
-            logger.info(f"Streams actualizados: {len(self.streams)}")
-            
         except Exception as e:
-            logger.error(f"Error al cargar streams: {str(e)}")
+            logger.error(f"Error al cargar la página de streams: {str(e)}")
     
+    @traced("ui.update_streams_display")
+    @UI_RENDER_SECONDS.labels("page").time()
     def update_streams_display(self):
-        """Actualiza la visualización de los streams."""
-        self.streams_container.clear()
+        """
+        Actualiza la visualización de la página actual.
+        
+        Las tarjetas se identifican por video_id: solo se crean para streams
+        que entran en la página, se eliminan las que salen y el resto se
+        actualiza y reordena sin volver a crearse. El gráfico sigue a los
+        streams visibles.
+        """
+        page_ids = [stream.video_id for stream in self.page_streams]
+        for video_id in list(self._cards):
+            if video_id not in page_ids:
+                self._cards.pop(video_id).delete()
+                self.stream_graph.remove_stream(video_id)
         
-        if not self.streams:
-            with self.streams_container:
-                ui.label('No hay streams monitoreados').classes('text-gray-500 text-center p-4')
-            return
+        for index, stream in enumerate(self.page_streams):
+            card = self._cards.get(stream.video_id)
+            if card is None:
+                with self.streams_container:
+                    card = self._cards[stream.video_id] = StreamCard(
+                        stream,
+                        on_details=self.show_stream_details,
+                        on_refresh=self.refresh_stream,
+                        on_delete=self.delete_stream
+                    )
+            else:
+                card.update(stream)
+            # Índice + 1: la etiqueta de lista vacía ocupa la primera posición
+            card.card.move(target_index=index + 1)
+            self.stream_graph.update_data(stream_id=stream.video_id, name=stream.channel_name)
+        
+        if self.channel_filter or self.status_filter != 'all':
+            self._empty_label.set_text('Ningún stream coincide con los filtros')
+        else:
+            self._empty_label.set_text('No hay streams monitoreados')
+        self._empty_label.set_visibility(not self.page_streams)
         
-        for stream in self.streams:
-            with self.streams_container:
-                with ui.card().classes('w-full p-4 hover:shadow-lg transition-shadow'):
-                    with ui.row().classes('w-full justify-between items-start gap-4'):
-                        # Thumbnail del video
-                        if stream.thumbnail_url:
-                            ui.image(stream.thumbnail_url).classes('w-48 h-27 object-cover rounded')
-                        
-                        # Información del stream
-                        with ui.column().classes('flex-grow gap-2'):
-                            ui.label(stream.title).classes('text-xl font-bold')
-                            ui.label(stream.channel_name).classes('text-gray-600')
-                            
-                            # Métricas
-                            with ui.row().classes('gap-4 mt-2'):
-                                with ui.column().classes('items-center'):
-                                    ui.label('👥').classes('text-2xl')
-                                    ui.label(f'{stream.current_viewers:,}').classes('text-green-600 font-semibold')
-                                    ui.label('Viewers').classes('text-sm text-gray-500')
-                                
-                                with ui.column().classes('items-center'):
-                                    ui.label('⏱️').classes('text-2xl')
-                                    ui.label(stream.last_updated.strftime('%H:%M:%S')).classes('text-blue-600 font-semibold')
-                                    ui.label('Última actualización').classes('text-sm text-gray-500')
-                        
-                        # Botones de acción
-                        with ui.column().classes('gap-2'):
-                            ui.button(
-                                'Más detalles',
-                                on_click=lambda s=stream: self.show_stream_details(s)
-                            ).props('flat').classes('text-blue-500')
-                            
-                            ui.button(
-                                icon='refresh',
-                                on_click=lambda s=stream: self.refresh_stream(s.video_id)
-                            ).props('flat').classes('text-blue-500')
-                            
-                            ui.button(
-                                icon='delete',
-                                on_click=lambda s=stream: self.delete_stream(s.video_id)
-                            ).props('flat').classes('text-red-500')
+        page = len(self._page_cursors)
+        self._page_label.set_text(f'Página {page}')
+        self._prev_button.set_enabled(page > 1)
+        self._next_button.set_enabled(self._next_cursor is not None)
     
     async def refresh_stream(self, video_id: str):
         """Actualiza manualmente un stream específico."""
         try:
-            stream = await self.stream_service.update_stream_metrics(video_id)
+            stream = await self.state.refresh_stream(video_id)
             if stream:
                 ui.notify('Stream actualizado correctamente', type='positive')
-                await self.load_streams()
             else:
                 ui.notify('No se pudo actualizar el stream', type='negative')
         except Exception as e:
@@ -206,32 +316,15 @@ class StreamViewerApp:
     async def delete_stream(self, video_id: str):
         """Elimina un stream del monitoreo."""
         try:
-            if await self.stream_service.delete_stream(video_id):
+            if await self.state.remove_stream(video_id):
                 ui.notify('Stream eliminado correctamente', type='positive')
-                await self.load_streams()
             else:
                 ui.notify('No se pudo eliminar el stream', type='negative')
         except Exception as e:
             logger.error(f"Error al eliminar stream: {str(e)}")
             ui.notify('Error al eliminar el stream', type='negative')
 
-    def update_metrics(self):
-        """Actualiza las métricas de los streams actuales."""
-        try:
-            for stream in self.streams:
-                updated_stream = self.stream_service.update_stream_metrics(stream.video_id)
-                if updated_stream:
-                    # Actualizar el stream en la lista
-                    stream.current_viewers = updated_stream.current_viewers
-                    stream.last_updated = updated_stream.last_updated
-            
-            # Actualizar la visualización
-            self.update_streams_display()
-            
-        except Exception as e:
-            logger.error(f"Error al actualizar métricas: {str(e)}")
-
-    def show_stream_details(self, stream):
+    async def show_stream_details(self, stream):
         """Muestra los detalles completos de un stream."""
         dialog = ui.dialog()
         with dialog, ui.card().classes('w-full max-w-2xl'):
@@ -244,8 +337,8 @@ class StreamViewerApp:
                     ui.label(f'Título: {stream.title}')
                     ui.label(f'Canal: {stream.channel_name}')
                     ui.label(f'Estado: {"Activo" if stream.is_active else "Inactivo"}')
-                    ui.label(f'Creado: {stream.created_at.strftime("%Y-%m-%d %H:%M:%S")}')
-                    ui.label(f'Última actualización: {stream.last_updated.strftime("%Y-%m-%d %H:%M:%S")}')
+                    ui.label(f'Creado: {to_local(stream.created_at).strftime("%Y-%m-%d %H:%M:%S")}')
+                    ui.label(f'Última actualización: {to_local(stream.last_updated).strftime("%Y-%m-%d %H:%M:%S")}')
                 
                 # Métricas actuales
                 with ui.column().classes('gap-2'):
@@ -253,14 +346,13 @@ class StreamViewerApp:
                     ui.label(f'Viewers actuales: {stream.current_viewers:,}')
                     
                     # Obtener métricas adicionales
-                    metrics = self.stream_service.get_stream_metrics(stream.video_id, limit=1)
+                    metrics = await self.state.get_stream_metrics(stream.video_id)
                     if metrics:
-                        latest_metrics = metrics[0]
-                        ui.label(f'Total de vistas: {latest_metrics.total_views:,}')
-                        ui.label(f'Likes: {latest_metrics.like_count:,}')
-                        ui.label(f'Comentarios: {latest_metrics.comment_count:,}')
-                        ui.label(f'Mensajes en chat: {latest_metrics.live_chat_messages:,}')
-                        ui.label(f'Suscriptores: {latest_metrics.subscriber_count:,}')
+                        ui.label(f'Total de vistas: {metrics["total_views"]:,}')
+                        ui.label(f'Likes: {metrics["like_count"]:,}')
+                        ui.label(f'Comentarios: {metrics["comment_count"]:,}')
+                        ui.label(f'Mensajes en chat: {metrics["live_chat_messages"]:,}')
+                        ui.label(f'Suscriptores: {metrics["subscriber_count"]:,}')
             
             # Botón para cerrar
             with ui.row().classes('w-full justify-end mt-4'):
@@ -271,7 +363,10 @@ class StreamViewerApp:
     def start(self):
         """Inicia la aplicación."""
         try:
-            self.setup_ui()
+            ui.page('/')(lambda: StreamViewerApp(self.state).setup_ui())
+            include_routers(app)
+            app.on_startup(self.state.start)
+            app.on_shutdown(self.state.stop)
             ui.run(
                 title='Stream Views',
                 favicon='🎥',
@@ -283,5 +378,4 @@ class StreamViewerApp:
             raise
 
 if __name__ in {"__main__", "__mp_main__"}:
-    app = StreamViewerApp()
-    app.start() 
\ No newline at end of file
+    StreamViewerApp().start() 
\ No newline at end of file
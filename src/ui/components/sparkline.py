@@ -0,0 +1,132 @@
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import numpy as np
+from src.core.downsampling import lttb
+from src.core.timeseries import TimeSeriesStore, timeseries_store
+
+# Tamaño del sparkline en píxeles y ventana de tiempo representada
+SPARKLINE_WIDTH = 120
+SPARKLINE_HEIGHT = 32
+SPARKLINE_WINDOW = timedelta(hours=1)
+
+_EMPTY_SVG = (
+    f'<svg xmlns="http://www.w3.org/2000/svg" width="{SPARKLINE_WIDTH}" height="{SPARKLINE_HEIGHT}" '
+    f'viewBox="0 0 {SPARKLINE_WIDTH} {SPARKLINE_HEIGHT}"></svg>'
+)
+
+
+def render_sparkline(timestamps: np.ndarray, viewers: np.ndarray,
+                     width: int = SPARKLINE_WIDTH, height: int = SPARKLINE_HEIGHT) -> str:
+    """
+    Genera un sparkline SVG de una serie de viewers.
+
+    La serie se reduce con LTTB a un punto por píxel de ancho, por lo que el
+    tamaño del SVG no depende de la cantidad de muestras.
+
+    Args:
+        timestamps (np.ndarray): Timestamps en ms, ordenados
+        viewers (np.ndarray): Viewers de cada muestra
+        width (int): Ancho en píxeles
+        height (int): Alto en píxeles
+
+    Returns:
+        str: Marcado SVG
+    """
+    if len(timestamps) < 2:
+        return _EMPTY_SVG
+
+    x, y = lttb(timestamps, viewers, width)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Escalar a la caja, dejando 1 px de margen para el trazo
+    x_span = (x[-1] - x[0]) or 1.0
+    y_min, y_max = y.min(), y.max()
+    y_span = (y_max - y_min) or 1.0
+    px = (x - x[0]) / x_span * (width - 2) + 1
+    py = (height - 1) - (y - y_min) / y_span * (height - 2)
+    points = " ".join(f"{a:.1f},{b:.1f}" for a, b in zip(px, py))
+
+    color = '#16a34a' if y[-1] >= y[0] else '#dc2626'
+    area = f"{px[0]:.1f},{height} {points} {px[-1]:.1f},{height}"
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">'
+        f'<polygon points="{area}" fill="{color}" fill-opacity="0.12"/>'
+        f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="1.5" '
+        f'stroke-linejoin="round" stroke-linecap="round"/>'
+        f'</svg>'
+    )
+
+
+class SparklineCache:
+    """
+    Caché de sparklines SVG por stream.
+
+    Cada entrada queda asociada a la última muestra del stream en el almacén
+    de series: mientras no lleguen muestras nuevas se reutiliza el mismo SVG,
+    sin importar cuántas tarjetas o clientes lo muestren.
+    """
+
+    def __init__(self, store: TimeSeriesStore, max_entries: int = 1024):
+        """
+        Inicializa la caché.
+
+        Args:
+            store (TimeSeriesStore): Almacén de series recientes
+            max_entries (int): Cantidad máxima de streams en caché (LRU)
+        """
+        self.store = store
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[datetime], str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, video_id: str) -> str:
+        """
+        Obtiene el sparkline de un stream, generándolo solo si hay muestras nuevas.
+
+        Args:
+            video_id (str): ID del stream
+
+        Returns:
+            str: Marcado SVG
+        """
+        latest = self.store.latest(video_id)
+        last_ts = latest[0] if latest else None
+        entry = self._entries.get(video_id)
+        if entry is not None and entry[0] == last_ts:
+            self._entries.move_to_end(video_id)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+
+        if last_ts is None:
+            svg = _EMPTY_SVG
+        else:
+            svg = render_sparkline(*self.store.window(video_id, last_ts - SPARKLINE_WINDOW, last_ts))
+
+        self._entries[video_id] = (last_ts, svg)
+        self._entries.move_to_end(video_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return svg
+
+    def discard(self, video_id: str) -> None:
+        """Elimina el sparkline de un stream de la caché."""
+        self._entries.pop(video_id, None)
+
+    def stats(self) -> Dict[str, float]:
+        """Tamaño, aciertos, fallos y tasa de aciertos de la caché."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Instancia global de la caché de sparklines
+sparkline_cache = SparklineCache(timeseries_store)
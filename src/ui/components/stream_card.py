@@ -0,0 +1,103 @@
+from typing import Callable
+from nicegui import ui, binding
+from src.core.timeseries import to_local
+from src.models.stream_metrics import Stream
+from src.services.thumbnail_cache import thumbnail_cache
+from src.ui.components.sparkline import sparkline_cache
+
+class StreamCard:
+    """
+    Tarjeta de un stream que persiste entre actualizaciones.
+
+    Se crea una sola vez por video_id; las actualizaciones posteriores solo
+    modifican las propiedades enlazadas (viewers y última actualización), sin
+    volver a crear la imagen, las etiquetas ni los botones. El sparkline se
+    toma de la caché compartida y solo se reenvía cuando hay muestras nuevas.
+    """
+
+    viewers_text = binding.BindableProperty()
+    updated_text = binding.BindableProperty()
+
+    def __init__(self, stream: Stream,
+                 on_details: Callable[[Stream], None],
+                 on_refresh: Callable[[str], None],
+                 on_delete: Callable[[str], None]):
+        """
+        Crea la tarjeta en el contenedor actual.
+
+        Args:
+            stream (Stream): Stream a mostrar
+            on_details: Callback para ver los detalles del stream
+            on_refresh: Callback para actualizar el stream (recibe el video_id)
+            on_delete: Callback para eliminar el stream (recibe el video_id)
+        """
+        self.stream = stream
+        self.viewers_text = f'{stream.current_viewers:,}'
+        self.updated_text = to_local(stream.last_updated).strftime('%H:%M:%S')
+        self._sparkline_svg = sparkline_cache.get(stream.video_id)
+
+        with ui.card().classes('w-full p-4 hover:shadow-lg transition-shadow') as self.card:
+            with ui.row().classes('w-full justify-between items-start gap-4'):
+                # Thumbnail del video (servido por la caché local, redimensionado)
+                thumbnail = thumbnail_cache.url_for(stream.video_id, stream.thumbnail_url)
+                self.thumbnail = ui.image(thumbnail or '').classes('w-48 h-27 object-cover rounded')
+                self.thumbnail.set_visibility(thumbnail is not None)
+
+                # Información del stream
+                with ui.column().classes('flex-grow gap-2'):
+                    self.title_label = ui.label(stream.title).classes('text-xl font-bold')
+                    ui.label(stream.channel_name).classes('text-gray-600')
+
+                    # Métricas
+                    with ui.row().classes('gap-4 mt-2'):
+                        with ui.column().classes('items-center'):
+                            ui.label('👥').classes('text-2xl')
+                            ui.label().bind_text_from(self, 'viewers_text').classes('text-green-600 font-semibold')
+                            ui.label('Viewers').classes('text-sm text-gray-500')
+
+                        with ui.column().classes('items-center'):
+                            ui.label('⏱️').classes('text-2xl')
+                            ui.label().bind_text_from(self, 'updated_text').classes('text-blue-600 font-semibold')
+                            ui.label('Última actualización').classes('text-sm text-gray-500')
+
+                        with ui.column().classes('items-center justify-center'):
+                            self.sparkline = ui.html(self._sparkline_svg).classes('leading-none')
+                            ui.label('Última hora').classes('text-sm text-gray-500')
+
+                # Botones de acción (leen el stream vigente, no el de la creación)
+                with ui.column().classes('gap-2'):
+                    ui.button(
+                        'Más detalles',
+                        on_click=lambda: on_details(self.stream)
+                    ).props('flat').classes('text-blue-500')
+
+                    ui.button(
+                        icon='refresh',
+                        on_click=lambda: on_refresh(self.stream.video_id)
+                    ).props('flat').classes('text-blue-500')
+
+                    ui.button(
+                        icon='delete',
+                        on_click=lambda: on_delete(self.stream.video_id)
+                    ).props('flat').classes('text-red-500')
+
+    def update(self, stream: Stream):
+        """Actualiza las métricas mostradas; solo se envían los valores que cambiaron."""
+        self.stream = stream
+        self.viewers_text = f'{stream.current_viewers:,}'
+        self.updated_text = to_local(stream.last_updated).strftime('%H:%M:%S')
+        if self.title_label.text != stream.title:
+            self.title_label.set_text(stream.title)
+        thumbnail = thumbnail_cache.url_for(stream.video_id, stream.thumbnail_url)
+        if thumbnail and thumbnail != self.thumbnail.source:
+            self.thumbnail.set_source(thumbnail)
+            self.thumbnail.set_visibility(True)
+        svg = sparkline_cache.get(stream.video_id)
+        if svg is not self._sparkline_svg:
+            self._sparkline_svg = svg
+            self.sparkline.set_content(svg)
+
+    def delete(self):
+        """Elimina la tarjeta de la interfaz."""
+        self.card.delete()
+        binding.remove([self])
@@ -1,79 +1,255 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
+from bisect import bisect_left
+import json
+import numpy as np
 import plotly.graph_objects as go
 from nicegui import ui
 from datetime import datetime, timedelta
-import pandas as pd
-from src.services.stream_service import StreamService
+from src.core.config import Config
+from src.core.downsampling import lttb
+from src.core.logger import logger
+from src.core.metrics import UI_RENDER_SECONDS
+from src.core.timeseries import timeseries_store, to_millis, from_millis, to_local, local_offset_millis
+from src.repositories import get_stream_repository
+
+# Rangos disponibles en minutos
+RANGE_OPTIONS = {
+    30: '30 min',
+    60: '1 h',
+    360: '6 h',
+    1440: '24 h',
+    10080: '7 d',
+    43200: '30 d'
+}
+
+# Cubetas pedidas al almacenamiento por cada punto final (LTTB elige entre ellas)
+ROLLUP_FACTOR = 4
+
+
+def _format_time(timestamp: datetime) -> str:
+    """Formatea un datetime igual que np.datetime_as_string(..., unit='ms')."""
+    return timestamp.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]
+
 
 class StreamGraph:
-    def __init__(self):
-        self.data: Dict[str, List[Dict]] = {}
-        self.fig = go.Figure()
+    """
+    Gráfico de viewers en tiempo real con actualizaciones incrementales.
+
+    Cada stream conserva un índice de traza estable. Las actualizaciones se
+    acumulan y se envían una vez por intervalo de frame: solo los puntos nuevos
+    viajan al navegador (Plotly.extendTraces); la figura completa se reenvía
+    únicamente cuando se agregan o quitan trazas.
+
+    Los rangos largos se completan con el historial agregado del repositorio y
+    cada traza se reduce con LTTB a un presupuesto proporcional al ancho en píxeles.
+    """
+
+    def __init__(self, frame_interval: float = 0.25):
+        """
+        Inicializa el gráfico.
+
+        Args:
+            frame_interval (float): Segundos entre envíos acumulados al navegador
+        """
+        # Streams graficados: video_id -> nombre mostrado en la leyenda
+        self.names: Dict[str, str] = {}
+        self.window = timedelta(minutes=30)
+        self.frame_interval = frame_interval
+        self.point_budget = Config.CHART_MAX_POINTS
         self.plot = None  # Inicializamos como None
-        self.stream_service = StreamService()
-        
-        # Configuración inicial del gráfico
-        self.fig.update_layout(
+
+        self._trace_index: Dict[str, int] = {}
+        self._last_sent: Dict[str, int] = {}  # último timestamp (ms) agregado por stream
+        self._pending: Set[str] = set()
+        self._needs_full_update = False
+
+        # Configuración inicial del gráfico (como dict para poder extenderlo sin reconstruirlo)
+        self.figure = go.Figure(layout=dict(
             title='Evolución de Viewers en Tiempo Real',
             xaxis_title='Tiempo',
             yaxis_title='Viewers',
             showlegend=True,
             template='plotly_dark'
-        )
-        
+        )).to_plotly_json()
+        self.figure['data'] = []
+        self.figure['layout']['xaxis'].update(type='date', autorange=False)
+        self.figure['layout']['yaxis'].update(autorange=True)
+
     def setup(self):
         """Configura el gráfico en la interfaz."""
-        self.plot = ui.plotly(self.fig).classes('w-full h-96')
-        
-    def update_data(self, stream_id: str, viewers: int, timestamp: datetime):
-        """Actualiza los datos del gráfico con nuevos valores."""
-        if stream_id not in self.data:
-            self.data[stream_id] = []
-            
-        self.data[stream_id].append({
-            'timestamp': timestamp,
-            'viewers': viewers
-        })
-        
-        # Mantener solo los últimos 30 minutos de datos
-        cutoff_time = datetime.now() - timedelta(minutes=30)
-        self.data[stream_id] = [
-            point for point in self.data[stream_id]
-            if point['timestamp'] > cutoff_time
-        ]
-        
-        self._update_plot()
-        
-    def _update_plot(self):
-        """Actualiza el gráfico con los datos más recientes."""
+        ui.toggle(
+            RANGE_OPTIONS,
+            value=int(self.window.total_seconds() // 60),
+            on_change=lambda e: self.set_range(e.value)
+        ).props('dense')
+        self.plot = ui.plotly(self.figure).classes('w-full h-96')
+        ui.timer(self.frame_interval, self._flush)
+
+    def update_data(self, stream_id: str, name: Optional[str] = None):
+        """
+        Marca un stream para actualizar en el próximo frame.
+
+        Los datos se leen del almacén compartido de series (timeseries_store),
+        que es actualizado por StreamService.
+        """
+        name = name or self.names.get(stream_id) or stream_id
+        if stream_id not in self._trace_index:
+            self._add_trace(stream_id, name)
+        elif name != self.names[stream_id]:
+            self.names[stream_id] = name
+            self.figure['data'][self._trace_index[stream_id]]['name'] = name
+            self._needs_full_update = True
+        self._pending.add(stream_id)
+
+    def remove_stream(self, stream_id: str):
+        """Quita un stream del gráfico."""
+        index = self._trace_index.pop(stream_id, None)
+        if index is None:
+            return
+        del self.figure['data'][index]
+        for other, other_index in self._trace_index.items():
+            if other_index > index:
+                self._trace_index[other] = other_index - 1
+        self.names.pop(stream_id, None)
+        self._last_sent.pop(stream_id, None)
+        self._pending.discard(stream_id)
+        self._needs_full_update = True
+
+    async def set_range(self, minutes: int):
+        """
+        Cambia el rango visible y recarga todas las trazas reducidas con LTTB.
+
+        Args:
+            minutes (int): Duración del rango en minutos
+        """
+        self.window = timedelta(minutes=minutes)
+        self.point_budget = await self._measure_point_budget()
+        end = datetime.utcnow()
+        start = end - self.window
+
+        for stream_id, index in self._trace_index.items():
+            try:
+                timestamps, viewers = await self._load_series(stream_id, start, end)
+            except Exception as e:
+                logger.error(f"Error al cargar historial del gráfico para {stream_id}: {str(e)}")
+                timestamps, viewers = timeseries_store.window(stream_id, start, end)
+            timestamps, viewers = lttb(timestamps, viewers, self.point_budget)
+
+            trace = self.figure['data'][index]
+            trace['x'] = self._labels(timestamps)
+            trace['y'] = viewers.tolist()
+            self._last_sent[stream_id] = int(timestamps[-1]) if len(timestamps) else to_millis(start)
+
+        self._needs_full_update = True
+        self._flush()
+
+    async def _load_series(self, stream_id: str, start: datetime,
+                           end: datetime) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Obtiene la serie de un rango: memoria para lo reciente, historial agregado para el resto.
+        """
+        timestamps, viewers = timeseries_store.window(stream_id, start, end)
+        start_ms = to_millis(start)
+        if len(timestamps) and timestamps[0] - start_ms <= Config.UPDATE_INTERVAL * 1000:
+            return timestamps, viewers
+
+        history_end = from_millis(timestamps[0] - 1) if len(timestamps) else end
+        history = await get_stream_repository().get_viewer_series(
+            stream_id, start, history_end, self.point_budget * ROLLUP_FACTOR
+        )
+        if not history:
+            return timestamps, viewers
+
+        history_ts = np.fromiter((to_millis(p['timestamp']) for p in history), dtype=np.int64, count=len(history))
+        history_viewers = np.fromiter((round(p['viewers']) for p in history), dtype=np.int32, count=len(history))
+        return np.concatenate([history_ts, timestamps]), np.concatenate([history_viewers, viewers])
+
+    async def _measure_point_budget(self) -> int:
+        """Calcula el presupuesto de puntos por traza a partir del ancho del gráfico."""
         if self.plot is None:
+            return self.point_budget
+        try:
+            width = await self.plot.client.run_javascript(
+                f'return document.getElementById("c{self.plot.id}").clientWidth', timeout=1
+            )
+            return max(100, int(width))
+        except Exception:
+            return self.point_budget
+
+    @staticmethod
+    def _labels(timestamps: np.ndarray) -> List[str]:
+        """Convierte timestamps en ms (UTC) a etiquetas de fecha en hora local para Plotly."""
+        local = (timestamps + local_offset_millis()).astype('datetime64[ms]')
+        return np.datetime_as_string(local, unit='ms').tolist()
+
+    def _add_trace(self, stream_id: str, name: str):
+        """Agrega una traza vacía con un índice estable para el stream."""
+        self._trace_index[stream_id] = len(self.figure['data'])
+        self.figure['data'].append({
+            'type': 'scatter',
+            'mode': 'lines+markers',
+            'name': name,
+            'x': [],
+            'y': []
+        })
+        self.names[stream_id] = name
+        self._needs_full_update = True
+
+    @UI_RENDER_SECONDS.labels("graph").time()
+    def _flush(self):
+        """Envía al navegador los puntos acumulados desde el último frame."""
+        if self.plot is None or not (self._pending or self._needs_full_update):
             return
-            
-        self.fig.data = []  # Limpiar datos existentes
-        
-        for stream_id, points in self.data.items():
-            df = pd.DataFrame(points)
-            # Obtener el stream para acceder al nombre del canal
-            stream = self.stream_service.get_stream_details(stream_id)
-            channel_name = stream.channel_name if stream else stream_id
-            
-            self.fig.add_trace(
-                go.Scatter(
-                    x=df['timestamp'],
-                    y=df['viewers'],
-                    name=channel_name,
-                    mode='lines+markers'
-                )
+
+        now = datetime.utcnow()
+        window_start = now - self.window
+        window_start_ms = to_millis(window_start)
+        indices: List[int] = []
+        new_x: List[list] = []
+        new_y: List[list] = []
+
+        for stream_id in self._pending:
+            start_ms = max(window_start_ms, self._last_sent.get(stream_id, -1) + 1)
+            timestamps, viewers = timeseries_store.window(stream_id, from_millis(start_ms))
+            if not len(timestamps):
+                continue
+
+            index = self._trace_index[stream_id]
+            trace = self.figure['data'][index]
+            self._last_sent[stream_id] = int(timestamps[-1])
+            if len(timestamps) > self.point_budget:
+                timestamps, viewers = lttb(timestamps, viewers, self.point_budget)
+            xs = self._labels(timestamps)
+            ys = viewers.tolist()
+            trace['x'].extend(xs)
+            trace['y'].extend(ys)
+
+            indices.append(index)
+            new_x.append(xs)
+            new_y.append(ys)
+        self._pending.clear()
+
+        # Descartar los puntos que salieron de la ventana
+        start_label = _format_time(to_local(window_start))
+        for trace in self.figure['data']:
+            cut = bisect_left(trace['x'], start_label)
+            if cut:
+                del trace['x'][:cut]
+                del trace['y'][:cut]
+
+        x_range = [start_label, _format_time(to_local(now))]
+        self.figure['layout']['xaxis']['range'] = x_range
+
+        if self._needs_full_update:
+            self._needs_full_update = False
+            self.plot.update()
+            return
+
+        if indices:
+            max_points = [len(self.figure['data'][i]['x']) for i in indices]
+            element = f'c{self.plot.id}'
+            self.plot.client.run_javascript(
+                f'Plotly.extendTraces("{element}", '
+                f'{json.dumps({"x": new_x, "y": new_y})}, {json.dumps(indices)}, {json.dumps(max_points)});'
+                f'Plotly.relayout("{element}", {json.dumps({"xaxis.range": x_range})});'
             )
-            
-        # Actualizar el rango del eje X para mostrar solo los últimos 30 minutos
-        now = datetime.now()
-        self.fig.update_xaxes(
-            range=[now - timedelta(minutes=30), now],
-            autorange=False
-        )
-        
-        # Actualizar el rango del eje Y para que se ajuste automáticamente
-        self.fig.update_yaxes(autorange=True)
-        
-        self.plot.update() 
\ No newline at end of file